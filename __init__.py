@@ -45,30 +45,45 @@ def load_addon():
 
     rman_env = envconfig()
     if not rman_env.load_error:
-        from . import rman_config
-        from . import rman_presets
-        from . import rman_operators
-        from . import rman_ui
-        from . import rman_bl_nodes
-        from . import rman_properties
-        from . import rman_handlers
-        from . import rfb_translations
-        from . import rman_stats
-        from . import rman_engine
+        from .rfb_utils.timer_utils import StageTimer, log_startup_report
+        timer = StageTimer()
+        with timer.stage('import modules'):
+            from . import rman_config
+            from . import rman_presets
+            from . import rman_operators
+            from . import rman_ui
+            from . import rman_bl_nodes
+            from . import rman_properties
+            from . import rman_handlers
+            from . import rfb_translations
+            from . import rman_stats
+            from . import rman_engine
 
-        rman_config.register()
-        rman_properties.pre_register() 
-        rman_presets.register()        
-        rman_operators.register()
-        rman_bl_nodes.register()       
-        rman_properties.register()   
-        rman_ui.register()      
-        rman_handlers.register()
-        rfb_translations.register()
-        rman_stats.register()
-        rman_engine.register()
+        with timer.stage('rman_config'):
+            rman_config.register()
+        with timer.stage('rman_properties (pre_register)'):
+            rman_properties.pre_register() 
+        with timer.stage('rman_presets'):
+            rman_presets.register()        
+        with timer.stage('rman_operators'):
+            rman_operators.register()
+        with timer.stage('rman_bl_nodes'):
+            rman_bl_nodes.register()       
+        with timer.stage('rman_properties'):
+            rman_properties.register()   
+        with timer.stage('rman_ui'):
+            rman_ui.register()      
+        with timer.stage('rman_handlers'):
+            rman_handlers.register()
+        with timer.stage('rfb_translations'):
+            rfb_translations.register()
+        with timer.stage('rman_stats'):
+            rman_stats.register()
+        with timer.stage('rman_engine'):
+            rman_engine.register()
 
         __RMAN_ADDON_LOADED__ = True
+        log_startup_report(timer, 'RenderMan for Blender startup')
 
     else:
         rfb_log().error(rman_env.load_error_message)
@@ -42,6 +42,7 @@
 #endif
 
 #include <atomic>
+#include <mutex>
 
 typedef bool (*FuncPtr)();
 FuncPtr tag_redraw_func;
@@ -54,6 +55,7 @@ struct BlenderImage
         isXpu = false;
         framebuffer = nullptr;
         denoiseFrameBuffer = nullptr;
+        allDirty = false;
     }
 
     int width;
@@ -90,6 +92,13 @@ struct BlenderImage
     size_t noutputs;
     std::atomic<bool> bufferUpdated;
 
+    // Rectangles, in framebuffer coordinates, that have been written
+    // since the last call to GetDirtyRegions. If allDirty is set, the
+    // whole image should be considered changed.
+    std::mutex dirtyMutex;
+    std::vector<std::array<int, 4>> dirtyRects;
+    bool allDirty;
+
     // These two aren't currently used
     // but are needed if we decide to use a
     // fragment shader
@@ -132,6 +141,31 @@ private:
 
 static std::vector<BlenderImage*> s_blenderImages;
 
+// Max number of dirty rectangles we keep per image before
+// we give up and mark the whole image as dirty
+static const size_t kMaxDirtyRects = 256;
+
+void AddDirtyRect(BlenderImage* blenderImage, int xMin, int xMax, int yMin, int yMax)
+{
+    std::lock_guard<std::mutex> lock(blenderImage->dirtyMutex);
+    if (blenderImage->allDirty)
+        return;
+    if (blenderImage->dirtyRects.size() >= kMaxDirtyRects)
+    {
+        blenderImage->dirtyRects.clear();
+        blenderImage->allDirty = true;
+        return;
+    }
+    blenderImage->dirtyRects.push_back({xMin, xMax, yMin, yMax});
+}
+
+void SetAllDirty(BlenderImage* blenderImage)
+{
+    std::lock_guard<std::mutex> lock(blenderImage->dirtyMutex);
+    blenderImage->dirtyRects.clear();
+    blenderImage->allDirty = true;
+}
+
 bool DenoiseBuffer(BlenderImage* blenderImage)
 {
 #ifndef OSX
@@ -309,6 +343,89 @@ void GetFloatFramebuffer(size_t pos, size_t pybuffersize, float* pybuffer)
     memcpy(pybuffer, blenderImage->framebuffer, sizeof(float) * pybuffersize);
 }
 
+// Copy a window of the float buffer for this display directly into pybuffer.
+// Only the first numChannels of each pixel are copied. The window is written
+// starting at pybuffer + offset, with each row dstRowStride floats apart; a
+// dstRowStride of 0 means the rows are packed, i.e. (xMax - xMin) * numChannels.
+// This lets the caller hand us a preallocated array, or a window of a larger
+// one, and skip any re-slicing. Returns false if nothing was copied.
+PRMANEXPORT
+bool GetFloatFramebufferRegion(size_t pos, int numChannels, int xMin, int xMax, int yMin, int yMax, float* pybuffer, size_t offset, size_t dstRowStride)
+{
+    if (s_blenderImages.empty() || pos >= s_blenderImages.size())
+        return false;
+
+    BlenderImage* blenderImage = s_blenderImages[pos];
+
+    if (blenderImage == nullptr || blenderImage->framebuffer == nullptr)
+        return false;
+
+    if (numChannels <= 0 || numChannels > blenderImage->channels)
+        return false;
+
+    if (xMin < 0 || yMin < 0 || xMax > blenderImage->width || yMax > blenderImage->height
+        || xMin >= xMax || yMin >= yMax)
+        return false;
+
+    const float* src = reinterpret_cast<const float*>(blenderImage->framebuffer);
+    if (DenoiseBuffer(blenderImage)) {
+        src = reinterpret_cast<const float*>(blenderImage->denoiseFrameBuffer);
+    }
+
+    const size_t srcStride = blenderImage->channels;
+    const size_t rowWidth = xMax - xMin;
+    if (dstRowStride == 0)
+        dstRowStride = rowWidth * numChannels;
+    for (int y = yMin; y < yMax; ++y)
+    {
+        const float* row = src + (size_t(y) * blenderImage->width + xMin) * srcStride;
+        float* dst = pybuffer + offset + size_t(y - yMin) * dstRowStride;
+        if (numChannels == blenderImage->channels)
+        {
+            // channel layouts match, we can copy the whole row at once
+            memcpy(dst, row, sizeof(float) * rowWidth * srcStride);
+            continue;
+        }
+        for (size_t x = 0; x < rowWidth; ++x)
+        {
+            memcpy(dst, row, sizeof(float) * numChannels);
+            dst += numChannels;
+            row += srcStride;
+        }
+    }
+    return true;
+}
+
+// Copy the rectangles that have changed since the last call into rects, as
+// (xMin, xMax, yMin, yMax) quadruples in framebuffer coordinates with
+// exclusive max values, and clear them. Returns the number of rectangles
+// copied, or -1 if the whole image should be considered changed.
+PRMANEXPORT
+int GetDirtyRegions(size_t pos, int maxRects, int* rects)
+{
+    if (s_blenderImages.empty() || pos >= s_blenderImages.size())
+        return 0;
+
+    BlenderImage* blenderImage = s_blenderImages[pos];
+
+    if (blenderImage == nullptr)
+        return 0;
+
+    std::lock_guard<std::mutex> lock(blenderImage->dirtyMutex);
+    int count = -1;
+    if (!blenderImage->allDirty && blenderImage->dirtyRects.size() <= size_t(maxRects))
+    {
+        count = static_cast<int>(blenderImage->dirtyRects.size());
+        for (int i = 0; i < count; ++i)
+        {
+            memcpy(rects + (i * 4), blenderImage->dirtyRects[i].data(), sizeof(int) * 4);
+        }
+    }
+    blenderImage->dirtyRects.clear();
+    blenderImage->allDirty = false;
+    return count;
+}
+
 // Return the active region that RenderMan is currently working on
 PRMANEXPORT
 void GetActiveRegion(size_t pos, int& arXMin, int& arXMax, int& arYMin, int& arYMax)
@@ -673,6 +790,21 @@ DspyImageData(
         }
     }
 
+    if (blenderImage->use_denoiser)
+    {
+        // the denoiser touches every pixel
+        SetAllDirty(blenderImage);
+    }
+    else
+    {
+        // note, the framebuffer is stored flipped in y
+        AddDirtyRect(blenderImage,
+                     blenderImage->cropXMin + xmin,
+                     blenderImage->cropXMin + xmax_plus_1,
+                     blenderImage->height - (blenderImage->cropYMin + ymax_plus_1),
+                     blenderImage->height - (blenderImage->cropYMin + ymin));
+    }
+
     blenderImage->arXMin = blenderImage->cropXMin + xmin;
     blenderImage->arXMax = blenderImage->cropXMin + xmax_plus_1 - 1;
     blenderImage->arYMin = blenderImage->cropYMin + ymin;
@@ -884,6 +1016,7 @@ void DisplayBlender::Notify(const uint32_t iteration,
         return;
     }
     CopyXpuBuffer(m_image);
+    SetAllDirty(m_image);
     m_image->bufferUpdated = true;
     if (tag_redraw_func)
     {
@@ -75,6 +75,8 @@ __DEFAULTS__ = {
     'rman_show_advanced_params': False,      
     'rman_config_dir': "",
     'rman_viewport_refresh_rate': 0.01,
+    'rman_viewport_max_update_rate': 30.0,
+    'rman_ipr_edit_window': 0.05,
     'rman_solo_collapse_nodes': True,
     'rman_use_blend_dir_token': True,          
     'rman_ui_framework': "QT",
@@ -521,6 +523,23 @@ class RendermanPreferences(AddonPreferences):
         max=0.1
     )    
 
+    rman_viewport_max_update_rate: FloatProperty(
+        name="Viewport Camera Update Rate",
+        description="The maximum number of times per second the camera is updated when the view changes during viewport IPR. View changes that come in faster than this are merged together. Set to 0 for no limit.",
+        default=30.0,
+        min=0.0,
+        max=240.0
+    )    
+
+    rman_ipr_edit_window: FloatProperty(
+        name="IPR Edit Window",
+        description="The number of seconds to collect edits from property changes during IPR before sending them to the renderer. Edits that come in during this window are sent together, so that the render only restarts once. Set to 0 to send every edit right away.",
+        default=0.05,
+        precision=3,
+        min=0.0,
+        max=1.0
+    )    
+
     rman_solo_collapse_nodes: BoolProperty(
         name="Collapse Non-Solo Nodes",
         default=True,
@@ -920,6 +939,8 @@ class RendermanPreferences(AddonPreferences):
             col.label(text='Other', icon_value=rman_r_icon.icon_id)
 
             col.prop(self, 'rman_viewport_refresh_rate')  
+            col.prop(self, 'rman_viewport_max_update_rate')  
+            col.prop(self, 'rman_ipr_edit_window')  
             col.prop(self, 'rman_config_dir')   
             if self.rman_do_preview_renders:
                 col.prop(self, 'rman_preview_renders_minSamples')
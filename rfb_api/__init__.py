@@ -209,7 +209,9 @@ def create_pattern(node_type, material):
 
     '''  
     nt = material.node_tree
-    pattern = nt.nodes.new('%sPatternNode' % node_type)
+    typename = '%sPatternNode' % node_type
+    rman_bl_nodes.ensure_node_type(typename)
+    pattern = nt.nodes.new(typename)
     return pattern
 
 def connect_nodes(output_node, output_socket, input_node, input_socket):
@@ -2,11 +2,15 @@ import unittest
 from RenderManForBlender.rfb_unittests.test_string_expr import StringExprTest
 from RenderManForBlender.rfb_unittests.test_shader_nodes import ShaderNodesTest
 from RenderManForBlender.rfb_unittests.test_geo import GeoTest
+from RenderManForBlender.rfb_unittests.test_timer_utils import TimerUtilsTest
+from RenderManForBlender.rfb_unittests.test_light_linking import LightLinkingTest
 
 classes = [
     StringExprTest,
     ShaderNodesTest,
-    GeoTest
+    GeoTest,
+    TimerUtilsTest,
+    LightLinkingTest
 ]
 
 def suite():
@@ -1,15 +1,41 @@
 import unittest
 import bpy
 import numpy as np
+from types import SimpleNamespace
+from mathutils import Matrix, Vector
 from ..rfb_utils import mesh_utils
+from ..rfb_utils import transform_utils
+from ..rfb_utils import particles_utils
+from ..rman_translators import rman_mesh_translator
+from ..rman_translators import rman_hair_translator
+from ..rman_translators import rman_hair_curves_translator
 from ..rman_constants import BLENDER_41
 
 
+class _Particles:
+    '''Stand-in for psys.particles, which ParticleArrays reads with foreach_get'''
+    def __init__(self, **attrs):
+        self.attrs = attrs
+
+    def __len__(self):
+        return len(self.attrs['lifetime'])
+
+    def foreach_get(self, attr, arr):
+        arr[:] = np.asarray(self.attrs[attr], dtype=arr.dtype).reshape(-1)
+
 class GeoTest(unittest.TestCase):
 
     @classmethod
     def add_tests(self, suite):
         suite.addTest(GeoTest('test_mesh_export'))
+        suite.addTest(GeoTest('test_mesh_digest'))
+        suite.addTest(GeoTest('test_mats_faces'))
+        suite.addTest(GeoTest('test_strand_vertex_ids'))
+        suite.addTest(GeoTest('test_curve_chunks'))
+        suite.addTest(GeoTest('test_curve_end_points'))
+        suite.addTest(GeoTest('test_convert_matrices'))
+        suite.addTest(GeoTest('test_transform_points'))
+        suite.addTest(GeoTest('test_particles_zero_lifetime'))
 
     def test_mesh_export(self):
 
@@ -38,4 +64,148 @@ class GeoTest(unittest.TestCase):
         self.assertEqual(mesh, mesh_test)
         bpy.ops.object.delete()
 
-        
+    def test_mesh_digest(self):
+        nverts = [4, 4]
+        verts = [0, 1, 2, 3, 1, 4, 5, 2]
+        P = [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0, 2.0, 0.0, 0.0, 2.0, 1.0, 0.0]
+
+        mesh = mesh_utils.RmanMesh(nverts, verts, P, None)
+        mesh_copy = mesh_utils.RmanMesh(list(nverts), list(verts), list(P), None)
+        self.assertEqual(mesh, mesh_copy)
+        self.assertEqual(mesh.digest(), mesh_copy.digest())
+        self.assertEqual(hash(mesh), hash(mesh_copy))
+        # still equal once both digests are cached
+        self.assertEqual(mesh, mesh_copy)
+
+        # -0.0 and 0.0 compare equal, so they should hash the same
+        P_neg = list(P)
+        P_neg[0] = -0.0
+        mesh_neg = mesh_utils.RmanMesh(nverts, verts, P_neg, None)
+        self.assertEqual(mesh, mesh_neg)
+        self.assertEqual(hash(mesh), hash(mesh_neg))
+
+        # moving one point changes the digest, but not the topology digest
+        P_moved = list(P)
+        P_moved[4] = 0.5
+        mesh_moved = mesh_utils.RmanMesh(nverts, verts, P_moved, None)
+        self.assertNotEqual(mesh, mesh_moved)
+        self.assertNotEqual(mesh.digest(), mesh_moved.digest())
+        self.assertEqual(mesh.topology_digest(), mesh_moved.topology_digest())
+
+        # changing one face index changes both digests
+        verts_changed = list(verts)
+        verts_changed[5] = 3
+        mesh_changed = mesh_utils.RmanMesh(nverts, verts_changed, P, None)
+        self.assertNotEqual(mesh, mesh_changed)
+        self.assertNotEqual(mesh.digest(), mesh_changed.digest())
+        self.assertNotEqual(mesh.topology_digest(), mesh_changed.topology_digest())
+
+        # normals are part of the digest too
+        N = [0.0, 0.0, 1.0, 0.0, 0.0, 1.0]
+        mesh_n = mesh_utils.RmanMesh(nverts, verts, P, N)
+        self.assertNotEqual(mesh, mesh_n)
+        self.assertNotEqual(mesh.digest(), mesh_n.digest())
+
+    def test_mats_faces(self):
+        nverts = np.array([4, 4, 3, 4, 4, 3], dtype=np.int32)
+        material_ids = np.array([2, 0, 2, 1, 0, 2], dtype=np.int32)
+        mats = rman_mesh_translator._get_mats_faces_(nverts, material_ids)
+
+        # ordered by the first face that uses each material
+        self.assertEqual(list(mats.keys()), [2, 0, 1])
+        self.assertEqual(mats[2].tolist(), [0, 2, 5])
+        self.assertEqual(mats[0].tolist(), [1, 4])
+        self.assertEqual(mats[1].tolist(), [3])
+        for faces in mats.values():
+            self.assertTrue(np.all(np.diff(faces) > 0))
+            self.assertEqual(faces.dtype, np.int32)
+            self.assertTrue(faces.flags['C_CONTIGUOUS'])
+
+        # every face is in exactly one group
+        all_faces = np.sort(np.concatenate(list(mats.values())))
+        self.assertEqual(all_faces.tolist(), list(range(len(material_ids))))
+
+        self.assertEqual(rman_mesh_translator._get_mats_faces_(np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)), {})
+        self.assertEqual(rman_mesh_translator._get_mats_faces_([], []), {})
+
+    def test_strand_vertex_ids(self):
+        strand_ids, local_ids = rman_hair_translator._get_strand_vertex_ids_([3, 1, 2])
+        self.assertEqual(strand_ids.tolist(), [0, 0, 0, 1, 2, 2])
+        self.assertEqual(local_ids.tolist(), [0, 1, 2, 0, 0, 1])
+
+    def test_curve_chunks(self):
+        nverts = np.array([4, 6, 5, 3, 7], dtype=np.int32)
+
+        # everything fits in one chunk
+        chunks = rman_hair_translator.get_curve_chunks(nverts, max_verts=100)
+        self.assertEqual(chunks, [(0, 5, 0, 25)])
+
+        # a chunk is closed by the first curve that takes it over max_verts
+        chunks = rman_hair_translator.get_curve_chunks(nverts, max_verts=9)
+        self.assertEqual(chunks, [(0, 2, 0, 10), (2, 5, 10, 25)])
+
+        # a curve bigger than max_verts still gets a chunk of its own
+        chunks = rman_hair_translator.get_curve_chunks(nverts, max_verts=2)
+        self.assertEqual([(c[0], c[1]) for c in chunks], [(i, i + 1) for i in range(len(nverts))])
+
+        # the chunks cover every vertex exactly once
+        chunks = rman_hair_translator.get_curve_chunks(nverts, max_verts=7)
+        self.assertEqual(chunks[0][2], 0)
+        self.assertEqual(chunks[-1][3], int(nverts.sum()))
+        for a, b in zip(chunks, chunks[1:]):
+            self.assertEqual(a[1], b[0])
+            self.assertEqual(a[3], b[2])
+
+        self.assertEqual(rman_hair_translator.get_curve_chunks(np.zeros(0, dtype=np.int32)), [])
+
+    def test_curve_end_points(self):
+        # two curves, with 4 and 5 points
+        offsets = np.array([0, 4, 9], dtype=np.int32)
+        point_index = rman_hair_curves_translator._get_end_point_index_(offsets)
+        self.assertEqual(point_index.tolist(), [0, 0, 1, 2, 3, 3, 4, 4, 5, 6, 7, 8, 8])
+
+        # gathering the points with the index doubles the first and last point of each curve
+        points = np.arange(9 * 3, dtype=np.float32).reshape(9, 3)
+        gathered = points[point_index]
+        self.assertEqual(len(gathered), 9 + 2 * 2)
+        np.testing.assert_array_equal(gathered[0], gathered[1])
+        np.testing.assert_array_equal(gathered[4], gathered[5])
+        np.testing.assert_array_equal(gathered[6], points[4])
+        np.testing.assert_array_equal(gathered[-1], points[8])
+
+    def test_convert_matrices(self):
+        m1 = Matrix(((1.0, 2.0, 3.0, 4.0),
+                     (5.0, 6.0, 7.0, 8.0),
+                     (9.0, 10.0, 11.0, 12.0),
+                     (0.0, 0.0, 0.0, 1.0)))
+        m2 = Matrix(((0.5, -1.0, 0.0, -2.0),
+                     (1.5, 0.25, 3.0, 7.0),
+                     (-4.0, 2.0, 1.0, 0.125),
+                     (0.0, 0.0, 0.0, 1.0)))
+        mtxs = transform_utils.convert_matrices(np.stack([np.array(m1), np.array(m2)]))
+        self.assertEqual(mtxs.shape, (2, 16))
+        self.assertEqual(mtxs.dtype, np.float32)
+        self.assertEqual(mtxs.tolist(), [transform_utils.convert_matrix(m1), transform_utils.convert_matrix(m2)])
+
+    def test_transform_points(self):
+        mtx = Matrix.Translation((1.0, -2.0, 3.0)) @ Matrix.Rotation(0.5, 4, 'Z') @ Matrix.Diagonal((2.0, 1.0, 0.5, 1.0))
+        pts = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 3.0], [-4.0, 0.5, 2.0]], dtype=np.float32)
+        result = particles_utils._transform_points_(mtx, pts)
+        self.assertEqual(result.shape, (3, 3))
+        for pt, p in zip(pts, result):
+            expected = mtx @ Vector(pt.tolist())
+            np.testing.assert_allclose(p, list(expected), rtol=1e-5, atol=1e-5)
+
+    def test_particles_zero_lifetime(self):
+        psys = SimpleNamespace(particles=_Particles(location=[[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]],
+                                                    velocity=[[2.0, 0.0, 0.0], [0.0, 4.0, 0.0]],
+                                                    lifetime=[0.0, 2.0],
+                                                    birth_time=[1.0, 1.0],
+                                                    die_time=[10.0, 10.0]),
+                               settings=SimpleNamespace(renderman=SimpleNamespace(scale_velocity_blur=1.0, prim_vars=[])))
+        P, next_P, width = particles_utils.get_particles(None, psys, Matrix.Identity(4), 5.0,
+                                                         get_next_P=True, get_width=False)
+        self.assertEqual(P.tolist(), [0.0, 0.0, 0.0, 1.0, 1.0, 1.0])
+        # a particle with a zero lifetime doesn't move
+        self.assertEqual(next_P.tolist(), [0.0, 0.0, 0.0, 1.0, 3.0, 1.0])
+        self.assertEqual(width.size, 0)
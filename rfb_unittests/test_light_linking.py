@@ -0,0 +1,186 @@
+import unittest
+from ..rfb_utils import scene_utils
+
+# Minimal stand-ins for the Blender objects RmanLightLinkTable looks at.
+# Objects are used as dict keys, so they need to be hashable, unlike SimpleNamespace.
+class _Attrs:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class _Ob:
+    def __init__(self, name):
+        self.name = name
+        self.type = 'MESH'
+        self.original = self
+
+class _Light(_Ob):
+    def __init__(self, name, role='RMAN_LIGHT', receivers=None, blockers=None):
+        super().__init__(name)
+        self.type = 'LIGHT'
+        self.data = _Attrs(renderman=_Attrs(renderman_light_role=role))
+        self.light_linking = _Attrs(receiver_collection=receivers, blocker_collection=blockers)
+
+def _link_collection(links):
+    '''Make a light linking collection from a list of (object, link_state) tuples'''
+    return _Attrs(objects=[o for o, state in links],
+                  collection_objects=[_Attrs(light_linking=_Attrs(link_state=state)) for o, state in links])
+
+def _rman_scene(all_lights, all_lightfilters=None, light_links=None):
+    return _Attrs(all_lights=all_lights,
+                  all_lightfilters=all_lightfilters or [],
+                  bl_scene=_Attrs(renderman=_Attrs(light_links=light_links or [])))
+
+def _old_bl_subsets(all_lights, ob):
+    '''The per object loop we used before RmanLightLinkTable'''
+    exclude_subset = []
+    include_subset = []
+    lightfilter_subset = []
+    shadow_subset = []
+    shadow_exclude = []
+    for light in all_lights:
+        role = light.data.renderman.renderman_light_role
+        receivers = light.light_linking.receiver_collection
+        blockers = light.light_linking.blocker_collection
+        if receivers:
+            for i, o in enumerate(receivers.objects):
+                if o.name == ob.name:
+                    state = receivers.collection_objects[i].light_linking.link_state
+                    if role == 'RMAN_LIGHT':
+                        if state == 'EXCLUDE':
+                            exclude_subset.append(light.name)
+                        else:
+                            include_subset.append(light.name)
+                    elif state == 'INCLUDE':
+                        lightfilter_subset.append(light.name)
+                    else:
+                        lightfilter_subset.append("-%s" % light.name)
+        elif role == 'RMAN_LIGHTFILTER':
+            lightfilter_subset.append(light.name)
+        if blockers:
+            found = False
+            for i, o in enumerate(blockers.objects):
+                if o.name == ob.name:
+                    if role == 'RMAN_LIGHT':
+                        if blockers.collection_objects[i].light_linking.link_state == 'EXCLUDE':
+                            shadow_exclude.append(light.name + "_shadowExcludeSubset")
+                        else:
+                            shadow_subset.append(light.name + "_shadowSubset")
+                    found = True
+            if not found:
+                shadow_subset.append(light.name + "_shadowInvertSubset")
+        else:
+            shadow_subset.append(light.name + "_shadowSubset")
+
+    return (','.join(exclude_subset), ','.join(include_subset), ','.join(lightfilter_subset),
+            ','.join(shadow_subset), ','.join(shadow_exclude))
+
+def _old_rman_subsets(all_lights, all_lightfilters, light_links, ob):
+    '''The per object loop we used before RmanLightLinkTable, for inverted light linking'''
+    lighting_subset = []
+    lightfilter_subset = []
+    all_lights = list(all_lights)
+    all_lightfilters = list(all_lightfilters)
+    for ll in light_links:
+        role = ll.light_ob.data.renderman.renderman_light_role
+        found = False
+        for member in ll.members:
+            if member.ob_pointer.original == ob.original:
+                found = True
+                break
+        if role == 'RMAN_LIGHT':
+            if found:
+                lighting_subset.append(ll.light_ob.name)
+            all_lights.remove(ll.light_ob.name)
+        elif role == 'RMAN_LIGHTFILTER':
+            if found:
+                lightfilter_subset.append(ll.light_ob.name)
+            all_lightfilters.remove(ll.light_ob.name)
+
+    if lighting_subset:
+        lighting_subset = lighting_subset + all_lights
+    if lightfilter_subset:
+        lightfilter_subset = lightfilter_subset + all_lightfilters
+    return (','.join(lighting_subset), ','.join(lightfilter_subset))
+
+class LightLinkingTest(unittest.TestCase):
+
+    @classmethod
+    def add_tests(self, suite):
+        suite.addTest(LightLinkingTest('test_bl_subsets'))
+        suite.addTest(LightLinkingTest('test_bl_unlinked'))
+        suite.addTest(LightLinkingTest('test_rman_subsets'))
+
+    def _bl_scene(self):
+        self.cube = _Ob('cube')
+        self.sphere = _Ob('sphere')
+        self.plane = _Ob('plane')
+        self.other = _Ob('other')
+        key = _Light('key', receivers=_link_collection([(self.cube, 'INCLUDE'), (self.sphere, 'EXCLUDE')]))
+        fill = _Light('fill', blockers=_link_collection([(self.cube, 'INCLUDE'), (self.plane, 'EXCLUDE')]))
+        rim = _Light('rim')
+        blocker = _Light('blocker', role='RMAN_LIGHTFILTER',
+                         receivers=_link_collection([(self.sphere, 'INCLUDE'), (self.plane, 'EXCLUDE')]))
+        gobo = _Light('gobo', role='RMAN_LIGHTFILTER')
+        return _rman_scene([key, fill, rim, blocker, gobo])
+
+    # test Blender's light linking against the old per object loop
+    def test_bl_subsets(self):
+        rman_scene = self._bl_scene()
+        table = scene_utils.RmanLightLinkTable(rman_scene)
+
+        # include and exclude receivers
+        self.assertEqual(table.get_bl_subsets(self.cube)[:3], ('', 'key', 'gobo'))
+        self.assertEqual(table.get_bl_subsets(self.sphere)[:3], ('key', '', 'blocker,gobo'))
+        self.assertEqual(table.get_bl_subsets(self.plane)[2], '-blocker,gobo')
+
+        # blocker collection, including the invert subset for objects not in it
+        self.assertEqual(table.get_bl_subsets(self.cube)[3:],
+                         ('key_shadowSubset,fill_shadowSubset,rim_shadowSubset,blocker_shadowSubset,gobo_shadowSubset', ''))
+        self.assertEqual(table.get_bl_subsets(self.plane)[3:],
+                         ('key_shadowSubset,rim_shadowSubset,blocker_shadowSubset,gobo_shadowSubset', 'fill_shadowExcludeSubset'))
+        self.assertIn('fill_shadowInvertSubset', table.get_bl_subsets(self.sphere)[3].split(','))
+
+        for ob in [self.cube, self.sphere, self.plane, self.other]:
+            self.assertEqual(table.get_bl_subsets(ob), _old_bl_subsets(rman_scene.all_lights, ob))
+
+    # test that objects that aren't linked to anything share the same subsets
+    def test_bl_unlinked(self):
+        rman_scene = self._bl_scene()
+        table = scene_utils.RmanLightLinkTable(rman_scene)
+        subsets = table.get_bl_subsets(self.other)
+        self.assertEqual(subsets, _old_bl_subsets(rman_scene.all_lights, self.other))
+        self.assertIs(table.get_bl_subsets(_Ob('another')), subsets)
+
+        # a new light is only picked up after clear()
+        rman_scene.all_lights.append(_Light('bounce'))
+        self.assertIs(table.get_bl_subsets(self.other), subsets)
+        table.clear()
+        self.assertEqual(table.get_bl_subsets(self.other), _old_bl_subsets(rman_scene.all_lights, self.other))
+        self.assertIn('bounce_shadowSubset', table.get_bl_subsets(self.other)[3].split(','))
+
+    # test RenderMan's inverted light linking against the old per object loop
+    def test_rman_subsets(self):
+        cube = _Ob('cube')
+        sphere = _Ob('sphere')
+        other = _Ob('other')
+        key = _Light('key')
+        fill = _Light('fill')
+        rim = _Light('rim')
+        blocker = _Light('blocker', role='RMAN_LIGHTFILTER')
+        gobo = _Light('gobo', role='RMAN_LIGHTFILTER')
+        member = lambda ob: _Attrs(ob_pointer=ob)
+        light_links = [_Attrs(light_ob=key, members=[member(cube), member(sphere)]),
+                       _Attrs(light_ob=fill, members=[member(sphere)]),
+                       _Attrs(light_ob=blocker, members=[member(cube)])]
+        # for RenderMan's light linking, all_lights and all_lightfilters are lists of names
+        rman_scene = _rman_scene([l.name for l in [key, fill, rim]], [l.name for l in [blocker, gobo]], light_links)
+        table = scene_utils.RmanLightLinkTable(rman_scene)
+
+        # the unlinked lights and light filters are appended
+        self.assertEqual(table.get_rman_subsets(cube), ('key,rim', 'blocker,gobo'))
+        self.assertEqual(table.get_rman_subsets(sphere), ('key,fill,rim', ''))
+        self.assertEqual(table.get_rman_subsets(other), ('', ''))
+
+        for ob in [cube, sphere, other]:
+            self.assertEqual(table.get_rman_subsets(ob),
+                             _old_rman_subsets(rman_scene.all_lights, rman_scene.all_lightfilters, light_links, ob))
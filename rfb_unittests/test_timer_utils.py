@@ -0,0 +1,58 @@
+import unittest
+from ..rfb_utils.timer_utils import PollScheduler
+
+class TimerUtilsTest(unittest.TestCase):
+
+    @classmethod
+    def add_tests(self, suite):
+        suite.addTest(TimerUtilsTest('test_wait_notified'))
+        suite.addTest(TimerUtilsTest('test_wait_backoff'))
+        suite.addTest(TimerUtilsTest('test_next_interval'))
+        suite.addTest(TimerUtilsTest('test_reset'))
+
+    def _scheduler(self):
+        return PollScheduler(min_interval=0.001, max_interval=0.004, backoff=2.0)
+
+    # test that a notify wakes up wait() and resets the interval
+    def test_wait_notified(self):
+        sched = self._scheduler()
+        sched.interval = sched.max_interval
+        sched.notify()
+        self.assertTrue(sched.wait())
+        self.assertEqual(sched.interval, sched.min_interval)
+
+        # the notification was consumed
+        self.assertFalse(sched.wait())
+
+    # test that wait() backs off up to max_interval when nobody notifies
+    def test_wait_backoff(self):
+        sched = self._scheduler()
+        self.assertFalse(sched.wait())
+        self.assertEqual(sched.interval, 0.002)
+        self.assertFalse(sched.wait())
+        self.assertEqual(sched.interval, 0.004)
+        self.assertFalse(sched.wait())
+        self.assertEqual(sched.interval, sched.max_interval)
+
+    # test next_interval for timer functions
+    def test_next_interval(self):
+        sched = self._scheduler()
+        self.assertEqual(sched.next_interval(), 0.002)
+        self.assertEqual(sched.next_interval(), 0.004)
+        self.assertEqual(sched.next_interval(), sched.max_interval)
+        self.assertEqual(sched.next_interval(active=True), sched.min_interval)
+
+        sched.next_interval()
+        sched.notify()
+        self.assertEqual(sched.next_interval(), sched.min_interval)
+        # the notification was consumed
+        self.assertEqual(sched.next_interval(), 0.002)
+
+    # test that reset() drops a pending notify
+    def test_reset(self):
+        sched = self._scheduler()
+        sched.next_interval()
+        sched.notify()
+        sched.reset()
+        self.assertEqual(sched.interval, sched.min_interval)
+        self.assertFalse(sched.wait())
@@ -50,6 +50,20 @@ def view_file(file_path):
     except Exception as e:
         rfb_log().error("Open file with web browser failed: %s" % str(e))    
 
+def get_user_cache_path(filename):
+    """Return the path to one of our cache files, in Blender's user config directory.
+
+    Args:
+        filename (str) - name of the cache file
+
+    Returns:
+        (str) - path to the cache file. None if there's no user config directory
+    """
+    config_path = bpy.utils.user_resource('CONFIG')
+    if not config_path:
+        return None
+    return os.path.join(config_path, 'renderman', filename)
+
 def get_dump_rib_path(frame):
     if rman_constants.RFB_PLATFORM == "windows":
         return "C:/tmp/blender.%04d.rib" % frame
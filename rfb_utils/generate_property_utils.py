@@ -11,6 +11,20 @@ import bpy
 import sys
 import os
 
+# callback functions, keyed by the name or lambda expression used for them
+# in the args files
+__CALLBACK_FUNCTIONS__ = dict()
+
+def _get_function_(func_expr):
+    func = __CALLBACK_FUNCTIONS__.get(func_expr, None)
+    if func is None:
+        if func_expr.isidentifier():
+            func = globals()[func_expr]
+        else:
+            func = eval(func_expr, globals())
+        __CALLBACK_FUNCTIONS__[func_expr] = func
+    return func
+
 def update_colorspace_name(self, context, param_name):
     from . import texture_utils
     from . import scene_utils
@@ -341,14 +355,10 @@ def generate_property(node, sp, update_function=None, set_function=None, get_fun
     '''
 
     if isinstance(update_function, str):
-        lcls = locals()
-        exec('update_func = %s' % update_function, globals(), lcls)
-        update_function = lcls['update_func']        
+        update_function = _get_function_(update_function)
 
     if isinstance(set_function, str):
-        lcls = locals()
-        exec('set_func = %s' % set_function, globals(), lcls)
-        set_function = lcls['set_func']            
+        set_function = _get_function_(set_function)
 
     if param_widget == 'colorramp':
         from ..rman_properties.rman_properties_misc import RendermanBlColorRamp
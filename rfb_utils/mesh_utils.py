@@ -1,46 +1,97 @@
 import numpy as np
+import hashlib
 from ..rman_constants import BLENDER_41
 
 class RmanMesh:
+    '''
+    Container for the basic geometry of a mesh.
+
+    Attributes:
+        nverts (numpy.ndarray) - int32 number of vertices for each face
+        verts (numpy.ndarray) - int32 vertex indices for each face-vertex
+        P (numpy.ndarray) - float32 points, flattened
+        N (numpy.ndarray) - float32 normals, flattened. Can be None.
+    '''
+
+    __slots__ = ('nverts', 'verts', 'P', 'N', 'npolys', 'npoints', 'numnverts', 'nnormals',
+                 '_topology_digest', '_digest')
+
     def __init__(self, *args, **kwargs):
-        self.nverts = args[0]
-        self.verts = args[1]
-        self.P = args[2]
+        self.nverts = np.ascontiguousarray(args[0], dtype=np.int32)
+        self.verts = np.ascontiguousarray(args[1], dtype=np.int32)
+        self.P = np.ascontiguousarray(args[2], dtype=np.float32)
         self.N = args[3]
+        if self.N is not None:
+            self.N = np.ascontiguousarray(self.N, dtype=np.float32)
 
         self.npolys = len(self.nverts)
         self.npoints = int(len(self.P) / 3)
         self.numnverts = len(self.verts)
+        self.nnormals = 0
         if self.N is not None:
             self.nnormals = int(len(self.N) / 3)
+        self._topology_digest = None
+        self._digest = None
+
+    def topology_digest(self):
+        '''
+        Get a fingerprint of the mesh connectivity (nverts and verts). Two meshes
+        with the same digest can share the same Define and nvertices/vertices
+        primvars; only their points and normals may differ.
+
+        Returns:
+        (bytes) - blake2b digest of the nverts and verts buffers
+        '''
+        if self._topology_digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(self.nverts)
+            h.update(self.verts)
+            self._topology_digest = h.digest()
+        return self._topology_digest
+
+    def digest(self):
+        '''
+        Get a fingerprint of the whole mesh (topology, points and normals). The digest
+        is cached, so the arrays should not be modified in place after calling this.
+
+        Returns:
+        (bytes) - blake2b digest of the nverts, verts, P and N buffers
+        '''
+        if self._digest is None:
+            # adding 0.0 turns any -0.0 into 0.0, so meshes that compare
+            # equal also have the same digest
+            h = hashlib.blake2b(self.topology_digest(), digest_size=16)
+            h.update(self.P + np.float32(0.0))
+            if self.N is not None:
+                h.update(self.N + np.float32(0.0))
+            self._digest = h.digest()
+        return self._digest
 
     def __eq__(self, other):
-        self_nverts = self.nverts
-        self_verts = self.verts
-        self_P = self.P
-        self_N = self.N
-
-        other_nverts = other.nverts
-        other_verts = other.verts
-        other_P = other.P
-        other_N = other.N
-
-        # convert these to lists
-        if isinstance(self.nverts, np.ndarray):
-            self_nverts = self.nverts.tolist()
-            self_verts = self.verts.tolist()
-            self_P = self.P.tolist()
-            self_N = self.N.tolist()
-        if isinstance(other.nverts, np.ndarray):
-            other_nverts = other.nverts.tolist()
-            other_verts = other.verts.tolist()
-            other_P = other.P.tolist()
-            other_N = other.N.tolist()
-
-        if self_nverts != other_nverts or self_verts != other_verts or self_P != other_P or self_N != other_N:
+        if not isinstance(other, RmanMesh):
+            return NotImplemented
+        if self is other:
+            return True
+        if self.npolys != other.npolys or self.npoints != other.npoints or self.numnverts != other.numnverts:
+            return False
+        if (self.N is None) != (other.N is None):
+            return False
+        if self._digest is not None and other._digest is not None:
+            return self._digest == other._digest
+
+        if not np.array_equal(self.nverts, other.nverts):
+            return False
+        if not np.array_equal(self.verts, other.verts):
+            return False
+        if not np.array_equal(self.P, other.P):
+            return False
+        if self.N is not None and not np.array_equal(self.N, other.N):
             return False
         return True
 
+    def __hash__(self):
+        return hash(self.digest())
+
 
 def get_mesh_points_(mesh):
     '''
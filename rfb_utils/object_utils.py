@@ -1,10 +1,54 @@
 import bpy
+import hashlib
 from .prefs_utils import get_pref
 from . import string_utils
 
 # These types don't create instances
 _RMAN_NO_INSTANCES_ = ['EMPTY', 'EMPTY_INSTANCER', 'LIGHTFILTER']
 
+# Caches for prototype_key and get_group_db_name. These are only valid for
+# one depsgraph evaluation; call clear_instance_caches whenever the depsgraph
+# is updated.
+__PROTOTYPE_KEY_CACHE__ = dict()
+__GROUP_DB_NAME_CACHE__ = dict()
+__MAX_INSTANCE_CACHE_SIZE__ = 1000000
+
+# Cache for get_stable_id. The IDs only depend on the name, so this never
+# needs to be invalidated.
+__STABLE_ID_CACHE__ = dict()
+
+def clear_instance_caches():
+    __PROTOTYPE_KEY_CACHE__.clear()
+    __GROUP_DB_NAME_CACHE__.clear()
+
+def get_stable_id(name):
+    '''
+    Get an integer ID for a name, for when we don't have a persistent ID. 
+    The ID is a hash of the name, so it's the same between sessions.
+
+    Args:
+        name (str) - the name to get an ID for
+
+    Returns:
+        (int) - the ID
+    '''
+    stable_id = __STABLE_ID_CACHE__.get(name, None)
+    if stable_id is None:
+        if len(__STABLE_ID_CACHE__) >= __MAX_INSTANCE_CACHE_SIZE__:
+            __STABLE_ID_CACHE__.clear()
+        stable_id = int(hashlib.sha1(name.encode()).hexdigest(), 16) % 10**8
+        __STABLE_ID_CACHE__[name] = stable_id
+    return stable_id
+
+def _instance_cache_key_(ob):
+    # DepsgraphObjectInstance.object can be a temporary object that Blender reuses
+    # for each instance, so for instances we also need the persistent_id
+    if isinstance(ob, bpy.types.DepsgraphObjectInstance):
+        if ob.is_instance:
+            return (ob.object.as_pointer(), ob.parent.as_pointer(), tuple(ob.persistent_id))
+        return (ob.object.as_pointer(),)
+    return (ob.as_pointer(), False)
+
 def get_db_name(ob, rman_type='', psys=None):
     db_name = ''    
 
@@ -41,6 +85,19 @@ def get_db_name(ob, rman_type='', psys=None):
     return string_utils.sanitize_node_name(db_name)
 
 def get_group_db_name(ob_inst):
+    try:
+        key = _instance_cache_key_(ob_inst)
+    except AttributeError:
+        return _get_group_db_name_(ob_inst)
+    group_db_name = __GROUP_DB_NAME_CACHE__.get(key, None)
+    if group_db_name is None:
+        if len(__GROUP_DB_NAME_CACHE__) >= __MAX_INSTANCE_CACHE_SIZE__:
+            __GROUP_DB_NAME_CACHE__.clear()
+        group_db_name = _get_group_db_name_(ob_inst)
+        __GROUP_DB_NAME_CACHE__[key] = group_db_name
+    return group_db_name
+
+def _get_group_db_name_(ob_inst):
     if isinstance(ob_inst, bpy.types.DepsgraphObjectInstance):
         if ob_inst.is_instance:
             ob = ob_inst.instance_object
@@ -188,7 +245,19 @@ def find_parent(ob):
 
 
 def prototype_key(ob):
-    use_gpu_subdiv = getattr(bpy.context.preferences.system, 'use_gpu_subdivision', False)
+    try:
+        key = _instance_cache_key_(ob)
+    except AttributeError:
+        return _prototype_key_(ob)
+    proto_key = __PROTOTYPE_KEY_CACHE__.get(key, None)
+    if proto_key is None:
+        if len(__PROTOTYPE_KEY_CACHE__) >= __MAX_INSTANCE_CACHE_SIZE__:
+            __PROTOTYPE_KEY_CACHE__.clear()
+        proto_key = _prototype_key_(ob)
+        __PROTOTYPE_KEY_CACHE__[key] = proto_key
+    return proto_key
+
+def _prototype_key_(ob):
     if isinstance(ob, bpy.types.DepsgraphObjectInstance):
         if ob.is_instance:
             if ob.object.data:
@@ -1,76 +1,149 @@
-from mathutils import Vector
+import bpy
+import numpy as np
 
 def valid_particle(pa, valid_frames):
     return pa.die_time >= valid_frames[-1] and pa.birth_time <= valid_frames[0]
 
-def get_particles(ob, psys, inv_mtx, frame, valid_frames=None, get_next_P=False, get_width=True):
-    P = []
-    next_P = []
-    width = []
+class ParticleArrays(object):
+    '''
+    Reads the per-particle properties of a particle system into numpy arrays
+    with foreach_get. Each property is only read once, the first time it's asked
+    for, and the validity mask is cached for each set of valid frames. The same
+    instance can be shared between get_particles and get_primvars_particle.
+
+    Attributes:
+        psys (bpy.types.ParticleSystem) - the particle system
+        count (int) - the number of particles in the system
+    '''
+
+    # number of components for the properties we read
+    COMPONENTS = {
+        'location': 3,
+        'velocity': 3,
+        'angular_velocity': 3,
+        'size': 1,
+        'birth_time': 1,
+        'die_time': 1,
+        'lifetime': 1,
+    }
+
+    def __init__(self, psys):
+        self.psys = psys
+        self.count = len(psys.particles)
+        self._arrays = dict()
+        self._masks = dict()
+
+    def get(self, attr):
+        arr = self._arrays.get(attr, None)
+        if arr is None:
+            ncomps = ParticleArrays.COMPONENTS[attr]
+            arr = np.zeros(self.count * ncomps, dtype=np.float32)
+            if self.count:
+                self.psys.particles.foreach_get(attr, arr)
+            if ncomps > 1:
+                arr = arr.reshape(-1, ncomps)
+            self._arrays[attr] = arr
+        return arr
+
+    def get_alive(self):
+        arr = self._arrays.get('alive_state', None)
+        if arr is None:
+            alive_value = bpy.types.Particle.bl_rna.properties['alive_state'].enum_items['ALIVE'].value
+            arr = np.zeros(self.count, dtype=np.int32)
+            try:
+                if self.count:
+                    self.psys.particles.foreach_get('alive_state', arr)
+                arr = (arr == alive_value)
+            except (TypeError, RuntimeError):
+                arr = np.fromiter((pa.alive_state == 'ALIVE' for pa in self.psys.particles),
+                                  dtype=bool, count=self.count)
+            self._arrays['alive_state'] = arr
+        return arr
+
+    def get_valid_mask(self, valid_frames):
+        key = (valid_frames[0], valid_frames[-1])
+        mask = self._masks.get(key, None)
+        if mask is None:
+            mask = (self.get('die_time') >= valid_frames[-1]) & (self.get('birth_time') <= valid_frames[0])
+            self._masks[key] = mask
+        return mask
+
+def _transform_points_(mtx, pts):
+    m = np.array(mtx, dtype=np.float32)
+    return pts @ m[:3, :3].T + m[:3, 3]
+
+def get_particles(ob, psys, inv_mtx, frame, valid_frames=None, get_next_P=False, get_width=True, particle_arrays=None):
+    '''
+    Get the points, next frame points and widths of the valid particles
+    in a particle system.
+
+    Returns:
+    (tuple) - P, next_P and width, as flat numpy float32 arrays. next_P and
+            width are empty if they weren't asked for
+    '''
 
     valid_frames = (frame,
                     frame) if valid_frames is None else valid_frames
-    
+
     rm = psys.settings.renderman
+    if particle_arrays is None:
+        particle_arrays = ParticleArrays(psys)
+
+    mask = particle_arrays.get_valid_mask(valid_frames)
+    location = particle_arrays.get('location')[mask]
+    P = _transform_points_(inv_mtx, location).astype(np.float32).reshape(-1)
+    next_P = np.zeros(0, dtype=np.float32)
+    width = np.zeros(0, dtype=np.float32)
+
+    if get_next_P:
+        # calculate the point for the next frame using velocity
+        # particles with a zero lifetime don't move
+        lifetime = particle_arrays.get('lifetime')[mask][:, None]
+        velocity = particle_arrays.get('velocity')[mask]
+        vel = np.divide(velocity, lifetime, out=np.zeros_like(velocity), where=lifetime != 0) * rm.scale_velocity_blur
+        next_P = _transform_points_(inv_mtx, location + vel).astype(np.float32).reshape(-1)
 
-    for pa in [p for p in psys.particles if valid_particle(p, valid_frames)]:
-        pt = inv_mtx @ pa.location
-        P.append(pt)
-        
-        if get_next_P:
-            # calculate the point for the next frame using velocity
-            vel = Vector(pa.velocity / pa.lifetime ) * rm.scale_velocity_blur
-            next_P.append( inv_mtx @ (Vector(pa.location) + vel))
-
-        if get_width:
-            if pa.alive_state != 'ALIVE':
-                width.append(0.0)
-            else:
-                width.append(pa.size)
-    return (P, next_P, width)    
-
-def get_primvars_particle(primvar, frame, psys, subframes, sample):
+    if get_width:
+        width = np.where(particle_arrays.get_alive()[mask], particle_arrays.get('size')[mask], 0.0).astype(np.float32)
+
+    return (P, next_P, width)
+
+def get_primvars_particle(primvar, frame, psys, subframes, sample, particle_arrays=None):
     rm = psys.settings.renderman
+    if particle_arrays is None:
+        particle_arrays = ParticleArrays(psys)
+    if len(rm.prim_vars) < 1:
+        return
+    mask = particle_arrays.get_valid_mask(subframes)
 
     for p in rm.prim_vars:
-        pvars = []
+        pvars = None
 
         if p.data_source in ('VELOCITY', 'ANGULAR_VELOCITY'):
             if p.data_source == 'VELOCITY':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.velocity)
+                pvars = particle_arrays.get('velocity')[mask]
             elif p.data_source == 'ANGULAR_VELOCITY':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.angular_velocity)
+                pvars = particle_arrays.get('angular_velocity')[mask]
 
-            primvar.SetVectorDetail(p.name, pvars, "vertex", sample)
+            pvars = np.ascontiguousarray(pvars, dtype=np.float32).reshape(-1)
+            primvar.SetVectorDetail(p.name, pvars.data, "vertex", sample)
 
         elif p.data_source in \
                 ('SIZE', 'AGE', 'BIRTH_TIME', 'DIE_TIME', 'LIFE_TIME', 'ID'):
             if p.data_source == 'SIZE':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.size)
+                pvars = particle_arrays.get('size')[mask]
             elif p.data_source == 'AGE':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append((frame - pa.birth_time) / pa.lifetime)
+                lifetime = particle_arrays.get('lifetime')[mask]
+                age = frame - particle_arrays.get('birth_time')[mask]
+                pvars = np.divide(age, lifetime, out=np.zeros_like(age), where=lifetime != 0)
             elif p.data_source == 'BIRTH_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.birth_time)
+                pvars = particle_arrays.get('birth_time')[mask]
             elif p.data_source == 'DIE_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.die_time)
+                pvars = particle_arrays.get('die_time')[mask]
             elif p.data_source == 'LIFE_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.lifetime)
+                pvars = particle_arrays.get('lifetime')[mask]
             elif p.data_source == 'ID':
-                pvars = [id for id, p in psys.particles.items(
-                ) if valid_particle(p, subframes)]
-            
-            primvar.SetFloatDetail(p.name, pvars, "vertex", sample)  
\ No newline at end of file
+                pvars = np.flatnonzero(mask)
+
+            pvars = np.ascontiguousarray(pvars, dtype=np.float32)
+            primvar.SetFloatDetail(p.name, pvars.data, "vertex", sample)
@@ -107,6 +107,13 @@ def update_conditional_visops(node):
                 except:
                     rfb_log().debug("Error in conditional visop: %s" % (cond_expr))
 
+def update_node_param_func(self, context, param_name):
+    # a parameter on a pattern, bxdf or displacement node changed. During IPR,
+    # try to only update this parameter, instead of the whole material
+    node = self.node if hasattr(self, 'node') else self
+    scenegraph_utils.update_sg_material_node_param(node, param_name, context)
+    update_func(self, context)
+
 def update_func_with_inputs(self, context):
     # check if this prop is set on an input
     node = self.node if hasattr(self, 'node') else self
@@ -0,0 +1,164 @@
+"""On-disk cache of parsed node descriptions.
+
+Parsing all of the .args and .oso files in the shader registration paths is one
+of the slowest parts of loading the add-on, especially when RMANTREE is on a
+network drive. The parsed RfbNodeDesc's are pickled into a single file, keyed
+by each file's path, modification time and size. The whole cache is thrown
+away if the RenderMan build, the add-on version or CACHE_VERSION changes.
+
+The cache can be moved with the RFB_NODE_DESC_CACHE environment variable, and
+turned off by setting RFB_NO_NODE_DESC_CACHE.
+
+Example:
+    cache = RfbNodeDescCache()
+    cache.load()
+    node_desc = cache.get(filepath)
+    if node_desc is None:
+        node_desc = RfbNodeDesc(filepath)
+        cache.put(filepath, node_desc)
+    ...
+    cache.save()
+"""
+
+import os
+import sys
+import pickle
+from ...rfb_logger import rfb_log
+from ..envconfig_utils import envconfig
+from .. import filepath_utils
+from ... import rman_constants
+
+# bump this whenever RfbNodeDesc, or how we parse node descriptions, changes
+CACHE_VERSION = 1
+CACHE_FILENAME = 'rfb_node_desc_cache.pickle'
+
+
+def get_cache_path():
+    """Return the path to the cache file, or None if caching is turned off."""
+    if envconfig().getenv('RFB_NO_NODE_DESC_CACHE', False):
+        return None
+    filepath = envconfig().getenv('RFB_NODE_DESC_CACHE', '')
+    if filepath:
+        return filepath
+    return filepath_utils.get_user_cache_path(CACHE_FILENAME)
+
+
+def _build_key():
+    build_info = envconfig().build_info
+    if build_info is None:
+        return None
+    return (CACHE_VERSION, rman_constants.RFB_ADDON_VERSION_STRING,
+            build_info.version(), build_info.id(), envconfig().rmantree,
+            tuple(sys.version_info[:2]))
+
+
+def _file_stamp(filepath):
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class RfbNodeDescCache(object):
+    """Cache of parsed node descriptions, stored on disk.
+
+    Entries are stored as pickled bytes, so every get() returns a fresh copy
+    that the caller is free to modify (ex: apply_args_overrides). Only the
+    entries that were asked for, or added, since load() are written back by
+    save(), so files that have been deleted drop out of the cache.
+
+    Attributes:
+        filepath (str) - path to the cache file. None if caching is turned off
+        build_key (tuple) - the versions the cache is valid for
+        entries (dict) - file path to a (stamp, pickled node desc) tuple
+        used (dict) - the entries to write back out in save()
+        dirty (bool) - whether anything changed since load()
+        hits (int) - number of node descriptions that came from the cache
+        misses (int) - number of node descriptions that had to be parsed
+    """
+
+    def __init__(self, filepath=None):
+        self.filepath = filepath if filepath else get_cache_path()
+        self.build_key = _build_key()
+        if self.build_key is None:
+            self.filepath = None
+        self.entries = dict()
+        self.used = dict()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        if not self.filepath or not os.path.exists(self.filepath):
+            return
+        try:
+            with open(self.filepath, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            rfb_log().debug("Could not read node description cache %s: %s" % (self.filepath, str(e)))
+            return
+        if not isinstance(data, dict) or data.get('build_key', None) != self.build_key:
+            rfb_log().debug("Node description cache is out of date: %s" % self.filepath)
+            self.dirty = True
+            return
+        self.entries = data.get('entries', dict())
+
+    def get(self, filepath):
+        """Return the cached node description for filepath, or None if
+        there isn't one or the file has changed since it was cached.
+        """
+        if not self.filepath:
+            return None
+        stamp = _file_stamp(filepath)
+        entry = self.entries.get(filepath, None)
+        if stamp is None or entry is None or entry[0] != stamp:
+            self.misses += 1
+            return None
+        try:
+            node_desc = pickle.loads(entry[1])
+        except Exception as e:
+            rfb_log().debug("Could not load cached node description for %s: %s" % (filepath, str(e)))
+            self.misses += 1
+            return None
+        self.used[filepath] = entry
+        self.hits += 1
+        return node_desc
+
+    def put(self, filepath, node_desc):
+        """Add a freshly parsed node description to the cache. This should be
+        called before anything modifies node_desc.
+        """
+        if not self.filepath:
+            return
+        stamp = _file_stamp(filepath)
+        if stamp is None:
+            return
+        try:
+            entry = (stamp, pickle.dumps(node_desc, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            rfb_log().debug("Could not cache node description for %s: %s" % (filepath, str(e)))
+            return
+        self.used[filepath] = entry
+        self.dirty = True
+
+    def save(self):
+        if not self.filepath:
+            return
+        if not self.dirty and len(self.used) == len(self.entries):
+            return
+        data = {'build_key': self.build_key, 'entries': self.used}
+        tmp_path = '%s.%d.tmp' % (self.filepath, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # replace in one go, in case another Blender is reading the cache
+            os.replace(tmp_path, self.filepath)
+        except Exception as e:
+            rfb_log().debug("Could not write node description cache %s: %s" % (self.filepath, str(e)))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.entries = self.used
+        self.dirty = False
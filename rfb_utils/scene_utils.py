@@ -232,6 +232,434 @@ class BlAttribute:
                 continue
             BlAttribute.set_rman_primvar(primvar, rman_attr)
 
+class RmanInstanceRecord:
+    '''
+    A record of a non-instance bpy.types.DepsgraphObjectInstance that we've
+    exported. It has the same attributes that our instance handling code reads
+    from a DepsgraphObjectInstance, so it can stand in for one during IPR.
+
+    Attributes:
+        object (bpy.types.Object) - the evaluated object. Only valid after RmanInstanceIndex.get_records
+        proto_key (str) - the prototype key for the object
+        group_db_name (str) - the name of the instance group
+        persistent_id (tuple) - the persistent ID of the DepsgraphObjectInstance
+        show_particles (bool) - the show_particles of the DepsgraphObjectInstance
+    '''
+
+    is_instance = False
+    parent = None
+    instance_object = None
+    particle_system = None
+
+    def __init__(self, ob_inst, proto_key, group_db_name):
+        ob = ob_inst.object
+        self.object = None
+        self.proto_key = proto_key
+        self.group_db_name = group_db_name
+        self.persistent_id = tuple(ob_inst.persistent_id)
+        self.show_particles = ob_inst.show_particles
+        self.name = ob.name_full
+        self.data_name = ob.data.name_full if ob.data else ''
+
+    @property
+    def matrix_world(self):
+        return self.object.matrix_world
+
+    @property
+    def name_full(self):
+        return self.object.name_full
+
+class RmanInstanceIndex:
+    '''
+    A persistent index from original objects to the instance that was exported 
+    for them. During IPR, this lets us update the instances of an edited object 
+    without walking all of depsgraph.object_instances.
+
+    Only objects that are neither instanced nor instancers are indexed. Anything
+    that's part of an instancer (ex: geometry nodes, particle instancers, collection
+    instances) is remembered in instancers, and edits to those still need to go 
+    through the full walk.
+
+    Attributes:
+        records (dict) - original objects to their RmanInstanceRecord
+        instancers (set) - original objects that are instanced or are instancers
+    '''
+
+    def __init__(self):
+        self.records = dict()
+        self.instancers = set()
+
+    def clear(self):
+        self.records.clear()
+        self.instancers.clear()
+
+    def add(self, ob_inst, proto_key, group_db_name=None):
+        if ob_inst.is_instance:
+            self.instancers.add(ob_inst.instance_object.original)
+            self.instancers.add(ob_inst.parent.original)
+            return
+        if group_db_name is None:
+            group_db_name = object_utils.get_group_db_name(ob_inst)
+        self.records[ob_inst.object.original] = RmanInstanceRecord(ob_inst, proto_key, group_db_name)
+
+    def remove(self, ob):
+        self.records.pop(ob, None)
+
+    def get_records(self, obs, depsgraph):
+        '''
+        Get the records for a list of original objects. 
+
+        Returns:
+            (list) - (original object, RmanInstanceRecord) tuples, or None if any of the objects 
+                    is not indexed, or can't be updated without walking all instances
+        '''
+        records = list()
+        for ob in obs:
+            if not isinstance(ob, bpy.types.Object):
+                return None
+            if ob.type == 'CAMERA':
+                # cameras are handled elsewhere
+                continue
+            if ob in self.instancers:
+                return None
+            record = self.records.get(ob, None)
+            if record is None:
+                return None
+            try:
+                ob_eval = ob.evaluated_get(depsgraph)
+            except ReferenceError:
+                return None
+            # if the object or its data was renamed, our names
+            # and prototype key are stale
+            data_name = ob_eval.data.name_full if ob_eval.data else ''
+            if ob_eval.name_full != record.name or data_name != record.data_name:
+                return None
+            record.object = ob_eval
+            records.append((ob, record))
+        return records
+
+class RmanLightLinkTable:
+    '''
+    Inverted light linking tables. Rather than looking through every light's
+    collections for every object we export, we go through the lights once and 
+    record which objects are linked to them. Objects that aren't linked to any
+    light all share the same subsets.
+
+    The tables are built the first time they're needed, from rman_scene.all_lights
+    and rman_scene.all_lightfilters, and need to be cleared whenever those change.
+
+    Attributes:
+        rman_scene (RmanScene) - pointer back to RmanScene
+        lights (list) - for Blender's light linking, a (name, role, has_receivers, has_blockers)
+                        tuple for each light
+        bl_linked (dict) - for Blender's light linking, object names to a dictionary of light index
+                        to the object's [receiver, blocker] link states for that light
+        rman_linked (dict) - for RenderMan's light linking, original objects to the 
+                        ([lights], [light filters]) they're linked to
+        unlinked_lights (list) - names of the lights that are not in any RenderMan light link
+        unlinked_lightfilters (list) - names of the light filters that are not in any RenderMan light link
+        subsets (dict) - cache of the subsets we've computed for each object
+    '''
+
+    def __init__(self, rman_scene):
+        self.rman_scene = rman_scene
+        self.clear()
+
+    def clear(self):
+        self.lights = None
+        self.bl_linked = None
+        self.rman_linked = None
+        self.unlinked_lights = None
+        self.unlinked_lightfilters = None
+        self.subsets = dict()
+
+    def _build_bl_tables_(self):
+        self.lights = list()
+        self.bl_linked = dict()
+        for i, light in enumerate(self.rman_scene.all_lights):
+            light = light.original
+            light_props = shadergraph_utils.get_rman_light_properties_group(light)
+            receivers = light.light_linking.receiver_collection
+            blockers = light.light_linking.blocker_collection
+            self.lights.append((string_utils.sanitize_node_name(light.name), 
+                                light_props.renderman_light_role, 
+                                receivers is not None, 
+                                blockers is not None))
+            for j, coll in enumerate([receivers, blockers]):
+                if not coll:
+                    continue
+                for o, co in zip(coll.objects, coll.collection_objects):
+                    links = self.bl_linked.setdefault(o.name, dict())
+                    links.setdefault(i, [None, None])[j] = co.light_linking.link_state
+
+    def get_bl_subsets(self, ob):
+        '''
+        Get the light linking subsets for an object, using Blender's light linking.
+
+        Returns:
+            (tuple) - the exclude, include, light filter, shadow and shadow exclude subsets, 
+                    as comma separated strings
+        '''
+        if self.lights is None:
+            self._build_bl_tables_()
+        links = self.bl_linked.get(ob.name, None)
+        key = ('BL', ob.name if links else None)
+        subsets = self.subsets.get(key, None)
+        if subsets is not None:
+            return subsets
+
+        exclude_subset = []
+        include_subset = []
+        lightfilter_subset = []
+        shadow_subset = []
+        shadow_exclude = []
+        for i, (nm, role, has_receivers, has_blockers) in enumerate(self.lights):
+            receiver_state, blocker_state = links.get(i, (None, None)) if links else (None, None)
+            if has_receivers:
+                if receiver_state is not None:
+                    if role == 'RMAN_LIGHT':
+                        if receiver_state == 'EXCLUDE':
+                            exclude_subset.append(nm)
+                        else:
+                            include_subset.append(nm)
+                    elif receiver_state == 'INCLUDE':
+                        lightfilter_subset.append(nm)
+                    else:
+                        lightfilter_subset.append("-%s" % nm)
+            elif role == 'RMAN_LIGHTFILTER':
+                lightfilter_subset.append(nm)
+
+            if has_blockers:
+                if blocker_state is not None:
+                    if role == 'RMAN_LIGHT':
+                        if blocker_state == 'EXCLUDE':
+                            shadow_exclude.append(nm + "_shadowExcludeSubset")
+                        else:
+                            shadow_subset.append(nm + "_shadowSubset")
+                else:
+                    # if the object is not in the blocker collection, add it to the
+                    # invert subset.
+                    shadow_subset.append(nm + "_shadowInvertSubset")
+            else:
+                shadow_subset.append(nm + "_shadowSubset")
+
+        subsets = (','.join(exclude_subset), ','.join(include_subset), ','.join(lightfilter_subset),
+                    ','.join(shadow_subset), ','.join(shadow_exclude))
+        self.subsets[key] = subsets
+        return subsets
+
+    def _build_rman_tables_(self):
+        self.rman_linked = dict()
+        linked_names = (set(), set())
+        for ll in self.rman_scene.bl_scene.renderman.light_links:
+            light_ob = ll.light_ob
+            if light_ob is None:
+                continue
+            light_props = shadergraph_utils.get_rman_light_properties_group(light_ob)
+            if light_props.renderman_light_role == 'RMAN_LIGHT':
+                j = 0
+            elif light_props.renderman_light_role == 'RMAN_LIGHTFILTER':
+                j = 1
+            else:
+                continue
+            nm = string_utils.sanitize_node_name(light_ob.name)
+            linked_names[j].add(nm)
+            members = set()
+            for member in ll.members:
+                if member.ob_pointer is None:
+                    continue
+                ob = member.ob_pointer.original
+                if ob in members:
+                    continue
+                members.add(ob)
+                self.rman_linked.setdefault(ob, ([], []))[j].append(nm)
+
+        self.unlinked_lights = [nm for nm in self.rman_scene.all_lights if nm not in linked_names[0]]
+        self.unlinked_lightfilters = [nm for nm in self.rman_scene.all_lightfilters if nm not in linked_names[1]]
+
+    def get_rman_subsets(self, ob):
+        '''
+        Get the light linking subsets for an object, using RenderMan's inverted light linking.
+
+        Returns:
+            (tuple) - the lighting and light filter subsets, as comma separated strings. 
+                    These are empty if the object is not linked to any lights or light filters
+        '''
+        if self.rman_linked is None:
+            self._build_rman_tables_()
+        linked = self.rman_linked.get(ob.original, None)
+        if linked is None:
+            return ('', '')
+        key = ('RMAN', ob.original)
+        subsets = self.subsets.get(key, None)
+        if subsets is not None:
+            return subsets
+
+        lighting_subset, lightfilter_subset = linked
+        if lighting_subset:
+            # include all other lights that are not linked
+            lighting_subset = lighting_subset + self.unlinked_lights
+        if lightfilter_subset:
+            lightfilter_subset = lightfilter_subset + self.unlinked_lightfilters
+        subsets = (','.join(lighting_subset), ','.join(lightfilter_subset))
+        self.subsets[key] = subsets
+        return subsets
+
+class RmanLightInventory:
+    '''
+    A live list of the lights, light filters and mesh lights in the scene. During IPR,
+    this saves us from going through all of scene.objects, and their materials, every 
+    time we need the list of lights.
+
+    The inventory is rebuilt from scratch the first time it's needed after invalidate().
+    Otherwise, call update_object when an object changes, and material_updated when a
+    material changes.
+
+    Attributes:
+        lights (dict) - the original light, light filter and mesh light objects. Only the keys
+                        are used; we use a dict to keep the objects in order
+        meshlight_materials (set) - names of the materials we've seen that are mesh lights
+        valid (bool) - whether lights is up to date
+    '''
+
+    def __init__(self):
+        self.lights = dict()
+        self.meshlight_materials = set()
+        self.valid = False
+
+    def clear(self):
+        self.lights.clear()
+        self.meshlight_materials.clear()
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def _rebuild_(self, scene):
+        self.lights.clear()
+        for ob in scene.objects:
+            if not _is_light_object_(ob):
+                continue
+            self.lights[ob.original] = None
+            if ob.type != 'LIGHT':
+                self.meshlight_materials.add(ob.active_material.original.name_full)
+        self.valid = True
+
+    def update_object(self, ob):
+        if not self.valid:
+            return
+        ob = ob.original
+        if _is_light_object_(ob):
+            self.lights[ob] = None
+        else:
+            self.lights.pop(ob, None)
+
+    def material_updated(self, mat):
+        # we only need to rebuild if a material turned into a 
+        # mesh light, or stopped being one
+        name = mat.original.name_full
+        was_meshlight = name in self.meshlight_materials
+        is_meshlight = _is_meshlight_material_(mat)
+        if is_meshlight:
+            self.meshlight_materials.add(name)
+        else:
+            self.meshlight_materials.discard(name)
+        if is_meshlight != was_meshlight:
+            self.valid = False
+
+    def _get_lights_(self, scene):
+        if not self.valid:
+            self._rebuild_(scene)
+        try:
+            return [ob for ob in self.lights if ob.type]
+        except ReferenceError:
+            # one of our objects was deleted
+            self._rebuild_(scene)
+            return list(self.lights)
+
+    def get_lights(self, scene, include_light_filters=True):
+        '''
+        The equivalent of get_all_lights, using the inventory.
+        '''
+        return _filter_lights_(self._get_lights_(scene), include_light_filters=include_light_filters)
+
+    def get_lightfilters(self, scene):
+        '''
+        The equivalent of get_all_lightfilters, using the inventory.
+        '''
+        return [ob for ob in self._get_lights_(scene) if ob.type == 'LIGHT' and ob.data.renderman.renderman_light_role == 'RMAN_LIGHTFILTER']
+
+class RmanMotionPrototype:
+    '''
+    A prototype that needs deformation samples during a motion blur export.
+
+    Attributes:
+        rman_sg_node (RmanSgNode) - the prototype
+        deforming (bool) - whether the prototype itself needs deformation samples
+        steps (dict) - the prototype's deform motion steps, to their sample index
+        sampled (set) - the motion steps we've already exported for the prototype
+        hair (dict) - original particle settings to a (RmanSgParticles, steps, sampled) tuple
+                    for each hair system that needs deformation samples
+    '''
+
+    def __init__(self, rman_sg_node):
+        self.rman_sg_node = rman_sg_node
+        self.deforming = rman_sg_node.is_deforming and rman_sg_node.rman_type in ['MESH', 'FLUID', 'CURVES']
+        self.steps = {s: i for i, s in enumerate(rman_sg_node.deform_motion_steps)}
+        self.sampled = set()
+        self.hair = dict()
+
+    def add_hair(self, psys, rman_sg_particles):
+        steps = {s: i for i, s in enumerate(rman_sg_particles.motion_steps)}
+        self.hair[psys.settings.original] = (rman_sg_particles, steps, set())
+
+class RmanMotionInstances:
+    '''
+    The instances that are moving or deforming during a motion blur export. These
+    are collected while exporting the first motion sample, so that the rest of
+    the samples only need to visit them, rather than all of depsgraph.object_instances.
+
+    Objects that are not instanced are looked up directly with evaluated_get.
+    Instances still need a walk of depsgraph.object_instances, but only the
+    ones belonging to an instancer in instancers are looked at.
+
+    Attributes:
+        objects (dict) - original objects to their (RmanTransformSamples, RmanMotionPrototype) tuple.
+                        Either can be None.
+        instances (dict) - group db names of moving instances to their RmanTransformSamples
+        prototypes (dict) - prototype keys to their RmanMotionPrototype
+        instancers (set) - original objects that are the parents of moving or deforming instances
+        transform_samples (list) - all of the RmanTransformSamples
+    '''
+
+    def __init__(self):
+        self.objects = dict()
+        self.instances = dict()
+        self.prototypes = dict()
+        self.instancers = set()
+        self.transform_samples = list()
+
+    def get_prototype(self, proto_key, rman_sg_node):
+        motion_proto = self.prototypes.get(proto_key, None)
+        if motion_proto is None:
+            motion_proto = RmanMotionPrototype(rman_sg_node)
+            self.prototypes[proto_key] = motion_proto
+        return motion_proto
+
+    def add(self, ob_inst, group_db_name, transform_samples, motion_proto):
+        if motion_proto and not (motion_proto.deforming or motion_proto.hair):
+            motion_proto = None
+        if transform_samples is None and motion_proto is None:
+            return
+        if transform_samples:
+            self.transform_samples.append(transform_samples)
+        if ob_inst.is_instance:
+            self.instancers.add(ob_inst.parent.original)
+            if transform_samples:
+                self.instances[group_db_name] = transform_samples
+            return
+        self.objects[ob_inst.object.original] = (transform_samples, motion_proto)
+
 # ------------- Filtering -------------
 def is_visible_layer(scene, ob):
     #
@@ -390,6 +818,69 @@ def get_light_group(light_ob, scene):
                 return lg.name
     return ''         
 
+# Object group membership for each scene. Built the first time it's needed, and 
+# cleared with clear_object_groups_index whenever object groups are edited, and 
+# at the start of every export or sync.
+__OBJECT_GROUPS_INDEX__ = dict()
+
+def clear_object_groups_index():
+    __OBJECT_GROUPS_INDEX__.clear()
+
+def get_object_groups_membership(scene, ob):
+    """Return the names of the object groups that this
+    object is a member of
+
+    Args:
+    scene (byp.types.Scene) - scene file to look for object groups
+    ob (bpy.types.Object) - object we are interested in
+
+    Returns:
+    (str) - comma separated list of object group names, starting with a
+            comma, or an empty string if the object is not in any group
+    """
+
+    index = __OBJECT_GROUPS_INDEX__.get(scene.name_full, None)
+    if index is None:
+        index = dict()
+        for obj_group in scene.renderman.object_groups:
+            members = set()
+            for member in obj_group.members:
+                if member.ob_pointer is None:
+                    continue
+                key = member.ob_pointer.original
+                if key in members:
+                    continue
+                members.add(key)
+                index.setdefault(key, []).append(obj_group.name)
+        index = {k: ''.join(',' + nm for nm in v) for k, v in index.items()}
+        __OBJECT_GROUPS_INDEX__[scene.name_full] = index
+    return index.get(ob.original, '')
+
+def _is_meshlight_material_(mat):
+    output = shadergraph_utils.is_renderman_nodetree(mat)
+    if not output:
+        return False
+    if len(output.inputs) > 1:
+        socket = output.inputs[1]
+        if socket.is_linked:
+            node = socket.links[0].from_node
+            if node.bl_label == 'PxrMeshLight':
+                return True
+    return False
+
+def _is_light_object_(ob):
+    if ob.type == 'LIGHT':
+        return hasattr(ob.data, 'renderman')
+    mat = getattr(ob, 'active_material', None)
+    if not mat:
+        return False
+    return _is_meshlight_material_(mat)
+
+def _filter_lights_(obs, include_light_filters=True):
+    if include_light_filters:
+        return list(obs)
+    return [ob for ob in obs if ob.type != 'LIGHT' or ob.data.renderman.renderman_light_role == 'RMAN_LIGHT']
+
 def get_all_lights(scene, include_light_filters=True):
     """Return a list of all lights in the scene, including
     mesh lights
@@ -402,28 +893,8 @@ def get_all_lights(scene, include_light_filters=True):
     (list) - list of all lights
     """
 
-    lights = list()
-    for ob in scene.objects:
-        if ob.type == 'LIGHT':
-            if hasattr(ob.data, 'renderman'):
-                if include_light_filters:
-                    lights.append(ob)
-                elif ob.data.renderman.renderman_light_role == 'RMAN_LIGHT':            
-                    lights.append(ob)
-        else:
-            mat = getattr(ob, 'active_material', None)
-            if not mat:
-                continue
-            output = shadergraph_utils.is_renderman_nodetree(mat)
-            if not output:
-                continue
-            if len(output.inputs) > 1:
-                socket = output.inputs[1]
-                if socket.is_linked:
-                    node = socket.links[0].from_node
-                    if node.bl_label == 'PxrMeshLight':
-                        lights.append(ob)       
-    return lights
+    lights = [ob for ob in scene.objects if _is_light_object_(ob)]
+    return _filter_lights_(lights, include_light_filters=include_light_filters)
 
 def get_all_lightfilters(scene):
     """Return a list of all lightfilters in the scene
@@ -91,6 +91,11 @@ def update_sg_node_primvar(prop_name, context, bl_object=None):
     rr = rman_render.RmanRender.get_rman_render()
     rr.rman_scene_sync.update_sg_node_primvar(prop_name, context, bl_object=bl_object)
 
+def update_sg_material_node_param(node, prop_name, context):
+    from .. import rman_render
+    rr = rman_render.RmanRender.get_rman_render()
+    return rr.rman_scene_sync.update_material_node_param(node, prop_name, context)
+
 def update_sg_displays(context):
     from .. import rman_render
     rr = rman_render.RmanRender.get_rman_render()
@@ -1,4 +1,7 @@
 from .envconfig_utils import envconfig
+from ..rfb_logger import rfb_log
+from contextlib import contextmanager
+import threading
 import time
 
 def time_this(f):   
@@ -16,4 +19,113 @@ def time_this(f):
             ', '.join(['%s=%r' % (k, w) for k, w in kw.items()])))
         return result
 
-    return timed
\ No newline at end of file
+    return timed
+
+class StageTimer(object):
+    """Keeps track of how long each stage of a process takes, ex: loading the add-on.
+    Stages with the same name are added together.
+
+    Example:
+        timer = StageTimer()
+        with timer.stage('rman_config'):
+            rman_config.register()
+        rfb_log().debug(timer.report('Add-on startup'))
+    """
+
+    def __init__(self):
+        self.stages = dict()
+        self.tstart = time.time()
+
+    @contextmanager
+    def stage(self, name):
+        tstart = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, time.time() - tstart)
+
+    def add(self, name, elapsed):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def report(self, title):
+        """Return a human-readable report of the time spent in each stage."""
+        total = time.time() - self.tstart
+        lines = ['%s: %0.2f ms' % (title, total * 1000.0)]
+        for name, elapsed in self.stages.items():
+            lines.append('  %-40s %10.2f ms' % (name, elapsed * 1000.0))
+        return '\n'.join(lines)
+
+def log_startup_report(timer, title):
+    """Log a StageTimer's report. Set RFB_STARTUP_TIMING to always see it, 
+    regardless of the log level.
+    """
+    report = timer.report(title)
+    if envconfig().getenv('RFB_STARTUP_TIMING'):
+        rfb_log().warning(report)
+    else:
+        rfb_log().debug(report)
+
+class PollScheduler(object):
+    """Event driven replacement for fixed-rate polling loops.
+
+    Callers loop on wait(), which returns as soon as someone calls notify()
+    (ex: the display driver or a RenderMan event callback), but not sooner
+    than min_interval after the previous tick. If nobody notifies us, the
+    wait time backs off exponentially up to max_interval.
+
+    For bpy.app.timers functions, which can't block, use next_interval() to
+    get the interval to return to Blender.
+    """
+
+    def __init__(self, min_interval=0.01, max_interval=0.25, backoff=2.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self._event = threading.Event()
+        self._last_tick = 0.0
+
+    def notify(self):
+        """Wake up anyone waiting on this scheduler."""
+        self._event.set()
+
+    def reset(self):
+        self.interval = self.min_interval
+        self._event.clear()
+        self._last_tick = 0.0
+
+    def wait(self):
+        """Block until notified or until the current interval expires.
+
+        Returns:
+            (bool) - True if we were notified
+        """
+        notified = self._event.wait(timeout=self.interval)
+        if notified:
+            self._event.clear()
+            self.interval = self.min_interval
+            # rate limit, so that a flood of notifications is 
+            # coalesced into one tick every min_interval
+            elapsed = time.time() - self._last_tick
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        self._last_tick = time.time()
+        return notified
+
+    def next_interval(self, active=False):
+        """Return the next interval for a timer function.
+
+        Args:
+            active (bool) - whether the last tick found any work to do
+
+        Returns:
+            (float) - number of seconds until the next tick
+        """
+        if active or self._event.is_set():
+            self._event.clear()
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
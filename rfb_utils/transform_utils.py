@@ -1,4 +1,5 @@
 import rman
+import numpy as np
 from mathutils import Matrix,Vector
 
 def convert_matrix(m):
@@ -9,6 +10,20 @@ def convert_matrix(m):
 
     return v    
 
+def convert_matrices(matrices):
+    '''
+    Convert an array of Blender matrices to RenderMan's
+    layout in one go. This is the bulk version of convert_matrix.
+
+    Arguments:
+    matrices (numpy.ndarray) - array of shape (N, 4, 4) 
+
+    Returns:
+    (numpy.ndarray) - float32 array of shape (N, 16)
+    '''
+    matrices = np.asarray(matrices, dtype=np.float32).reshape(-1, 4, 4)
+    return np.ascontiguousarray(matrices.transpose(0, 2, 1)).reshape(-1, 16)
+
 def convert_matrix4x4(m):
     mtx = m
     if len(m) == 4:
@@ -1,4 +1,5 @@
 from ..rfb_utils.rfb_node_desc_utils.rfb_node_desc import RfbNodeDesc
+from ..rfb_utils.rfb_node_desc_utils.rfb_node_desc_cache import RfbNodeDescCache
 from ..rfb_utils import filepath_utils
 from ..rfb_utils.filepath import FilePath
 from ..rfb_utils import generate_property_utils
@@ -10,6 +11,7 @@ from ..rfb_utils import register_utils
 from ..rfb_utils.string_utils import sanitize_attr_name
 from ..rfb_logger import rfb_log
 from ..rfb_utils.envconfig_utils import envconfig
+from ..rfb_utils.timer_utils import StageTimer, log_startup_report
 from .. import rfb_icons
 from .. import rman_config
 from ..rman_config import __RFB_CONFIG_DICT__ as rfb_config
@@ -90,9 +92,31 @@ __RMAN_PLUGIN_MAPPING__ = {
 }
 
 
+# Pattern nodes whose Blender node types haven't been generated yet, when
+# RFB_LAZY_NODE_REGISTRATION is set. Maps the Blender node name to (node_desc, is_oso)
+__RMAN_PENDING_NODE_TYPES__ = dict()
+
+class RmanNodesMap(dict):
+    '''
+    Maps the RenderMan node name to the Blender node name. Looking up a node
+    also makes sure its Blender node type has been registered, in case 
+    we're using lazy registration.
+    '''
+
+    def __getitem__(self, key):
+        typename = super().__getitem__(key)
+        ensure_node_type(typename)
+        return typename
+
+    def get(self, key, default=None):
+        typename = super().get(key, default)
+        if typename:
+            ensure_node_type(typename)
+        return typename
+
 # map RenderMan name to Blender node name
 # ex: PxrStylizedControl -> PxrStylizedControlPatternNode
-__BL_NODES_MAP__ = dict()
+__BL_NODES_MAP__ = RmanNodesMap()
 
 __CYCLES_NODE_DESC_MAP__ = dict()
 __RMAN_NODES_ALREADY_REGISTERED__ = False
@@ -223,6 +247,10 @@ def class_generate_properties(node, parent_name, node_desc, generate_array_ui=Tr
             if generate_property_utils.generate_array_property(node, prop_names, prop_meta, node_desc_param, update_function=update_function):
                 continue
 
+        if update_function == update_func and node_desc.node_type in ['pattern', 'bxdf', 'displace']:
+            # let IPR update just this parameter
+            update_function = lambda s, c, param_name=node_desc_param._name: update_node_param_func(s, c, param_name)
+
         name, meta, prop = generate_property_utils.generate_property(node, node_desc_param, update_function=update_function)
         if name is None:
             continue          
@@ -320,6 +348,77 @@ def class_generate_properties(node, parent_name, node_desc, generate_array_ui=Tr
     setattr(node, 'output_meta', output_meta)
     setattr(node, "ui_structs", ui_structs)
 
+def get_node_typename(node_desc):
+    ''' Return the name of the Blender node type for node_desc '''
+    return '%s%sNode' % (node_desc.name, node_desc.node_type.capitalize())
+
+def _get_osl_node_typename_(node_desc):
+    # see the comment about OSL pattern nodes in generate_node_type
+    return '%s%sOSLNode' % (node_desc.name, node_desc.node_type.capitalize())
+
+def use_lazy_registration():
+    return bool(envconfig().getenv('RFB_LAZY_NODE_REGISTRATION', False))
+
+def ensure_node_type(typename):
+    '''
+    Make sure the Blender node type for typename has been registered.
+    This is a no-op, unless the node type is still waiting on lazy registration.
+
+    Args:
+        typename (str) - the Blender node name, ex: PxrCheckerPatternNode
+    '''
+    pending = __RMAN_PENDING_NODE_TYPES__.pop(typename, None)
+    if pending is None:
+        return
+    node_desc, is_oso = pending
+    __RMAN_PENDING_NODE_TYPES__.pop(get_node_typename(node_desc), None)
+    __RMAN_PENDING_NODE_TYPES__.pop(_get_osl_node_typename_(node_desc), None)
+    rfb_log().debug("Registering node type: %s" % typename)
+    typename, nodetype = generate_node_type(node_desc, is_oso=is_oso)
+    if typename and nodetype:
+        __RMAN_NODE_TYPES__[typename] = nodetype
+
+def register_node_types_in_use():
+    '''
+    Register the pending node types that are used by any of the node trees in the 
+    current file. Called after a file is loaded and before a render, when using
+    lazy registration.
+    '''
+    if not __RMAN_PENDING_NODE_TYPES__:
+        return
+    node_trees = list(bpy.data.node_groups)
+    for collection in (bpy.data.materials, bpy.data.lights, bpy.data.worlds):
+        for id in collection:
+            if id.node_tree:
+                node_trees.append(id.node_tree)
+    for nt in node_trees:
+        for node in nt.nodes:
+            if node.bl_idname in __RMAN_PENDING_NODE_TYPES__:
+                ensure_node_type(node.bl_idname)
+
+def register_pending_node_types(count=-1):
+    '''
+    Register pending node types.
+
+    Args:
+        count (int) - maximum number of node types to register. -1 means all of them
+
+    Returns:
+        (bool) - True if there are still node types pending
+    '''
+    while __RMAN_PENDING_NODE_TYPES__ and count != 0:
+        ensure_node_type(next(iter(__RMAN_PENDING_NODE_TYPES__)))
+        count -= 1
+    return len(__RMAN_PENDING_NODE_TYPES__) > 0
+
+def _register_pending_node_types_timer_():
+    # register the rest of the node types a few at a time, 
+    # so that we don't block the UI
+    if register_pending_node_types(count=10):
+        return 0.01
+    rfb_log().debug("Finished registering pending node types.")
+    return None
+
 def generate_node_type(node_desc, is_oso=False):
     ''' Dynamically generate a node type from pattern '''
 
@@ -339,7 +438,7 @@ def generate_node_type(node_desc, is_oso=False):
     if nodeType not in nodeDict.keys():
         return (None, None)
 
-    typename = '%s%sNode' % (name, nodeType.capitalize())
+    typename = get_node_typename(node_desc)
     ntype = type(typename, (nodeDict[nodeType],), {})
 
     ntype.bl_label = name
@@ -796,6 +895,11 @@ def register_rman_nodes():
     rman_disabled_nodes = rfb_config['disabled_nodes']
 
     rfb_log().debug("Registering RenderMan Plugin Nodes:")
+    timer = StageTimer()
+    lazy_registration = use_lazy_registration()
+    node_desc_cache = RfbNodeDescCache()
+    with timer.stage('load node description cache'):
+        node_desc_cache.load()
     path_list = envconfig().get_shader_registration_paths()
     visited = set()
     for path in path_list:
@@ -820,11 +924,16 @@ def register_rman_nodes():
                         is_oso = True
                         is_args = False
 
-                    rfb_log().debug("\t    Parsing: %s" % filename)
-                    node_desc = RfbNodeDesc(FilePath(root).join(FilePath(filename)))
+                    filepath = FilePath(root).join(FilePath(filename))
+                    with timer.stage('node descriptions'):
+                        node_desc = node_desc_cache.get(str(filepath))
+                        if node_desc is None:
+                            rfb_log().debug("\t    Parsing: %s" % filename)
+                            node_desc = RfbNodeDesc(filepath)
+                            node_desc_cache.put(str(filepath), node_desc)
 
-                    # apply any overrides
-                    rman_config.apply_args_overrides(filename, node_desc)
+                        # apply any overrides
+                        rman_config.apply_args_overrides(filename, node_desc)
 
                     __RMAN_NODES__[node_desc.node_type].append(node_desc)
                     rfb_log().debug("\t    %s Loaded" % node_desc.name)
@@ -834,19 +943,30 @@ def register_rman_nodes():
                     # we still create PropertyGroups for them so they can be inserted
                     # into the correct UI panel.
                     if node_desc.node_type in ['displaydriver']: 
-                        register_plugin_types(node_desc)
+                        with timer.stage('plugin settings'):
+                            register_plugin_types(node_desc)
                         continue
                     
-                    typename, nodetype = generate_node_type(node_desc, is_oso=is_oso)
-                    if not typename and not nodetype:
-                        continue
-
-                    if typename and nodetype:
-                        __RMAN_NODE_TYPES__[typename] = nodetype
+                    if lazy_registration and node_desc.node_type == 'pattern':
+                        # Pattern nodes make up most of our nodes. Hold off on generating
+                        # their node types until they're asked for. See ensure_node_type.
+                        typename = get_node_typename(node_desc)
+                        __RMAN_PENDING_NODE_TYPES__[typename] = (node_desc, is_oso)
+                        if is_oso:
+                            __RMAN_PENDING_NODE_TYPES__[_get_osl_node_typename_(node_desc)] = (node_desc, is_oso)
                         __BL_NODES_MAP__[node_desc.name] = typename
+                    else:
+                        with timer.stage('node types'):
+                            typename, nodetype = generate_node_type(node_desc, is_oso=is_oso)
+                        if not typename and not nodetype:
+                            continue
+
+                        if typename and nodetype:
+                            __RMAN_NODE_TYPES__[typename] = nodetype
+                            __BL_NODES_MAP__[node_desc.name] = typename
 
                     # categories
-                    node_item = RendermanNodeItem(typename, label=nodetype.bl_label)
+                    node_item = RendermanNodeItem(typename, label=node_desc.name)
                     if node_desc.node_type == 'pattern': 
                         classification = getattr(node_desc, 'classification', '')                                                       
                         if classification and classification != '':
@@ -926,6 +1046,12 @@ def register_rman_nodes():
                         __RMAN_NODE_CATEGORIES__['projection']['projection'][0][1].append(node_item)  
                         __RMAN_NODE_CATEGORIES__['projection']['projection'][1].append(node_desc)                             
 
+    with timer.stage('save node description cache'):
+        node_desc_cache.save()
+    rfb_log().debug("Node descriptions: %d from cache, %d parsed" % (node_desc_cache.hits, node_desc_cache.misses))
+    if lazy_registration:
+        rfb_log().debug("Deferred registration of %d node types" % len(__RMAN_PENDING_NODE_TYPES__))
+    log_startup_report(timer, 'Registering RenderMan Plugin Nodes')
     rfb_log().debug("Finished Registering RenderMan Plugin Nodes.")
 
 
@@ -960,6 +1086,10 @@ def register():
     if not __RMAN_NODES_ALREADY_REGISTERED__:
         register_rman_nodes()
         __RMAN_NODES_ALREADY_REGISTERED__ = True    
+        if __RMAN_PENDING_NODE_TYPES__ and not bpy.app.background:
+            # in the UI, register the rest of the node types once we're idle. 
+            # In background mode, we only register what's used by the file, or asked for.
+            bpy.app.timers.register(_register_pending_node_types_timer_, first_interval=1.0)
     register_node_categories()
     rman_bl_nodes_sockets.register()
     rman_bl_nodes_shaders.register()
@@ -971,6 +1101,9 @@ def register():
         bpy.types.NODE_MT_add.append(add_renderman_category)
 
 def unregister():
+    if bpy.app.timers.is_registered(_register_pending_node_types_timer_):
+        bpy.app.timers.unregister(_register_pending_node_types_timer_)
+
     try:
         nodeitems_utils.unregister_node_categories("RENDERMANSHADERNODES")
     except RuntimeError:
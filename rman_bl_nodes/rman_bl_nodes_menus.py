@@ -205,7 +205,7 @@ class NODE_MT_renderman_connection_menu(Menu):
                         layout.context_pointer_set("nodetree", nt)
                         rman_icon = rfb_icons.get_pattern_icon(n.name)
                         op = layout.operator('node.rman_shading_create_node', text=n.name, icon_value=rman_icon.icon_id)
-                        op.node_name = rman_bl_nodes.__BL_NODES_MAP__.get(n.name) 
+                        op.node_name = n.name
                         if n.help:
                             op.node_description = n.help                        
                         break                                   
@@ -5,9 +5,14 @@ from ..rfb_utils import filepath_utils
 from ..rfb_utils.envconfig_utils import envconfig
 from ..rfb_utils.string_utils import sanitize_attr_name
 from ..rfb_logger import rfb_log
+from .. import rman_constants
 from bpy.props import StringProperty, BoolProperty
+import hashlib
+import marshal
+import pickle
 import json
 import os
+import sys
 import types
 
 __RMAN_CONFIG__ = dict()
@@ -17,6 +22,15 @@ __RFB_CONFIG_DICT__ = dict()
 __RMAN_DISPLAY_CHANNELS__ = dict()
 __RMAN_DISPLAY_TEMPLATES__ = dict()
 
+# functions defined in the config files, keyed by their source code
+__RMAN_CONFIG_FUNCTIONS__ = dict()
+# compiled code for the functions defined in the config files, keyed by their source code
+__RMAN_CONFIG_CODE__ = dict()
+
+# bump this whenever RmanConfig, or how we read the config files, changes
+__RMAN_CONFIG_CACHE_VERSION__ = 1
+__RMAN_CONFIG_CACHE_FILE__ = 'rfb_config_cache.pickle'
+
 __OPTIONAL_ATTRS__ = {
     'bl_width_default',
     'bl_width_min',
@@ -26,6 +40,23 @@ __OPTIONAL_ATTRS__ = {
     'bl_height_max'
 }
 
+def _get_config_function_(source, func_name):
+    """Return the function called func_name, defined by the source code in a
+    config file. Each piece of source code is only executed once.
+    """
+    key = (source, func_name)
+    func = __RMAN_CONFIG_FUNCTIONS__.get(key, None)
+    if func is None:
+        code = __RMAN_CONFIG_CODE__.get(source, None)
+        if code is None:
+            code = compile(source, '<rman_config:%s>' % func_name, 'exec')
+            __RMAN_CONFIG_CODE__[source] = code
+        lcls = dict()
+        exec(code, globals(), lcls)
+        func = lcls[func_name]
+        __RMAN_CONFIG_FUNCTIONS__[key] = func
+    return func
+
 class RmanBasePropertyGroup:
     """Base class that can be inhreited for custom PropertyGroups
     who want to use the JSON config files to dynamically add their properties.
@@ -79,30 +110,20 @@ class RmanBasePropertyGroup:
             set_func = None
             get_func = None
             if hasattr(ndp, 'update_function'):
-                # this code tries to dynamically add a function to cls
-                # don't ask me why this works.
-                lcls = locals()
-                exec(ndp.update_function, globals(), lcls)
-                exec('update_func = %s' % ndp.update_function_name, globals(), lcls)
-                update_func = lcls['update_func']
+                # dynamically add the function to cls
+                update_func = _get_config_function_(ndp.update_function, ndp.update_function_name)
                 setattr(cls, ndp.update_function_name, update_func)
             elif hasattr(ndp, 'update_function_name'):
                 update_func = ndp.update_function_name
 
             if hasattr(ndp, 'set_function'):
-                lcls = locals()
-                exec(ndp.set_function, globals(), lcls)
-                exec('set_func = %s' % ndp.set_function_name, globals(), lcls)
-                set_func = lcls['set_func']
+                set_func = _get_config_function_(ndp.set_function, ndp.set_function_name)
                 setattr(cls, ndp.set_function_name, set_func)
             elif hasattr(ndp, 'set_function_name'):
                 set_func = ndp.set_function_name
 
             if hasattr(ndp, 'get_function'):
-                lcls = locals()
-                exec(ndp.get_function, globals(), lcls)
-                exec('get_func = %s' % ndp.get_function_name, globals(), lcls)
-                get_func = lcls['get_func']
+                get_func = _get_config_function_(ndp.get_function, ndp.get_function_name)
                 setattr(cls, ndp.get_function_name, get_func)
             elif hasattr(ndp, 'get_function_name'):
                 get_func = ndp.get_function_name                
@@ -370,43 +391,138 @@ def apply_overrides(rman_config_org, rman_config_override):
         if val:
             setattr(rman_config_org, nm, val)            
 
-def register():
-
-    paths = [get_factory_config_path(), get_factory_overrides_config_path()]
+def _get_config_files_():
+    """Get all of the JSON config files that register() reads, in the order 
+    they should be read. Factory files come first, followed by the override files.
 
-    for config_path in paths:
+    Returns:
+        list: (jsonfile, is_override) tuples
+    """
+    config_files = []
+    for config_path in [get_factory_config_path(), get_factory_overrides_config_path()]:
         for f in os.listdir(config_path):
-            if not f.endswith('.json'):
-                continue
-            jsonfile = os.path.join(config_path, f)
-            rfb_log().debug("Reading factory json file: %s" % jsonfile)
-            if f == __RMAN_CHANNELS_DEF_FILE__:
-                # this is our channels config file
-                configure_channels(jsonfile)
-            elif f == __RFB_CONFIG_FILE__:
-                read_rfbconfig_file(jsonfile, __RFB_CONFIG_DICT__)
-            else:
-                # this is a regular properties config file
-                rman_config = RmanConfig(jsonfile)
-                __RMAN_CONFIG__[rman_config.name] = rman_config
+            if f.endswith('.json'):
+                config_files.append((os.path.join(config_path, f), False))
 
-    # Look for overrides
-    override_paths = get_override_paths()
-    for path in override_paths:
+    for path in get_override_paths():
         for f in os.listdir(path):
-            if not f.endswith('.json'):
-                continue
-            jsonfile = os.path.join(path, f)
+            if f.endswith('.json'):
+                config_files.append((os.path.join(path, f), True))
+
+    return config_files
+
+def _get_cache_path_():
+    if envconfig().getenv('RFB_NO_CONFIG_CACHE', False):
+        return None
+    filepath = envconfig().getenv('RFB_CONFIG_CACHE', '')
+    if filepath:
+        return filepath
+    return filepath_utils.get_user_cache_path(__RMAN_CONFIG_CACHE_FILE__)
+
+def _get_cache_key_(config_files):
+    """The cache is only valid for the exact same set of config files, with the 
+    same contents, and the same versions of the add-on and Python (marshal's 
+    format can change between Python versions).
+    """
+    file_hashes = []
+    for jsonfile, is_override in config_files:
+        with open(jsonfile, 'rb') as f:
+            file_hashes.append((jsonfile, is_override, hashlib.sha1(f.read()).hexdigest()))
+    return (__RMAN_CONFIG_CACHE_VERSION__, rman_constants.RFB_ADDON_VERSION_STRING,
+            tuple(sys.version_info[:2]), tuple(file_hashes))
+
+def _compile_config_functions_():
+    for rman_config in __RMAN_CONFIG__.values():
+        for ndp in rman_config.params.values():
+            for attr in ('update_function', 'set_function', 'get_function'):
+                source = getattr(ndp, attr, None)
+                if source and source not in __RMAN_CONFIG_CODE__:
+                    __RMAN_CONFIG_CODE__[source] = compile(source, '<rman_config:%s>' % getattr(ndp, '%s_name' % attr), 'exec')
+
+def _load_cache_(cache_path, cache_key):
+    if not cache_path or not os.path.exists(cache_path):
+        return False
+    try:
+        with open(cache_path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('key', None) != cache_key:
+            rfb_log().debug("Config cache is out of date: %s" % cache_path)
+            return False
+        code = {source: marshal.loads(c) for source, c in data['code'].items()}
+    except Exception as e:
+        rfb_log().debug("Could not read config cache %s: %s" % (cache_path, str(e)))
+        return False
+
+    __RMAN_CONFIG__.update(data['config'])
+    __RFB_CONFIG_DICT__.update(data['rfb_config'])
+    __RMAN_DISPLAY_CHANNELS__.update(data['channels'])
+    __RMAN_DISPLAY_TEMPLATES__.update(data['templates'])
+    __RMAN_CONFIG_CODE__.update(code)
+    return True
+
+def _save_cache_(cache_path, cache_key):
+    if not cache_path:
+        return
+    data = {
+        'key': cache_key,
+        'config': __RMAN_CONFIG__,
+        'rfb_config': __RFB_CONFIG_DICT__,
+        'channels': __RMAN_DISPLAY_CHANNELS__,
+        'templates': __RMAN_DISPLAY_TEMPLATES__,
+        'code': {source: marshal.dumps(code) for source, code in __RMAN_CONFIG_CODE__.items()}
+    }
+    tmp_path = '%s.%d.tmp' % (cache_path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        rfb_log().debug("Could not write config cache %s: %s" % (cache_path, str(e)))
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _read_config_files_(config_files):
+    for jsonfile, is_override in config_files:
+        f = os.path.basename(jsonfile)
+        if is_override:
             rfb_log().debug("Reading override json file: %s" % jsonfile)
-            if f == __RMAN_CHANNELS_DEF_FILE__:
-                configure_channels(jsonfile)
-            elif f == __RFB_CONFIG_FILE__:
-                read_rfbconfig_file(jsonfile, __RFB_CONFIG_DICT__)
+        else:
+            rfb_log().debug("Reading factory json file: %s" % jsonfile)
+        if f == __RMAN_CHANNELS_DEF_FILE__:
+            # this is our channels config file
+            configure_channels(jsonfile)
+        elif f == __RFB_CONFIG_FILE__:
+            read_rfbconfig_file(jsonfile, __RFB_CONFIG_DICT__)
+        elif not is_override:
+            # this is a regular properties config file
+            rman_config = RmanConfig(jsonfile)
+            __RMAN_CONFIG__[rman_config.name] = rman_config
+        else:
+            rman_config_override = RmanConfig(jsonfile)
+            if rman_config_override.name in __RMAN_CONFIG__:
+                rman_config_original = __RMAN_CONFIG__[rman_config_override.name]
+                apply_overrides(rman_config_original, rman_config_override)
+                __RMAN_CONFIG__[rman_config_override.name] = rman_config_original
             else:
-                rman_config_override = RmanConfig(jsonfile)
-                if rman_config_override.name in __RMAN_CONFIG__:
-                    rman_config_original = __RMAN_CONFIG__[rman_config_override.name]
-                    apply_overrides(rman_config_original, rman_config_override)
-                    __RMAN_CONFIG__[rman_config_override.name] = rman_config_original
-                else:
-                    __RMAN_CONFIG__[rman_config_override.name] = rman_config_override
+                __RMAN_CONFIG__[rman_config_override.name] = rman_config_override
+
+def register():
+    """Read all of the config files, and apply any overrides. The result, along with
+    the compiled update/set/get functions, is cached on disk, keyed by the hashes of 
+    the config files. The cache can be moved with RFB_CONFIG_CACHE, or turned off by 
+    setting RFB_NO_CONFIG_CACHE.
+    """
+
+    config_files = _get_config_files_()
+    cache_path = _get_cache_path_()
+    cache_key = None
+    if cache_path:
+        cache_key = _get_cache_key_(config_files)
+        if _load_cache_(cache_path, cache_key):
+            rfb_log().debug("Read config from cache: %s" % cache_path)
+            return
+
+    _read_config_files_(config_files)
+    _compile_config_functions_()
+    _save_cache_(cache_path, cache_key)
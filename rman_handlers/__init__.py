@@ -26,6 +26,11 @@ def set_qn_env_vars(bl_scene):
 def rman_load_post(bl_scene):
     from ..rman_ui import rman_ui_light_handlers
     from ..rfb_utils import scene_utils
+    from .. import rman_bl_nodes
+
+    # make sure every node type this file uses is registered, 
+    # before anything looks at the nodes
+    rman_bl_nodes.register_node_types_in_use()
     
     string_utils.update_blender_tokens_cb(bl_scene)
     rman_ui_light_handlers.clear_gl_tex_cache(bl_scene)
@@ -110,10 +115,14 @@ def render_pre(bl_scene):
     global ORIGINAL_BL_FILEPATH
     global ORIGINAL_BL_FILE_FORMAT
     global ORIGINAL_BL_MEDIA_FORMAT
+    from .. import rman_bl_nodes
 
     if bl_scene.render.engine != 'PRMAN_RENDER':
         return
 
+    # node trees may have been appended or linked since the file was loaded
+    rman_bl_nodes.register_node_types_in_use()
+
     ORIGINAL_BL_FILEPATH = bl_scene.render.filepath
     ORIGINAL_BL_FILE_FORMAT = bl_scene.render.image_settings.file_format         
     filepath = string_utils.expand_string(bl_scene.renderman.path_comp_image_output, frame='#')
@@ -4,6 +4,7 @@ from ..rfb_logger import rfb_log
 from ..rfb_utils import shadergraph_utils
 from ..rfb_utils import scenegraph_utils
 from ..rfb_utils import object_utils
+from ..rfb_utils import scene_utils
 from ..rfb_utils import collection_utils
 
 import bpy
@@ -359,6 +360,7 @@ class COLLECTION_OT_object_groups_add_remove(bpy.types.Operator):
             for ob in ob_list:
                 ob.update_tag(refresh={'OBJECT'})
 
+        scene_utils.clear_object_groups_index()
         return {'FINISHED'}               
 
 class PRMAN_OT_convert_mixer_group_to_light_group(bpy.types.Operator):
@@ -534,6 +536,7 @@ class PRMAN_OT_add_to_group(bpy.types.Operator):
             self.add_scene_selected(context)
         else:
             self.add_selected(context)
+        scene_utils.clear_object_groups_index()
 
         if self.properties.open_editor:
             bpy.ops.scene.rman_open_groups_editor('INVOKE_DEFAULT')            
@@ -557,6 +560,7 @@ class PRMAN_OT_remove_from_group(bpy.types.Operator):
         for i, member in enumerate(object_group.members):
             if member.ob_pointer == ob:
                 object_group.members.remove(i)
+                scene_utils.clear_object_groups_index()
                 ob.update_tag(refresh={'DATA'})
                 break
 
@@ -4,6 +4,7 @@ from ...rman_ui.rman_ui_base import CollectionPanel
 from ...rman_operators.rman_operators_collections import return_empty_list   
 from ...rman_config import __RFB_CONFIG_DICT__ as rfb_config
 from ...rfb_utils.prefs_utils import using_qt, show_wip_qt
+from ...rfb_utils import scene_utils
 from ...rman_constants import RFB_PLATFORM
 import bpy
 import re
@@ -504,6 +505,7 @@ class PRMAN_OT_Renderman_Open_Groups_Editor(CollectionPanel, bpy.types.Operator)
             for j in delete_objs:
                 lg.members.remove(j)
                 lg.members_index -= 1                        
+        scene_utils.clear_object_groups_index()
 
     def invoke(self, context, event):
 
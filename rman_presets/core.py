@@ -1140,7 +1140,7 @@ def createNodes(Asset):
                     err = ('createNodes: OSL file is missing "%s"'
                            % nodeType)
                     raise RmanAssetBlenderError(err)
-                created_node = nt.nodes.new('PxrOSLPatternNode')
+                created_node = nt.nodes.new(__BL_NODES_MAP__['PxrOSL'])
                 created_node.location[0] = -curr_x
                 curr_x = curr_x + 250
                 created_node.codetypeswitch = 'EXT'
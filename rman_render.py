@@ -40,6 +40,7 @@ from .rfb_utils.render_utils import RmanRenderContext
 from .rfb_utils import transform_utils
 from .rfb_utils.prefs_utils import get_pref
 from .rfb_utils.timer_utils import time_this
+from .rfb_utils.timer_utils import PollScheduler
 
 # config
 from .rman_config import __RFB_CONFIG_DICT__ as rfb_config
@@ -55,10 +56,15 @@ from .rman_denoiser import RmanDenoiser
 RMAN_RENDER = None
 RMAN_IT_PORT = -1
 BLENDER_DSPY_PLUGIN = None
+DSPY_REGION_FUNC = None
+DSPY_DIRTY_FUNC = None
 D_QUICKLYNOISELESS = None
 DRAW_THREAD = None
 RMAN_STATS_THREAD = None
 
+# max number of dirty rectangles we ask the display driver for
+RFB_MAX_DIRTY_REGIONS = 256
+
 # map Blender display file format
 # to ice format
 BLENDER_TO_ICE_DSPY = {
@@ -258,6 +264,9 @@ def __update_areas__():
 def __draw_callback__():
     # callback function for the display driver to call tag_redraw
     global RMAN_RENDER
+    # let anyone polling the display driver know there are new pixels
+    RMAN_RENDER.render_scheduler.notify()
+    RMAN_RENDER.draw_scheduler.notify()
     if RMAN_RENDER.rman_context.is_viewport_rendering() and RMAN_RENDER.bl_engine:
         try:
             RMAN_RENDER.bl_engine.tag_redraw()
@@ -265,6 +274,9 @@ def __draw_callback__():
         except ReferenceError as e:
             return  False
         return True
+    if RMAN_RENDER.rman_context.is_live_rendering() and not RMAN_RENDER.rman_context.is_interactive_running():
+        # final render into Blender
+        return True
     return False     
 
 DRAWCALLBACK_FUNC = None 
@@ -353,6 +365,7 @@ def start_cmd_server():
 
 def draw_threading_func(db):
     refresh_rate = get_pref('rman_viewport_refresh_rate', default=0.01)
+    db.draw_scheduler.min_interval = refresh_rate
     if db.bl_viewport.shading.type != 'RENDERED':
         db.del_bl_engine(stop_render=True)
         return
@@ -362,7 +375,8 @@ def draw_threading_func(db):
         db.del_bl_engine(stop_render=True)
         return 
     if db.xpu_slow_mode:
-        if db.has_buffer_updated():
+        buffer_updated = db.has_buffer_updated()
+        if buffer_updated:
             try:
                 db.bl_engine.tag_redraw()
                 db.reset_buffer_updated()
@@ -374,8 +388,8 @@ def draw_threading_func(db):
                 #rfb_log().debug("Error calling tag_redraw (%s). Aborting..." % str(e))
                 db.del_bl_engine(stop_render=True)
                 return      
-        return refresh_rate      
-    return 0.01
+        return db.draw_scheduler.next_interval(active=buffer_updated)
+    return db.draw_scheduler.next_interval()
 
 def call_stats_export_payloads(db):
     while db.rman_context.is_exporting_state():
@@ -383,6 +397,7 @@ def call_stats_export_payloads(db):
         time.sleep(0.1)  
 
 def call_stats_update_payloads(db):
+    db.stats_scheduler.reset()
     while db.rman_context.is_render_running():
         if not db.bl_engine:
             break
@@ -394,7 +409,7 @@ def call_stats_update_payloads(db):
                 break   
         if db.rman_context.is_rendering_state():     
             db.stats_mgr.update_payloads()
-        time.sleep(0.1)
+        db.stats_scheduler.wait()
 
 def progress_cb(e, d, db):
     if not db.stats_mgr.is_connected():
@@ -402,9 +417,11 @@ def progress_cb(e, d, db):
         # we can at least get progress from the event callback
         # in case the stats listener is not connected
         db.stats_mgr._progress = int(d)
+    db.stats_scheduler.notify()
     if db.rman_context.is_live_rendering() and int(d) == 100:
         time.sleep(0.1)
         db.rman_context.set_not_live_rendering()
+        db.render_scheduler.notify()
 
 def bake_progress_cb(e, d, db): 
     if not db.stats_mgr.is_connected():
@@ -423,6 +440,8 @@ def render_cb(e, d, db):
         if db.rman_context.is_live_rendering():
             time.sleep(0.1)
             db.rman_context.set_not_live_rendering()
+        db.render_scheduler.notify()
+        db.stats_scheduler.notify()
 
 def live_render_cb(e, d, db):
     if d == 0:
@@ -496,6 +515,8 @@ class BlRenderResultHelper:
         self.image_scale = -1
         self.write_aovs = False
         self.render_border = None
+        self.buffer_region = None
+        self.pass_buffers = dict()
 
     @staticmethod
     def write_empty_result(rman_render, bl_layer):
@@ -625,8 +646,72 @@ class BlRenderResultHelper:
             if render_pass:
                 self.bl_image_rps[i] = render_pass           
 
+        self.alloc_pass_buffers()
+
+    def alloc_pass_buffers(self):
+        # preallocate one buffer per pass, so that update_passes can have the
+        # display driver write the (possibly cropped) pixels straight into it,
+        # rather than allocating and slicing new arrays every tick
+        if self.render.use_border and not self.render.use_crop_to_border and self.render_border:
+            start_y, end_y, start_x, end_x = self.render_border
+        else:
+            start_y, end_y, start_x, end_x = 0, self.height, 0, self.width
+        self.buffer_region = (start_y, end_y, start_x, end_x)
+        pixel_count = (end_y - start_y) * (end_x - start_x)
+        self.pass_buffers.clear()
+        for i, rp in self.bl_image_rps.items():
+            self.pass_buffers[i] = numpy.zeros((pixel_count, rp.channels), dtype=numpy.float32)
+
+    def _copy_dirty_regions(self, image_num, num_channels, buffer, dirty_regions):
+        # copy the dirty regions of this image into our persistent pass buffer.
+        # If dirty_regions is None, copy the whole render region. Returns the
+        # number of regions copied, or -1 if a copy failed.
+        if dirty_regions is None:
+            if not self.rman_render._get_buffer_region(buffer, image_num, num_channels, self.buffer_region):
+                return -1
+            return 1
+
+        start_y, end_y, start_x, end_x = self.buffer_region
+        if len(dirty_regions) > 32:
+            # lots of small tiles, just copy their bounding box
+            dirty_regions = [(min(r[0] for r in dirty_regions), max(r[1] for r in dirty_regions),
+                              min(r[2] for r in dirty_regions), max(r[3] for r in dirty_regions))]
+
+        # the driver writes each tile straight into the buffer
+        row_stride = (end_x - start_x) * num_channels
+        copied = 0
+        for y0, y1, x0, x1 in dirty_regions:
+            # clip the tile to our render region
+            y0 = max(y0, start_y)
+            y1 = min(y1, end_y)
+            x0 = max(x0, start_x)
+            x1 = min(x1, end_x)
+            if y0 >= y1 or x0 >= x1:
+                continue
+            offset = (y0 - start_y) * row_stride + (x0 - start_x) * num_channels
+            if not self.rman_render._get_buffer_region(buffer, image_num, num_channels, (y0, y1, x0, x1), 
+                                                       offset=offset, row_stride=row_stride):
+                return -1
+            copied += 1
+        return copied
+
     def update_passes(self): 
+        updated = False
         for i, rp in self.bl_image_rps.items():
+            buffer = self.pass_buffers.get(i, None)
+            if buffer is not None:
+                dirty_regions = self.rman_render._get_dirty_regions(i)
+                if dirty_regions is not None and len(dirty_regions) == 0:
+                    # nothing has changed
+                    continue
+                copied = self._copy_dirty_regions(i, rp.channels, buffer, dirty_regions)
+                if copied == 0:
+                    # all of the dirty regions were outside of our render region
+                    continue
+                if copied > 0:
+                    rp.rect = buffer
+                    updated = True
+                    continue
             buffer = self.rman_render._get_buffer(self.width, self.height, image_num=i, 
                                         num_channels=rp.channels, 
                                         as_flat=False, 
@@ -634,9 +719,17 @@ class BlRenderResultHelper:
                                         render_border=self.render_border)        
             if buffer is None:
                 continue
+            if i in self.pass_buffers:
+                # keep our mirror in sync, so later partial copies land on the right pixels
+                mirror = self.pass_buffers[i]
+                if mirror.size == buffer.size:
+                    mirror.reshape(-1)[:] = buffer.reshape(-1)
+                else:
+                    del self.pass_buffers[i]
             rp.rect = buffer
+            updated = True
 
-        if self.rman_render.bl_engine:
+        if updated and self.rman_render.bl_engine:
             self.rman_render.bl_engine.update_result(self.bl_result)
 
     def denoise_passes(self):
@@ -738,6 +831,12 @@ class RmanRender(object):
         self.progress_bar_window = None
         self.bl_rr_helper = None
 
+        # schedulers used by the final render loop, the viewport draw timer
+        # and the stats thread, so they only wake up when there is work to do
+        self.render_scheduler = PollScheduler(min_interval=0.01, max_interval=0.25)
+        self.draw_scheduler = PollScheduler(min_interval=0.01, max_interval=0.25)
+        self.stats_scheduler = PollScheduler(min_interval=0.1, max_interval=0.5)
+
         self.bufer_is_zero = False
 
         # hold onto this or python will unload it
@@ -1081,10 +1180,16 @@ class RmanRender(object):
             self.bl_rr_helper.register_passes()
                               
         self.start_stats_thread()
+        self.render_scheduler.reset()
+        if is_render_into_blender and self.bl_rr_helper:
+            self.set_redraw_func()
         while self.bl_engine and not self.bl_engine.test_break() and self.rman_context.is_live_rendering():
-            time.sleep(0.01)      
+            self.render_scheduler.wait()
             if is_render_into_blender and self.bl_rr_helper:
                 self.bl_rr_helper.update_passes()
+        if is_render_into_blender and self.bl_rr_helper and self.bl_engine and not self.bl_engine.test_break():
+            # pick up any buckets that finished after our last update
+            self.bl_rr_helper.update_passes()
         if self.bl_rr_helper and self.use_qn and not self.bl_engine.test_break():
             self.rman_context.set_render_state(RmanRenderContext.k_render_state_denoising)
             self.bl_rr_helper.denoise_passes()
@@ -1514,6 +1619,7 @@ class RmanRender(object):
             # we've switched to using an application timer that runs every x seconds
             if self.rman_render_into == 'blender':
                 DRAW_THREAD = functools.partial(draw_threading_func, self)
+                self.draw_scheduler.reset()
                 bpy.app.timers.register(DRAW_THREAD, first_interval=0.01)                
 
             if not self.rman_scene.export_for_interactive_render(context, depsgraph, self.sg_scene):
@@ -1733,6 +1839,8 @@ class RmanRender(object):
         remove_ipr_to_it_handlers()
 
         self.rman_context.set_not_live_rendering()
+        self.render_scheduler.notify()
+        self.stats_scheduler.notify()
 
         # stop retrieving stats
         if RMAN_STATS_THREAD:
@@ -1914,6 +2022,99 @@ class RmanRender(object):
             traceback.print_exc()
             return None        
         
+    def _get_region_func(self):
+        global DSPY_REGION_FUNC
+        if DSPY_REGION_FUNC is None:
+            dspy_plugin = self.get_blender_dspy_plugin()
+            try:
+                f = dspy_plugin.GetFloatFramebufferRegion
+            except AttributeError:
+                # older builds of d_blender don't have this function
+                rfb_log().debug("GetFloatFramebufferRegion not found in display driver.")
+                DSPY_REGION_FUNC = False
+                return None
+            RMAN_NUMPY_POINTER = numpy.ctypeslib.ndpointer(dtype=numpy.float32, flags="C")
+            f.argtypes = [ctypes.c_size_t, ctypes.c_int, 
+                          ctypes.c_int, ctypes.c_int, 
+                          ctypes.c_int, ctypes.c_int, 
+                          RMAN_NUMPY_POINTER,
+                          ctypes.c_size_t, ctypes.c_size_t]
+            f.restype = ctypes.c_bool
+            DSPY_REGION_FUNC = f
+        if not DSPY_REGION_FUNC:
+            return None
+        return DSPY_REGION_FUNC
+
+    def _get_dirty_func(self):
+        global DSPY_DIRTY_FUNC
+        if DSPY_DIRTY_FUNC is None:
+            dspy_plugin = self.get_blender_dspy_plugin()
+            try:
+                f = dspy_plugin.GetDirtyRegions
+            except AttributeError:
+                # older builds of d_blender don't have this function
+                rfb_log().debug("GetDirtyRegions not found in display driver.")
+                DSPY_DIRTY_FUNC = False
+                return None
+            f.argtypes = [ctypes.c_size_t, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+            f.restype = ctypes.c_int
+            DSPY_DIRTY_FUNC = f
+        if not DSPY_DIRTY_FUNC:
+            return None
+        return DSPY_DIRTY_FUNC
+
+    def _get_dirty_regions(self, image_num):
+        """Return the regions of the selected image that have changed since the last call.
+        This also clears the dirty regions in the display driver.
+
+        Args:
+        image_num (int) - index of the image we're interested in
+
+        Returns:
+        (list) - list of (start_y, end_y, start_x, end_x) tuples, or None if the whole
+        image should be considered changed
+        """
+
+        f = self._get_dirty_func()
+        if f is None:
+            return None
+        rects = (ctypes.c_int * (RFB_MAX_DIRTY_REGIONS * 4))()
+        count = f(ctypes.c_size_t(image_num), RFB_MAX_DIRTY_REGIONS, rects)
+        if count < 0:
+            return None
+        dirty_regions = list()
+        for j in range(0, count * 4, 4):
+            x_min, x_max, y_min, y_max = rects[j:j+4]
+            dirty_regions.append((y_min, y_max, x_min, x_max))
+        return dirty_regions
+
+    def _get_buffer_region(self, buffer, image_num, num_channels, region, offset=0, row_stride=0):
+        """Have the display driver copy a region of the selected image directly into
+        a preallocated buffer
+
+        Args:
+        buffer (numpy.ndarray) - C contiguous float32 array, large enough to hold the region
+        image_num (int) - index of the image we're interested in
+        num_channels (int) - the number of channels to copy for each pixel
+        region (tuple) - (start_y, end_y, start_x, end_x) of the region to copy
+        offset (int) - where in buffer, in floats, to start writing the region
+        row_stride (int) - the number of floats between rows in buffer. 0 means the rows are packed
+
+        Returns:
+        (bool) - True if the buffer was filled
+        """
+
+        f = self._get_region_func()
+        if f is None:
+            return False
+        start_y, end_y, start_x, end_x = region
+        try:
+            return f(ctypes.c_size_t(image_num), num_channels, start_x, end_x, start_y, end_y, buffer,
+                     ctypes.c_size_t(offset), ctypes.c_size_t(row_stride))
+        except Exception as e:
+            rfb_log().debug("Could not get buffer region: %s" % str(e))
+            return False
+
     def _get_denoise_passes(self, width, height, dspy_dict):
         all_passes = OrderedDict()        
 
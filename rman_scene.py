@@ -2,10 +2,10 @@
 from .rman_translators.rman_camera_translator import RmanCameraTranslator
 from .rman_translators.rman_light_translator import RmanLightTranslator
 from .rman_translators.rman_lightfilter_translator import RmanLightFilterTranslator
-from .rman_translators.rman_mesh_translator import RmanMeshTranslator
+from .rman_translators.rman_mesh_translator import RmanMeshTranslator, RmanMeshPrefetcher
 from .rman_translators.rman_material_translator import RmanMaterialTranslator
 from .rman_translators.rman_hair_translator import RmanHairTranslator
-from .rman_translators.rman_group_translator import RmanGroupTranslator
+from .rman_translators.rman_group_translator import RmanGroupTranslator, RmanTransformBatch, RmanTransformSamples
 from .rman_translators.rman_points_translator import RmanPointsTranslator
 from .rman_translators.rman_quadric_translator import RmanQuadricTranslator
 from .rman_translators.rman_blobby_translator import RmanBlobbyTranslator
@@ -93,6 +93,14 @@ class RmanScene(object):
         num_objects_in_viewlayer (int) - the current number of objects in the current view layer. We're using this
                                        to keep track if an object was removed from a collection
         objects_in_viewlayer (list) - the list of objects (bpy.types.Object) in this view layer.
+        mesh_prefetcher (RmanMeshPrefetcher) - gathers and processes mesh data on other threads
+                                              during export_data_blocks
+        instance_index (RmanInstanceIndex) - index of the exported instances for each object, so IPR
+                                             doesn't have to walk all instances for every edit
+        light_link_table (RmanLightLinkTable) - inverted light linking tables, so we can look up
+                                                the light linking subsets for each object
+        light_inventory (RmanLightInventory) - live list of the lights in the scene, so IPR doesn't
+                                               have to look through all objects to find them
     '''
 
     def __init__(self, rman_render=None):
@@ -117,6 +125,10 @@ class RmanScene(object):
         self.obj_hash = dict()
         self.moving_objects = dict()
         self.rman_prototypes = dict()
+        self.instance_index = scene_utils.RmanInstanceIndex()
+        self.light_link_table = scene_utils.RmanLightLinkTable(self)
+        self.light_inventory = scene_utils.RmanLightInventory()
+        self.mesh_prefetcher = None
 
         self.motion_steps = set()
         self.main_camera = None
@@ -219,7 +231,12 @@ class RmanScene(object):
         self.motion_steps = set()
         self.moving_objects.clear()
         self.rman_prototypes.clear()
+        self.instance_index.clear()
+        object_utils.clear_instance_caches()
+        scene_utils.clear_object_groups_index()
         self.all_lights.clear()
+        self.light_link_table.clear()
+        self.light_inventory.clear()
 
         self.main_camera = None
         self.render_default_light = False
@@ -538,19 +555,20 @@ class RmanScene(object):
         # we'll need this later when we do light linking attributes
         rm = self.bl_scene.renderman
         if self.use_blender_light_link: 
-            self.all_lights = scene_utils.get_all_lights(self.bl_scene, include_light_filters=True)
+            self.all_lights = self.light_inventory.get_lights(self.bl_scene, include_light_filters=True)
         else:
-            self.all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lightfilters(self.bl_scene)]
-            self.all_lights = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lights(self.bl_scene, include_light_filters=False)]
+            self.all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in self.light_inventory.get_lightfilters(self.bl_scene)]
+            self.all_lights = [string_utils.sanitize_node_name(l.name) for l in self.light_inventory.get_lights(self.bl_scene, include_light_filters=False)]
+        self.light_link_table.clear()
         
         root_sg = self.get_root_sg_node()
         attrs = rixattrs
         if rixattrs is None:
             attrs = root_sg.GetAttributes()    
         if not self.use_blender_light_link:            
-            all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lightfilters(self.bl_scene)]
+            all_lightfilters = list(self.all_lightfilters)
             if rm.invert_light_linking:
-                all_lights = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lights(self.bl_scene, include_light_filters=False)]
+                all_lights = list(self.all_lights)
                 for ll in rm.light_links:
                     light_ob = ll.light_ob
                     light_nm = string_utils.sanitize_node_name(light_ob.name)
@@ -690,7 +708,7 @@ class RmanScene(object):
         # export instance attributes
         translator.export_instance_attributes(ob_eval, rman_sg_node, ob_inst, rman_type)         
 
-    def export_instance(self, ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys):
+    def export_instance(self, ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys, transform_batch=None):
         rman_group_translator = self.rman_translators['GROUP']
         rman_sg_group = self.get_rman_sg_instance(ob_inst, rman_sg_node, instance_parent, psys, create=True)
         is_empty_instancer = False
@@ -769,12 +787,29 @@ class RmanScene(object):
             # set a transform.
             return rman_sg_group           
         rman_sg_group.sg_node.SetInheritTransform(False) # we don't want to inherit the transform                
-        rman_group_translator.update_transform(ob_inst, rman_sg_group)
+        if transform_batch is not None:
+            transform_batch.add(ob_inst, rman_sg_group)
+        else:
+            rman_group_translator.update_transform(ob_inst, rman_sg_group)
         return rman_sg_group
 
 
     def export_data_blocks(self, selected_objects=False, objects_list=False):    
-        
+        # mesh prototypes are gathered as we find them, and processed on other 
+        # threads while we export the rest of the scene
+        self.mesh_prefetcher = RmanMeshPrefetcher(self.rman_translators['MESH'])
+        # instance transforms are collected and set in bulk
+        transform_batch = RmanTransformBatch(self.rman_translators['GROUP'])
+        try:
+            if not self._export_data_blocks_(selected_objects=selected_objects, objects_list=objects_list, transform_batch=transform_batch):
+                return False
+            return self.mesh_prefetcher.flush(cancel_requested=self.cancel_requested)
+        finally:
+            transform_batch.flush()
+            self.mesh_prefetcher.shutdown()
+            self.mesh_prefetcher = None
+
+    def _export_data_blocks_(self, selected_objects=False, objects_list=False, transform_batch=None):
         total = len(self.depsgraph.object_instances)
         for i, ob_inst in enumerate(self.depsgraph.object_instances):
             if self.cancel_requested():
@@ -807,9 +842,10 @@ class RmanScene(object):
                 instance_parent = ob_inst.parent
 
             rman_type = object_utils._detect_primitive_(ob_eval)
-            rman_sg_node = self.get_rman_prototype(proto_key, ob=ob_eval, create=True)
+            rman_sg_node = self.get_rman_prototype(proto_key, ob=ob_eval, create=True, is_instance=ob_inst.is_instance)
             if not rman_sg_node:
                 continue
+            self.instance_index.add(ob_inst, proto_key)
 
             if rman_type == 'LIGHT':
                 self.check_solo_light(rman_sg_node, ob_eval)
@@ -817,12 +853,12 @@ class RmanScene(object):
             if rman_type in object_utils._RMAN_NO_INSTANCES_:
                 continue
 
-            self.export_instance(ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys)
+            self.export_instance(ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys, transform_batch=transform_batch)
             rfb_log().debug("   Exported %d/%d instances... (%s)" % (i, total, ob.name))   
             self.rman_render.stats_mgr.set_export_stats("Exported (%s)" % ob.name,i/total, total) 
         return True
 
-    def export_data_block(self, proto_key, ob):
+    def export_data_block(self, proto_key, ob, is_instance=False):
         rman_type = object_utils._detect_primitive_(ob)
 
         if rman_type == "META":
@@ -866,6 +902,10 @@ class RmanScene(object):
         if self.do_motion_blur and rman_sg_node.is_deforming and rman_type in ['MESH', 'FLUID', 'CURVES']:
             pass
             # for these deforming types, update is called in export_instances_motion
+        elif rman_type == 'MESH' and self.mesh_prefetcher and not is_instance:
+            # instances are only valid while we're on them, so they're
+            # updated right away
+            self.mesh_prefetcher.add(ob, rman_sg_node)
         else:
             translator.update(ob, rman_sg_node)
         
@@ -937,9 +977,11 @@ class RmanScene(object):
         delta = 0.0
         if len(motion_steps) > 0:
             delta = -motion_steps[0]
-        psys_translator = self.rman_translators['PARTICLES']            
-        rman_group_translator = self.rman_translators['GROUP']
-        deform_sampled = dict() # dictionary to know what segment we've already sampled for deform blur
+        cam_steps = {s: i for i, s in enumerate(self.main_camera.motion_steps)}
+
+        # the first sample walks all of the instances, and collects the ones that
+        # are moving or deforming. The rest of the samples only visit those.
+        motion_instances = None
         for samp, seg in enumerate(motion_steps):
             if self.cancel_requested():
                 return False            
@@ -948,113 +990,180 @@ class RmanScene(object):
                 self.rman_render.bl_engine.frame_set(origframe - 1, subframe=1.0 + seg)
             else:
                 self.rman_render.bl_engine.frame_set(origframe, subframe=seg)
+            object_utils.clear_instance_caches()
 
             # apparently, this is not needed
             #self.depsgraph.update()
 
             time_samp = seg + delta # get the normlized version of the segment
-            total = len(self.depsgraph.object_instances)
 
             # update camera
-            if not first_sample and self.main_camera.is_transforming and seg in self.main_camera.motion_steps:
+            if not first_sample and self.main_camera.is_transforming and seg in cam_steps:
                 cam_translator =  self.rman_translators['CAMERA']
-                idx = -1
-                for i, s in enumerate(self.main_camera.motion_steps):
-                    if s == seg:
-                        idx = i
-                        break
-                cam_translator.update_transform(self.depsgraph.scene_eval.camera, self.main_camera, idx, time_samp)
+                cam_translator.update_transform(self.depsgraph.scene_eval.camera, self.main_camera, cam_steps[seg], time_samp)
 
             rfb_log().debug(" Export Sample: %i" % samp)
-            for i, ob_inst in enumerate(self.depsgraph.object_instances):
-                if self.cancel_requested():
-                    return False                
-                if selected_objects and not self.is_instance_selected(ob_inst):
-                    continue
+            if first_sample:
+                motion_instances = self._get_motion_instances_(seg, delta, selected_objects)
+                if motion_instances is None:
+                    return False
+            elif not self._export_motion_sample_(motion_instances, samp, seg):
+                return False
 
-                if not self.check_visibility(ob_inst):
-                    continue
+        # now that we have all of the samples, set the transforms
+        if motion_instances:
+            for transform_samples in motion_instances.transform_samples:
+                transform_samples.flush()
+
+        #self.rman_render.bl_engine.frame_set(origframe, subframe=0)
+        object_utils.clear_instance_caches()
+        rfb_log().debug("   Finished exporting motion instances")
+        self.rman_render.stats_mgr.set_export_stats("Finished exporting motion instances", 100)
+        return True
+
+    def _get_motion_instances_(self, seg, delta, selected_objects=False):
+        '''
+        Export the first motion sample. This walks all of the instances, 
+        and collects the ones that are moving or deforming.
+
+        Returns:
+            (RmanMotionInstances) - the moving/deforming instances, or None if 
+                                    we were cancelled
+        '''
+        psys_translator = self.rman_translators['PARTICLES']
+        rman_group_translator = self.rman_translators['GROUP']
+        motion_instances = scene_utils.RmanMotionInstances()
+        total = len(self.depsgraph.object_instances)
+        for i, ob_inst in enumerate(self.depsgraph.object_instances):
+            if self.cancel_requested():
+                return None
+            if selected_objects and not self.is_instance_selected(ob_inst):
+                continue
+
+            if not self.check_visibility(ob_inst):
+                continue
+
+            psys = None
+            ob = ob_inst.object.evaluated_get(self.depsgraph)
+            proto_key = object_utils.prototype_key(ob_inst)
+            rfb_log().debug("   Exported %d/%d motion instances... (%s)" % (i, total, ob.name))
+            self.rman_render.stats_mgr.set_export_stats("Exporting motion instances (0) ", i/total)
+            instance_parent = None
+            if ob_inst.is_instance:
+                psys = ob_inst.particle_system
+                instance_parent = ob_inst.parent
+
+            rman_type = object_utils._detect_primitive_(ob)
+            if rman_type in object_utils._RMAN_NO_INSTANCES_:
+                continue
 
-                psys = None
-                ob = ob_inst.object.evaluated_get(self.depsgraph)
-                proto_key = object_utils.prototype_key(ob_inst)
-                rfb_log().debug("   Exported %d/%d motion instances... (%s)" % (i, total, ob.name))
-                self.rman_render.stats_mgr.set_export_stats("Exporting motion instances (%d) " % samp ,i/total)
-                instance_parent = None
-                if ob_inst.is_instance:
-                    psys = ob_inst.particle_system
-                    instance_parent = ob_inst.parent
-
-                rman_type = object_utils._detect_primitive_(ob)
-                if rman_type in object_utils._RMAN_NO_INSTANCES_:
+            # if an object is not an instance, check if it's a moving object
+            if not ob_inst.is_instance:
+                if ob.name_full not in self.moving_objects:
                     continue
 
-                # if an object is not an instance, check if it's a moving object
-                if not ob_inst.is_instance:
-                    if ob.name_full not in self.moving_objects:
-                        continue
+            rman_sg_node = self.get_rman_prototype(proto_key, ob=ob)
+            if not rman_sg_node:
+                continue
 
-                for psys in ob.particle_systems:
-                    if psys.settings.type != 'HAIR' or object_utils.is_particle_instancer(psys):
+            new_proto = proto_key not in motion_instances.prototypes
+            motion_proto = motion_instances.get_prototype(proto_key, rman_sg_node)
+            if new_proto:
+                for ob_psys in ob.particle_systems:
+                    if ob_psys.settings.type != 'HAIR' or object_utils.is_particle_instancer(ob_psys):
                         continue
-                    if psys.settings.renderman.do_velocity_blur:
+                    if ob_psys.settings.renderman.do_velocity_blur:
                         continue
-                    ob_psys = self.rman_particles.get(proto_key, dict())
-                    rman_sg_particles = ob_psys[psys.settings.original]
-                    deform_idx = 0
-                    for i, s in enumerate(rman_sg_node.deform_motion_steps):
-                        if s == seg:
-                            deform_idx = i
-                            break
-                    if first_sample:
-                        psys_translator.update(ob, psys, rman_sg_particles)
-                    else:                
-                        psys_translator.export_deform_sample(rman_sg_particles, ob, psys, deform_idx)
+                    rman_sg_particles = self.rman_particles.get(proto_key, dict()).get(ob_psys.settings.original, None)
+                    if rman_sg_particles is None:
+                        continue
+                    motion_proto.add_hair(ob_psys, rman_sg_particles)
+                    psys_translator.update(ob, ob_psys, rman_sg_particles)
+                self._export_motion_deform_sample_(motion_proto, ob, seg, first_sample=True)
 
-                rman_sg_node = self.get_rman_prototype(proto_key, ob=ob)
-                if not rman_sg_node:
-                    continue
+            rman_sg_group = self.get_rman_sg_instance(ob_inst, rman_sg_node, instance_parent, psys)
+            if not rman_sg_group:
+                continue         
 
-                rman_sg_group = self.get_rman_sg_instance(ob_inst, rman_sg_node, instance_parent, psys)
-                if not rman_sg_group:
-                    continue         
-
-                # transformation blur
-                if rman_sg_group.is_transforming and seg in rman_sg_group.motion_steps:
-                    idx = 0
-                    for i, s in enumerate(rman_sg_group.motion_steps):
-                        if s == seg:
-                            idx = i
-                            break
-
-                    if first_sample:
-                        rman_group_translator.update_transform_num_samples(rman_sg_group, rman_sg_group.motion_steps ) 
-                    rman_group_translator.update_transform_sample( ob_inst, rman_sg_group, idx, time_samp)
-
-                # deformation blur
-                sampled = deform_sampled.get(rman_sg_node, list())
-                if rman_sg_node.is_deforming and seg in rman_sg_node.deform_motion_steps and seg not in sampled:
-                    rman_type = rman_sg_node.rman_type
-                    if rman_type in ['MESH', 'FLUID', 'CURVES']:
-                        translator = self.rman_translators.get(rman_type, None)                        
-                        if translator :
-                            deform_idx = 0
-                            for i, s in enumerate(rman_sg_node.deform_motion_steps):
-                                if s == seg:
-                                    deform_idx = i
-                                    break
-                            if first_sample:
-                                translator.update(ob, rman_sg_node)
-                            else:
-                                translator.export_deform_sample(rman_sg_node, ob, deform_idx)
-                            sampled.append(seg)
-                            deform_sampled[rman_sg_node] = sampled
+            # transformation blur
+            transform_samples = None
+            if rman_sg_group.is_transforming:
+                transform_samples = RmanTransformSamples(rman_group_translator, rman_sg_group, delta)
+                transform_samples.add(ob_inst, seg)
+
+            motion_instances.add(ob_inst, object_utils.get_group_db_name(ob_inst), transform_samples, motion_proto)
+
+        return motion_instances
+
+    def _export_motion_sample_(self, motion_instances, samp, seg):
+        '''
+        Export one of the motion samples after the first. Only the instances
+        in motion_instances are visited.
+
+        Returns:
+            (bool) - False if we were cancelled
+        '''
+        self.rman_render.stats_mgr.set_export_stats("Exporting motion instances (%d) " % samp, 0)
+
+        # objects that are not instanced can be looked up directly
+        for ob_orig, (transform_samples, motion_proto) in motion_instances.objects.items():
+            if self.cancel_requested():
+                return False
+            ob = ob_orig.evaluated_get(self.depsgraph)
+            if transform_samples:
+                transform_samples.add(ob, seg)
+            if motion_proto:
+                self._export_motion_deform_sample_(motion_proto, ob, seg)
+
+        if not motion_instances.instancers:
+            return True
+
+        for ob_inst in self.depsgraph.object_instances:
+            if self.cancel_requested():
+                return False
+            if not ob_inst.is_instance:
+                continue
+            if ob_inst.parent.original not in motion_instances.instancers:
+                continue
+            transform_samples = motion_instances.instances.get(object_utils.get_group_db_name(ob_inst), None)
+            if transform_samples:
+                transform_samples.add(ob_inst, seg)
+            motion_proto = motion_instances.prototypes.get(object_utils.prototype_key(ob_inst), None)
+            if motion_proto:
+                self._export_motion_deform_sample_(motion_proto, ob_inst.object.evaluated_get(self.depsgraph), seg)
 
-        #self.rman_render.bl_engine.frame_set(origframe, subframe=0)
-        rfb_log().debug("   Finished exporting motion instances")
-        self.rman_render.stats_mgr.set_export_stats("Finished exporting motion instances", 100)
         return True
 
+    def _export_motion_deform_sample_(self, motion_proto, ob, seg, first_sample=False):
+        # hair. On the first sample, the hair has already been updated
+        if not first_sample:
+            psys_translator = self.rman_translators['PARTICLES']
+            for psys in ob.particle_systems:
+                hair = motion_proto.hair.get(psys.settings.original, None)
+                if hair is None:
+                    continue
+                rman_sg_particles, steps, sampled = hair
+                deform_idx = steps.get(seg, None)
+                if deform_idx is None or seg in sampled:
+                    continue
+                psys_translator.export_deform_sample(rman_sg_particles, ob, psys, deform_idx)
+                sampled.add(seg)
+
+        # deformation blur
+        if not motion_proto.deforming:
+            return
+        deform_idx = motion_proto.steps.get(seg, None)
+        if deform_idx is None or seg in motion_proto.sampled:
+            return
+        rman_sg_node = motion_proto.rman_sg_node
+        translator = self.rman_translators.get(rman_sg_node.rman_type, None)
+        if translator:
+            if first_sample:
+                translator.update(ob, rman_sg_node)
+            else:
+                translator.export_deform_sample(rman_sg_node, ob, deform_idx)
+            motion_proto.sampled.add(seg)
+
     def export_defaultlight(self):
         # Export a headlight light if needed
         if not self.default_light:
@@ -1077,7 +1186,7 @@ class RmanScene(object):
         num_lights = len(scene_utils.get_all_lights(self.bl_scene, include_light_filters=False))
         return num_lights > 0
 
-    def get_rman_prototype(self, proto_key, ob=None, create=False):
+    def get_rman_prototype(self, proto_key, ob=None, create=False, is_instance=False):
         if proto_key in self.rman_prototypes:
             return self.rman_prototypes[proto_key]
 
@@ -1087,7 +1196,7 @@ class RmanScene(object):
         if not ob:
             return None
 
-        rman_sg_node = self.export_data_block(proto_key, ob)
+        rman_sg_node = self.export_data_block(proto_key, ob, is_instance=is_instance)
         return rman_sg_node
 
     def get_rman_particles(self, proto_key, psys, ob, create=True):
@@ -5,13 +5,16 @@ from .rfb_utils import scene_utils
 from .rfb_utils import shadergraph_utils
 from .rfb_utils import string_utils
 from .rfb_utils.timer_utils import time_this
+from .rfb_utils import prefs_utils
 
 from .rfb_logger import rfb_log
 from .rman_sg_nodes.rman_sg_lightfilter import RmanSgLightFilter
+from .rman_translators.rman_group_translator import RmanTransformBatch
 
 from . import rman_constants
 from copy import deepcopy
 import bpy
+import time
 
 class RmanUpdate:
     '''
@@ -48,6 +51,13 @@ class RmanSceneSync(object):
         rman () - rman python module
         rman_scene (RmanScene) - pointer to the current RmanScene object
         sg_scene (RixSGSCene) - the RenderMan scene graph object
+        view_state (tuple) - the state of the viewport the last time we updated the viewport camera
+        last_view_update (float) - the time of the last viewport camera update
+        view_redraw_pending (bool) - whether we've asked for a redraw, to pick up a view 
+                                    change we held back 
+        edit_queue (dict) - scene graph edits from property callbacks, waiting to be applied.
+                            Edits with the same key replace each other
+        edit_flush_pending (bool) - whether a timer has been registered to apply the edit_queue
 
     '''
 
@@ -63,6 +73,12 @@ class RmanSceneSync(object):
         self.rman_updates = dict() # A dicitonary to hold RmanUpdate instances
         self.selected_channel = None
         self.need_cleaning = dict() # A dictionary to hold what instances need to be kept/deleted
+        self.view_state = None
+        self.last_view_update = 0.0
+        self.view_redraw_pending = False
+        self.edit_queue = dict()
+        self.edit_flush_pending = False
+        self.material_param_edits = set() # materials that a queued parameter edit will take care of
 
     @property
     def sg_scene(self):
@@ -79,6 +95,81 @@ class RmanSceneSync(object):
         self.rman_updates = dict()
         self.selected_channel = None   
         self.need_cleaning = dict()    
+        self.view_state = None
+        self.last_view_update = 0.0
+        self.view_redraw_pending = False
+        self.edit_queue = dict()
+        self.material_param_edits = set()
+
+    def queue_edit(self, key, func):
+        '''
+        Queue up a scene graph edit from a property callback. Edits that come in within
+        the rman_ipr_edit_window preference of each other are applied together, in a single 
+        ScopedEdit, so that the renderer only restarts once for all of them. If an edit with the 
+        same key is already waiting, it's replaced, ex: when dragging a slider only the last value 
+        is sent. Any waiting edits are also applied at the start of the next depsgraph update.
+
+        Args:
+            key (hashable) - identifies what the edit is for
+            func (function) - function that does the edit. It's called inside of a ScopedEdit
+        '''
+        window = prefs_utils.get_pref('rman_ipr_edit_window', default=0.05)
+        if window <= 0.0:
+            self.edit_queue[key] = func
+            self.flush_edits()
+            return
+        # re-insert, so that edits are applied in the order of their last change
+        self.edit_queue.pop(key, None)
+        self.edit_queue[key] = func
+        if not self.edit_flush_pending:
+            self.edit_flush_pending = True
+            bpy.app.timers.register(self._flush_edits_timer_, first_interval=window)
+
+    def flush_edits(self):
+        edits = self.edit_queue
+        self.edit_queue = dict()
+        if not edits:
+            return
+        if not self.rman_render.rman_context.is_interactive_running() or not self.rman_scene.sg_scene:
+            return
+        rfb_log().debug("Applying %d queued edits" % len(edits))
+        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+            for func in edits.values():
+                try:
+                    func()
+                except ReferenceError:
+                    # the datablock was removed before we got to it
+                    pass
+
+    def _flush_edits_timer_(self):
+        self.edit_flush_pending = False
+        self.flush_edits()
+        return None
+
+    def _get_view_state_(self, context):
+        # everything about the viewport that update_view looks at
+        region = context.region
+        region_data = context.region_data
+        space = context.space_data
+        if region is None or region_data is None or space is None or space.type != 'VIEW_3D':
+            return None
+        return (region.width, region.height, self.rman_scene.viewport_render_res_mult,
+                tuple(v for row in region_data.view_matrix for v in row),
+                region_data.view_perspective, region_data.view_camera_zoom, 
+                tuple(region_data.view_camera_offset),
+                space.lens, space.clip_start, space.clip_end, 
+                space.camera, space.use_local_camera, self.rman_scene.bl_scene.camera,
+                space.use_render_border, space.render_border_min_x, space.render_border_max_x,
+                space.render_border_min_y, space.render_border_max_y)
+
+    def _view_redraw_(self):
+        self.view_redraw_pending = False
+        try:
+            if self.rman_render.bl_engine:
+                self.rman_render.bl_engine.tag_redraw()
+        except ReferenceError:
+            pass
+        return None
 
     def update_view(self, context, depsgraph):
         camera = depsgraph.scene.camera
@@ -88,10 +179,35 @@ class RmanSceneSync(object):
         self.rman_scene.bl_view_layer = depsgraph.view_layer_eval
         rman_sg_camera = self.rman_scene.main_camera
         translator = self.rman_scene.rman_translators['CAMERA']
+
+        if self.rman_scene.is_viewport_render:
+            # Blender calls us for every redraw, including the ones for new pixels.
+            # Skip the edit entirely if the view hasn't changed.
+            view_state = self._get_view_state_(context)
+            if view_state is not None and view_state == self.view_state:
+                return
+
+            # Coalesce bursts of view changes (ex: tumbling the viewport). If we updated
+            # too recently, hold this change back and ask for another redraw; we'll pick up 
+            # the latest view then.
+            max_rate = prefs_utils.get_pref('rman_viewport_max_update_rate', default=30.0)
+            if max_rate > 0.0:
+                now = time.time()
+                wait = (1.0 / max_rate) - (now - self.last_view_update)
+                if wait > 0.0:
+                    if not self.view_redraw_pending:
+                        self.view_redraw_pending = True
+                        bpy.app.timers.register(self._view_redraw_, first_interval=wait)
+                    return
+                self.last_view_update = now
+            self.view_state = view_state
+
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
             if self.rman_scene.is_viewport_render:
                 if translator.update_viewport_resolution(rman_sg_camera):
-                    translator.update_viewport_cam(None, rman_sg_camera, force_update=True)
+                    # the projection only needs to be rebuilt if something 
+                    # other than the view has changed
+                    translator.update_viewport_cam(None, rman_sg_camera, force_update=True, reuse_projection=True)
                 translator.update_transform(None, rman_sg_camera)
             else:
                 translator.update_transform(camera, rman_sg_camera)  
@@ -630,6 +746,11 @@ class RmanSceneSync(object):
         self.rman_updates = dict()
         self.num_instances_changed = False
         self.check_all_instances = False
+        self.view_state = None
+        object_utils.clear_instance_caches()
+        scene_utils.clear_object_groups_index()
+        # the frame changed, so anything could be animated
+        self.rman_scene.light_inventory.invalidate()
 
         self.rman_scene.bl_scene = depsgraph.scene_eval
         self.rman_scene.context = context     
@@ -648,6 +769,8 @@ class RmanSceneSync(object):
             rfb_log().debug("\tNumber of instances changed: %d -> %d" % (self.rman_scene.num_object_instances, len(depsgraph.object_instances)))
             self.num_instances_changed = True
             self.rman_scene.num_object_instances = len(depsgraph.object_instances)
+            # objects may have been added or deleted
+            self.rman_scene.light_inventory.invalidate()
 
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):  
             for dps_update in reversed(depsgraph.updates):
@@ -700,18 +823,33 @@ class RmanSceneSync(object):
                                   
     @time_this
     def update_scene(self, context, depsgraph):
+        # everything from this depsgraph update, along with any edits still 
+        # queued up from property callbacks, goes into a single edit
+        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+            self.flush_edits()
+            self._update_scene_(context, depsgraph)
+        self.material_param_edits.clear()
+
+    def _update_scene_(self, context, depsgraph):
 
         #self.rman_updates = dict()
         self.num_instances_changed = False
         self.frame_number_changed = False
         self.check_all_instances = False
         self.do_geo_node_tree_check = False
+        self.view_state = None # something in the scene changed, make sure update_view checks the camera
+        object_utils.clear_instance_caches()
+        scene_utils.clear_object_groups_index()
                 
         self.rman_scene.depsgraph = depsgraph
         self.rman_scene.bl_scene = depsgraph.scene
         self.rman_scene.context = context       
         self.rman_scene.bl_view_layer = depsgraph.view_layer_eval
 
+        # the light linking tables must not carry over from the last update, 
+        # since the datablock checks below can use them
+        self.update_light_lists()
+
         rfb_log().debug("------Start update scene--------")    
        
         # Check the number of instances. If we differ, an object may have been
@@ -720,6 +858,8 @@ class RmanSceneSync(object):
             rfb_log().debug("\tNumber of instances changed: %d -> %d" % (self.rman_scene.num_object_instances, len(depsgraph.object_instances)))
             self.num_instances_changed = True
             self.rman_scene.num_object_instances = len(depsgraph.object_instances)
+            # objects may have been added or deleted
+            self.rman_scene.light_inventory.invalidate()
 
         for dps_update in reversed(depsgraph.updates):
             if isinstance(dps_update.id, bpy.types.Scene):
@@ -728,11 +868,10 @@ class RmanSceneSync(object):
 
             elif isinstance(dps_update.id, bpy.types.World):
                 rfb_log().debug("World updated: %s" % dps_update.id.name)
-                with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
-                    self.rman_scene.export_integrator()
-                    self.rman_scene.export_samplefilters()
-                    self.rman_scene.export_displayfilters()
-                    self.rman_scene.export_viewport_stats()
+                self.rman_scene.export_integrator()
+                self.rman_scene.export_samplefilters()
+                self.rman_scene.export_displayfilters()
+                self.rman_scene.export_viewport_stats()
 
             elif isinstance(dps_update.id, bpy.types.Camera):
                 rfb_log().debug("Camera updated: %s" % dps_update.id.name)
@@ -741,18 +880,20 @@ class RmanSceneSync(object):
                         continue
                     rman_sg_camera = self.rman_scene.main_camera
                     translator = self.rman_scene.rman_translators['CAMERA']
-                    with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-                        translator.update_viewport_cam(self.rman_scene.bl_scene.camera, rman_sg_camera, force_update=True)       
+                    translator.update_viewport_cam(self.rman_scene.bl_scene.camera, rman_sg_camera, force_update=True)       
                 else:
                     translator = self.rman_scene.rman_translators['CAMERA']                 
-                    with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-                        for ob, rman_sg_camera in self.rman_scene.rman_cameras.items():     
-                            if ob.original.name != dps_update.id.name:
-                                continue
-                            translator._update_render_cam(ob.original, rman_sg_camera)
+                    for ob, rman_sg_camera in self.rman_scene.rman_cameras.items():     
+                        if ob.original.name != dps_update.id.name:
+                            continue
+                        translator._update_render_cam(ob.original, rman_sg_camera)
 
             elif isinstance(dps_update.id, bpy.types.Material):
                 rfb_log().debug("Material updated: %s" % dps_update.id.name)
+                self.rman_scene.light_inventory.material_updated(dps_update.id)
+                if dps_update.id.original in self.material_param_edits:
+                    # update_material_node_param already took care of this one
+                    continue
                 self.material_updated(dps_update)    
 
             elif isinstance(dps_update.id, bpy.types.Mesh):
@@ -768,6 +909,7 @@ class RmanSceneSync(object):
                 self.check_shader_nodetree(dps_update)
                                             
             elif isinstance(dps_update.id, bpy.types.Object):                
+                self.rman_scene.light_inventory.update_object(dps_update.id)
                 self.check_object_datablock(dps_update)                     
 
             elif isinstance(dps_update.id, bpy.types.Collection):
@@ -826,24 +968,224 @@ class RmanSceneSync(object):
             return True
         return False
 
+    def _check_instance_(self, instance, ob_key, rman_update, instance_parent, psys, deleted_obj_keys, already_udpated, transform_batch, batch_mode=False, proto_key=None):
+        '''
+        Update a single instance. instance is either a DepsgraphObjectInstance or, when
+        we're able to skip walking the depsgraph, an RmanInstanceRecord from our instance
+        index. In the latter case, proto_key needs to be passed in.
+        '''
+        ob_eval = instance.object.evaluated_get(self.rman_scene.depsgraph)  
+        if proto_key is None:
+            proto_key = object_utils.prototype_key(instance)      
+            self.rman_scene.instance_index.add(instance, proto_key)
+        is_instance = instance.is_instance
+        rman_sg_node = None
+        is_empty_instancer = False
+        is_new_object = False
+        if is_instance and instance_parent is None:
+            ob_key = instance.instance_object.original      
+            psys = instance.particle_system
+            instance_parent = instance.parent 
+            is_empty_instancer = object_utils.is_empty_instancer(instance_parent)                    
+            
+        if proto_key in deleted_obj_keys:
+            deleted_obj_keys.remove(proto_key)                         
+        
+        if rman_sg_node is None:
+            rman_sg_node = self.rman_scene.get_rman_prototype(proto_key)
+        rman_type = object_utils._detect_primitive_(ob_eval)
+        if rman_sg_node and rman_type != rman_sg_node.rman_type:
+            # Types don't match
+            #
+            # This can happen because
+            # we have not been able to tag our types before Blender
+            # tells us an object has been added
+            # For now, just delete the existing sg_node
+            rfb_log().debug("\tTypes don't match. Removing: %s" % proto_key)
+            del self.rman_scene.rman_prototypes[proto_key]
+            rman_sg_node = None
+
+        if not rman_sg_node:
+            # this is a new object.
+
+            rman_sg_node = self.rman_scene.export_data_block(proto_key, ob_eval)
+            if not rman_sg_node:
+                return
+
+            rfb_log().debug("\tNew Object added: %s (%s)" % (proto_key, rman_type))
+
+            if rman_type in ['LIGHT', 'LIGHTFILTER']:
+                self.rman_scene.set_root_lightlinks() # update lightlinking on the root node
+
+            if rman_type == 'LIGHTFILTER':
+                # update all lights with this light filter
+                users = bpy.context.blend_data.user_map(subset={ob_eval.original})
+                for o in users[ob_eval.original]:
+                    if isinstance(o, bpy.types.Light):
+                        o.node_tree.update_tag()
+                return
+
+            is_new_object = True
+            if rman_update is None:
+                rman_update = self.create_rman_update(ob_key, update_geometry=False, update_shading=True, update_transform=True)
+            # set update_geometry to False
+            # since we've already exported the datablock                        
+            rman_update.is_updated_geometry = False
+                                                        
+            
+        # Originally, we were only updating the prototype, if the DepsgraphInstance
+        # was not is_instance. However, this doesn't work for META
+        # objects as the mesh has is_instance=True.
+        # So we now let whichever DepsgraphInstance we get first do the prototype updating
+        if rman_sg_node and not is_new_object: # and not is_instance:
+            if proto_key not in already_udpated:
+                if rman_update.is_updated_attributes:
+                    # this should be a simple attribute change
+                    from .rfb_utils import property_utils
+                    attrs = rman_sg_node.sg_attributes.GetAttributes()
+                    rm = ob_eval.renderman
+                    if is_empty_instancer:
+                        rm = instance_parent.renderman
+                    meta = rm.prop_meta[rman_update.updated_prop_name]
+                    rfb_log().debug("Setting RiAttribute: %s" % rman_update.updated_prop_name)
+                    property_utils.set_riattr_bl_prop(attrs, rman_update.updated_prop_name, meta, rm, check_inherit=True)
+                    rman_sg_node.sg_attributes.SetAttributes(attrs)       
+                else:                   
+                    if rman_update.is_updated_geometry:
+                        translator =  self.rman_scene.rman_translators.get(rman_type, None)
+                        if rman_update.updated_prop_name:
+                            rfb_log().debug("\tUpdating Single Primvar: %s" % proto_key)
+                            translator.update_primvar(ob_eval, rman_sg_node, rman_update.updated_prop_name)
+                        else:
+                            rfb_log().debug("\tUpdating Object: %s" % proto_key)
+                            translator.update(ob_eval, rman_sg_node)  
+                            #rman_sg_node.shared_attrs.Clear()
+                            # self.rman_scene.attach_material(ob_eval, rman_sg_node, sg_node=rman_sg_node.sg_attributes)
+                            self.update_particle_emitters(ob_eval)
+                    if rman_update.is_updated_shading:
+                        rfb_log().debug("\tUpdating Shading: %s" % proto_key)
+                        self.rman_scene.attach_material(ob_eval, rman_sg_node, sg_node=rman_sg_node.sg_attributes)                            
+                        
+                if rman_type == "MESH" and rman_update.is_updated_geometry and not is_instance:
+                    # if this is a mesh, and not an instance, check if we generated geometry
+                    # if not, don't append to already_updated, instances of this prototype
+                    # may generate mesh -- this is the case for geometry node instances
+                    if rman_sg_node.npoints == 0:
+                        rfb_log().debug("\tMesh: %s has no points" % proto_key)
+                        return 
+                already_udpated.add(proto_key)   
+
+        if rman_type in object_utils._RMAN_NO_INSTANCES_:
+            if rman_type == 'EMPTY':
+                self.rman_scene._export_hidden_instance(ob_eval, rman_sg_node)
+            return                         
+
+        # simply grab the existing instance and update the transform and/or material
+        rman_sg_group = self.rman_scene.get_rman_sg_instance(instance, rman_sg_node, instance_parent, psys, create=False)
+        rman_group_translator = self.rman_scene.rman_translators['GROUP']
+
+        if self.num_instances_changed:
+            self.add_to_need_cleaning(instance, rman_sg_node)  
+
+        if rman_sg_group:
+            # update instance attributes
+            self.rman_scene.update_instance_attributes(rman_group_translator, rman_sg_group, ob_eval, instance, rman_type, remove=True)                                
+            if rman_update.is_updated_attributes:    
+                return
+
+            if rman_update.is_updated_transform:
+                transform_batch.add(instance, rman_sg_group)
+
+            if rman_update.is_updated_shading: 
+                if not self.check_ob_to_meshlight(ob_eval, instance, rman_sg_node, rman_sg_group, rman_type, instance_parent, psys, is_empty_instancer):
+                    if is_empty_instancer:
+                        if instance_parent.renderman.rman_material_override:
+                            self.rman_scene.attach_material(instance_parent, rman_sg_group)                            
+                        else:
+                            self.rman_scene.attach_material(ob_eval, rman_sg_group)   
+                    elif psys:
+                        self.rman_scene.attach_particle_material(psys, instance_parent, ob_eval, rman_sg_group)
+                    elif ob_eval.renderman.rman_material_override:
+                        self.rman_scene.attach_material(ob_eval, rman_sg_group)                            
+        else:
+            # Didn't get an rman_sg_group. Do a full instance export.
+            self.rman_scene.export_instance(ob_eval, instance, rman_sg_node, rman_type, instance_parent, psys, transform_batch=transform_batch)
+                    
+        if not batch_mode:
+            if rman_type == 'LIGHT':
+                # We are dealing with a light. Check if it's a solo light, or muted
+                self.rman_scene.check_solo_light(rman_sg_node, ob_eval)
+
+                # check portal lights
+                self.update_portals(ob_eval)
+                
+                # Hide the default light
+                if self.rman_scene.default_light.GetHidden() != 1:
+                    self.rman_scene.default_light.SetHidden(1)                
+
+            # Delete any removed partcle systems
+            if proto_key in self.rman_scene.rman_particles:                                                
+                ob_psys = self.rman_scene.rman_particles[proto_key]
+                rman_particle_nodes = list(ob_psys)
+                for psys in ob_eval.particle_systems:
+                    try:
+                        rman_particle_nodes.remove(psys.settings.original)
+                    except:
+                        continue
+                if rman_particle_nodes:
+                    rfb_log().debug("\t\tRemoving particle nodes: %s" % proto_key)
+                for k in rman_particle_nodes:                        
+                    del ob_psys[k]
+
+    def update_light_lists(self):
+        '''
+        Refresh rman_scene.all_lights and rman_scene.all_lightfilters from the
+        light inventory, and clear the light linking tables built from them.
+        '''
+        light_inventory = self.rman_scene.light_inventory
+        if self.rman_scene.use_blender_light_link:  
+            self.rman_scene.all_lights = light_inventory.get_lights(self.rman_scene.bl_scene, include_light_filters=True)
+        else:
+            self.rman_scene.all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in light_inventory.get_lightfilters(self.rman_scene.bl_scene)]
+            self.rman_scene.all_lights = [string_utils.sanitize_node_name(l.name) for l in light_inventory.get_lights(self.rman_scene.bl_scene, include_light_filters=False)]       
+        self.rman_scene.light_link_table.clear()
+
     @time_this
     def check_instances(self, batch_mode=False):
         deleted_obj_keys = list(self.rman_scene.rman_prototypes) # list of potential objects to delete
         already_udpated = set() # set of objects already updated during our loop     
         self.need_cleaning = dict()     
-        if self.rman_scene.use_blender_light_link:  
-            self.rman_scene.all_lights = scene_utils.get_all_lights(self.rman_scene.bl_scene, include_light_filters=True)
-        else:
-            self.rman_scene.all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lightfilters(self.rman_scene.bl_scene)]
-            self.rman_scene.all_lights = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lights(self.rman_scene.bl_scene, include_light_filters=False)]       
+        # pick up any lights that were added or removed by this update
+        self.update_light_lists()
 
         rfb_log().debug("Updating instances")  
 
+        instance_index = self.rman_scene.instance_index
+        if not batch_mode and not self.check_all_instances and not self.num_instances_changed:
+            # if everything that was edited is in our instance index, we can 
+            # update those objects directly, without walking all of the instances
+            records = instance_index.get_records(self.rman_updates.keys(), self.rman_scene.depsgraph)
+            if records is not None:
+                rfb_log().debug("Updating %d indexed instances" % len(records))
+                with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
+                    transform_batch = RmanTransformBatch(self.rman_scene.rman_translators['GROUP'])
+                    for ob_key, record in records:
+                        rman_update = self.rman_updates[ob_key]
+                        self._check_instance_(record, ob_key, rman_update, None, None, deleted_obj_keys, already_udpated, transform_batch, proto_key=record.proto_key)
+                    transform_batch.flush()
+                return
+
+        if self.num_instances_changed:
+            # instances were added or removed, rebuild the index as we go
+            instance_index.clear()
+
         '''
         This loop can get really expensive really fast when we have lots of instances
         We want to bail on each instance as soon as possible if it was never edited
         '''
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
+            # instance transforms are collected and set in bulk
+            transform_batch = RmanTransformBatch(self.rman_scene.rman_translators['GROUP'])
             for instance in self.rman_scene.depsgraph.object_instances:
                 if instance.object.type in ('CAMERA'):
                     continue
@@ -885,169 +1227,16 @@ class RmanSceneSync(object):
                     else:    
                         # skip this object
                         if self.num_instances_changed:
-                            rman_sg_node = self.rman_scene.get_rman_prototype(object_utils.prototype_key(instance))
+                            proto_key = object_utils.prototype_key(instance)
+                            instance_index.add(instance, proto_key)
+                            rman_sg_node = self.rman_scene.get_rman_prototype(proto_key)
                             if rman_sg_node and len(rman_sg_node.instances) > 0:
                                 self.add_to_need_cleaning(instance, rman_sg_node)                  
                         continue        
 
-                ob_eval = instance.object.evaluated_get(self.rman_scene.depsgraph)  
-                proto_key = object_utils.prototype_key(instance)      
-                is_empty_instancer = False
-                is_new_object = False
-                if is_instance and instance_parent is None:
-                    ob_key = instance.instance_object.original      
-                    psys = instance.particle_system
-                    instance_parent = instance.parent 
-                    is_empty_instancer = object_utils.is_empty_instancer(instance_parent)                    
-                    
-                if proto_key in deleted_obj_keys:
-                    deleted_obj_keys.remove(proto_key)                         
-                
-                if rman_sg_node is None:
-                    rman_sg_node = self.rman_scene.get_rman_prototype(proto_key)
-                rman_type = object_utils._detect_primitive_(ob_eval)
-                if rman_sg_node and rman_type != rman_sg_node.rman_type:
-                    # Types don't match
-                    #
-                    # This can happen because
-                    # we have not been able to tag our types before Blender
-                    # tells us an object has been added
-                    # For now, just delete the existing sg_node
-                    rfb_log().debug("\tTypes don't match. Removing: %s" % proto_key)
-                    del self.rman_scene.rman_prototypes[proto_key]
-                    rman_sg_node = None
-
-                if not rman_sg_node:
-                    # this is a new object.
-
-                    rman_sg_node = self.rman_scene.export_data_block(proto_key, ob_eval)
-                    if not rman_sg_node:
-                        continue
-
-                    rfb_log().debug("\tNew Object added: %s (%s)" % (proto_key, rman_type))
-
-                    if rman_type in ['LIGHT', 'LIGHTFILTER']:
-                        self.rman_scene.set_root_lightlinks() # update lightlinking on the root node
-
-                    if rman_type == 'LIGHTFILTER':
-                        # update all lights with this light filter
-                        users = bpy.context.blend_data.user_map(subset={ob_eval.original})
-                        for o in users[ob_eval.original]:
-                            if isinstance(o, bpy.types.Light):
-                                o.node_tree.update_tag()
-                        continue
-
-                    is_new_object = True
-                    if rman_update is None:
-                        rman_update = self.create_rman_update(ob_key, update_geometry=False, update_shading=True, update_transform=True)
-                    # set update_geometry to False
-                    # since we've already exported the datablock                        
-                    rman_update.is_updated_geometry = False
-                                                                
-                    
-                # Originally, we were only updating the prototype, if the DepsgraphInstance
-                # was not is_instance. However, this doesn't work for META
-                # objects as the mesh has is_instance=True.
-                # So we now let whichever DepsgraphInstance we get first do the prototype updating
-                if rman_sg_node and not is_new_object: # and not is_instance:
-                    if proto_key not in already_udpated:
-                        if rman_update.is_updated_attributes:
-                            # this should be a simple attribute change
-                            from .rfb_utils import property_utils
-                            attrs = rman_sg_node.sg_attributes.GetAttributes()
-                            rm = ob_eval.renderman
-                            if is_empty_instancer:
-                                rm = instance_parent.renderman
-                            meta = rm.prop_meta[rman_update.updated_prop_name]
-                            rfb_log().debug("Setting RiAttribute: %s" % rman_update.updated_prop_name)
-                            property_utils.set_riattr_bl_prop(attrs, rman_update.updated_prop_name, meta, rm, check_inherit=True)
-                            rman_sg_node.sg_attributes.SetAttributes(attrs)       
-                        else:                   
-                            if rman_update.is_updated_geometry:
-                                translator =  self.rman_scene.rman_translators.get(rman_type, None)
-                                if rman_update.updated_prop_name:
-                                    rfb_log().debug("\tUpdating Single Primvar: %s" % proto_key)
-                                    translator.update_primvar(ob_eval, rman_sg_node, rman_update.updated_prop_name)
-                                else:
-                                    rfb_log().debug("\tUpdating Object: %s" % proto_key)
-                                    translator.update(ob_eval, rman_sg_node)  
-                                    #rman_sg_node.shared_attrs.Clear()
-                                    # self.rman_scene.attach_material(ob_eval, rman_sg_node, sg_node=rman_sg_node.sg_attributes)
-                                    self.update_particle_emitters(ob_eval)
-                            if rman_update.is_updated_shading:
-                                rfb_log().debug("\tUpdating Shading: %s" % proto_key)
-                                self.rman_scene.attach_material(ob_eval, rman_sg_node, sg_node=rman_sg_node.sg_attributes)                            
-                                
-                        if rman_type == "MESH" and rman_update.is_updated_geometry and not is_instance:
-                            # if this is a mesh, and not an instance, check if we generated geometry
-                            # if not, don't append to already_updated, instances of this prototype
-                            # may generate mesh -- this is the case for geometry node instances
-                            if rman_sg_node.npoints == 0:
-                                rfb_log().debug("\tMesh: %s has no points" % proto_key)
-                                continue 
-                        already_udpated.add(proto_key)   
-
-                if rman_type in object_utils._RMAN_NO_INSTANCES_:
-                    if rman_type == 'EMPTY':
-                        self.rman_scene._export_hidden_instance(ob_eval, rman_sg_node)
-                    continue                         
-
-                # simply grab the existing instance and update the transform and/or material
-                rman_sg_group = self.rman_scene.get_rman_sg_instance(instance, rman_sg_node, instance_parent, psys, create=False)
-                rman_group_translator = self.rman_scene.rman_translators['GROUP']
-
-                if self.num_instances_changed:
-                    self.add_to_need_cleaning(instance, rman_sg_node)  
-
-                if rman_sg_group:
-                    # update instance attributes
-                    self.rman_scene.update_instance_attributes(rman_group_translator, rman_sg_group, ob_eval, instance, rman_type, remove=True)                                
-                    if rman_update.is_updated_attributes:    
-                        continue
-
-                    if rman_update.is_updated_transform:
-                        rman_group_translator.update_transform(instance, rman_sg_group) 
-
-                    if rman_update.is_updated_shading: 
-                        if not self.check_ob_to_meshlight(ob_eval, instance, rman_sg_node, rman_sg_group, rman_type, instance_parent, psys, is_empty_instancer):
-                            if is_empty_instancer:
-                                if instance_parent.renderman.rman_material_override:
-                                    self.rman_scene.attach_material(instance_parent, rman_sg_group)                            
-                                else:
-                                    self.rman_scene.attach_material(ob_eval, rman_sg_group)   
-                            elif psys:
-                                self.rman_scene.attach_particle_material(psys, instance_parent, ob_eval, rman_sg_group)
-                            elif ob_eval.renderman.rman_material_override:
-                                self.rman_scene.attach_material(ob_eval, rman_sg_group)                            
-                else:
-                    # Didn't get an rman_sg_group. Do a full instance export.
-                    self.rman_scene.export_instance(ob_eval, instance, rman_sg_node, rman_type, instance_parent, psys)
-                            
-                if not batch_mode:
-                    if rman_type == 'LIGHT':
-                        # We are dealing with a light. Check if it's a solo light, or muted
-                        self.rman_scene.check_solo_light(rman_sg_node, ob_eval)
+                self._check_instance_(instance, ob_key, rman_update, instance_parent, psys, deleted_obj_keys, already_udpated, transform_batch, batch_mode=batch_mode)
 
-                        # check portal lights
-                        self.update_portals(ob_eval)
-                        
-                        # Hide the default light
-                        if self.rman_scene.default_light.GetHidden() != 1:
-                            self.rman_scene.default_light.SetHidden(1)                
-
-                    # Delete any removed partcle systems
-                    if proto_key in self.rman_scene.rman_particles:                                                
-                        ob_psys = self.rman_scene.rman_particles[proto_key]
-                        rman_particle_nodes = list(ob_psys)
-                        for psys in ob_eval.particle_systems:
-                            try:
-                                rman_particle_nodes.remove(psys.settings.original)
-                            except:
-                                continue
-                        if rman_particle_nodes:
-                            rfb_log().debug("\t\tRemoving particle nodes: %s" % proto_key)
-                        for k in rman_particle_nodes:                        
-                            del ob_psys[k]
+            transform_batch.flush()
                                                                         
             if self.num_instances_changed:
                 # delete objects
@@ -1113,25 +1302,25 @@ class RmanSceneSync(object):
             return        
         if context:
             self.rman_scene.bl_scene = context.scene
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+
+        def edit():
             self.rman_scene.export_integrator() 
             self.rman_scene.export_viewport_stats()
+        self.queue_edit('integrator', edit)
 
     def update_samplefilters(self, context):
         if not self.rman_render.rman_context.is_interactive_running():
             return        
         if context:
             self.rman_scene.bl_scene = context.scene
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-            self.rman_scene.export_samplefilters(sel_chan_name=self.selected_channel)
+        self.queue_edit('samplefilters', lambda: self.rman_scene.export_samplefilters(sel_chan_name=self.selected_channel))
 
     def update_displayfilters(self, context):
         if not self.rman_render.rman_context.is_interactive_running():
             return        
         if context:
             self.rman_scene.bl_scene = context.scene
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):          
-            self.rman_scene.export_displayfilters()     
+        self.queue_edit('displayfilters', self.rman_scene.export_displayfilters)
 
     def update_viewport_integrator(self, context, integrator):
         if not self.rman_render.rman_context.is_interactive_running():
@@ -1164,13 +1353,15 @@ class RmanSceneSync(object):
         from .rfb_utils import property_utils
         self.rman_scene.bl_scene = context.scene
         rm = self.rman_scene.bl_scene.renderman
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+
+        def edit():
             options = self.rman_scene.sg_scene.GetOptions()
             meta = rm.prop_meta[prop_name]
             rfb_log().debug("Update RiOption: %s" % prop_name)
             property_utils.set_rioption_bl_prop(options, prop_name, meta, rm)
             self.rman_scene.sg_scene.SetOptions(options)
-        self.rman_scene.export_viewport_stats()            
+            self.rman_scene.export_viewport_stats()            
+        self.queue_edit(('options', prop_name), edit)
 
 
     def update_root_node_func(self, prop_name, context):
@@ -1179,25 +1370,28 @@ class RmanSceneSync(object):
         from .rfb_utils import property_utils               
         self.rman_scene.bl_scene = context.scene
         rm = self.rman_scene.bl_scene.renderman
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):     
+
+        def edit():
             root_sg = self.rman_scene.get_root_sg_node()
             attrs = root_sg.GetAttributes()
             meta = rm.prop_meta[prop_name]
             rfb_log().debug("Update root node attribute: %s" % prop_name)
             property_utils.set_riattr_bl_prop(attrs, prop_name, meta, rm, check_inherit=False)
             root_sg.SetAttributes(attrs)
+        self.queue_edit(('root', prop_name), edit)
 
     def update_root_lightlinks(self, context):
         if not self.rman_render.rman_context.is_interactive_running():
             return     
         from .rfb_utils import property_utils               
         self.rman_scene.bl_scene = context.scene
-        rm = self.rman_scene.bl_scene.renderman
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):     
+
+        def edit():
             root_sg = self.rman_scene.get_root_sg_node()
             attrs = root_sg.GetAttributes()
             self.rman_scene.set_root_lightlinks(attrs)
             root_sg.SetAttributes(attrs)            
+        self.queue_edit('root_lightlinks', edit)
 
     def update_sg_node_riattr(self, prop_name, context, bl_object=None):
         if not self.rman_render.rman_context.is_interactive_running():
@@ -1236,16 +1430,63 @@ class RmanSceneSync(object):
         if not rman_sg_material:
             return
         translator = self.rman_scene.rman_translators["MATERIAL"]     
-        has_meshlight = rman_sg_material.has_meshlight   
         rfb_log().debug("Manual material update called for: %s." % mat.name)
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):                  
+
+        def edit():
+            has_meshlight = rman_sg_material.has_meshlight   
             translator.update(mat, rman_sg_material)
 
-        if has_meshlight != rman_sg_material.has_meshlight:
-            # we're dealing with a mesh light
-            rfb_log().debug("Manually calling mesh_light_update")
-            self.rman_scene.depsgraph = bpy.context.evaluated_depsgraph_get()
-            self._mesh_light_update(mat)    
+            if has_meshlight != rman_sg_material.has_meshlight:
+                # we're dealing with a mesh light
+                rfb_log().debug("Manually calling mesh_light_update")
+                self.rman_scene.depsgraph = bpy.context.evaluated_depsgraph_get()
+                self._mesh_light_update(mat)    
+        self.queue_edit(('material', mat.original), edit)
+
+    def update_material_node_param(self, node, prop_name, context):
+        '''
+        Called when a parameter on a shading node changes. Rather than exporting the whole 
+        material again, we try to only set the one parameter on the node's shader. If that 
+        isn't possible, the material is updated in full. Either way, the depsgraph update
+        for the material, that follows the change, is skipped.
+
+        Args:
+            node (bpy.types.ShaderNode) - the node whose parameter changed
+            prop_name (str) - the name of the parameter's property on the node
+            context (bpy.types.Context) - the current context
+
+        Returns:
+            (bool) - True if the change was queued up
+        '''
+        if not self.rman_render.rman_context.is_interactive_running():
+            return False
+        mat = getattr(context, 'material', None)
+        if mat is None:
+            mat = getattr(getattr(context, 'space_data', None), 'id', None)
+        # nodes inside of node groups always go through the regular depsgraph update
+        if not isinstance(mat, bpy.types.Material) or mat.node_tree != node.id_data:
+            return False
+        rman_sg_material = self.rman_scene.rman_materials.get(mat.original, None)
+        if not rman_sg_material:
+            return False
+        translator = self.rman_scene.rman_translators["MATERIAL"]
+        node_name = node.name
+
+        def edit():
+            nt = mat.node_tree
+            bl_node = nt.nodes.get(node_name, None) if nt else None
+            if bl_node and translator.update_node_param(mat, rman_sg_material, bl_node, prop_name):
+                return
+            rfb_log().debug("Could not update %s.%s on its own, updating material: %s" % (node_name, prop_name, mat.name))
+            has_meshlight = rman_sg_material.has_meshlight
+            translator.update(mat, rman_sg_material)
+            if has_meshlight != rman_sg_material.has_meshlight:
+                self.rman_scene.depsgraph = bpy.context.evaluated_depsgraph_get()
+                self._mesh_light_update(mat)
+
+        self.material_param_edits.add(mat.original)
+        self.queue_edit(('material_param', mat.original, node_name, prop_name), edit)
+        return True
 
     def update_light(self, ob):
         if not self.rman_render.rman_context.is_interactive_running():
@@ -1292,8 +1533,7 @@ class RmanSceneSync(object):
         self.rman_scene.bl_scene = context.scene    
         self.rman_scene.bl_view_layer = context.view_layer
         self.rman_scene._find_renderman_layer()
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-            self.rman_scene.export_displays()         
+        self.queue_edit('displays', self.rman_scene.export_displays)
 
     def texture_updated(self, nodeID):
         if not self.rman_render.rman_context.is_interactive_running():
@@ -1348,5 +1588,4 @@ class RmanSceneSync(object):
     def update_bl_light_linking(self, context):
         if not self.rman_render.rman_context.is_interactive_running():
             return  
-        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):                                  
-            self.rman_scene.set_root_lightlinks()
\ No newline at end of file
+        self.queue_edit('bl_light_linking', self.rman_scene.set_root_lightlinks)
\ No newline at end of file
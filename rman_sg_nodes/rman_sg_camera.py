@@ -88,6 +88,7 @@ class RmanSgCamera(RmanSgNode):
         self.cam_matrix = None
         self.sg_camera_node = None
         self.projection_shader = None        
+        self.projection_key = None
         self.use_focus_object = False
         self.rman_focus_object = None
         self.bl_cam_props = BlCameraProps()
@@ -107,3 +108,11 @@ class RmanSgCamera(RmanSgNode):
     @cam_matrix.setter
     def cam_matrix(self, mtx):
         self.__cam_matrix = mtx
+
+    @property
+    def projection_key(self):
+        return self.__projection_key
+
+    @projection_key.setter
+    def projection_key(self, projection_key):
+        self.__projection_key = projection_key
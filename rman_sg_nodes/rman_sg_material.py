@@ -10,6 +10,7 @@ class RmanSgMaterial(RmanSgNode):
         self.sg_stroke_mat = None
         self.sg_fill_mat = None
         self.nodes_to_blnodeinfo = dict()
+        self.network_cache = dict() # shading network section (ex: bxdf) -> RmanShadingNetworkCache
         self.sg_group = rman_scene.sg_scene.CreateGroup("__lightFilterParent") 
         self.sg_lightfilters = list() # list to hold light filter transforms
 
@@ -43,4 +44,12 @@ class RmanSgMaterial(RmanSgNode):
 
     @sg_fill_mat.setter
     def sg_fill_mat(self, sg_fill_mat):
-        self.__sg_fill_mat = sg_fill_mat                                  
\ No newline at end of file
+        self.__sg_fill_mat = sg_fill_mat                                  
+
+    @property
+    def network_cache(self):
+        return self.__network_cache
+
+    @network_cache.setter
+    def network_cache(self, network_cache):
+        self.__network_cache = network_cache
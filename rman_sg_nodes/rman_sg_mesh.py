@@ -13,6 +13,8 @@ class RmanSgMesh(RmanSgNode):
         self.is_multi_material = False
         self.multi_material_children = []
         self.sg_mesh = None
+        self.topology_fingerprint = None
+        self.primvar_digests = dict()
 
     def __del__(self):
         if self.rman_scene.rman_render.rman_context.is_render_running() and self.rman_scene.rman_render.sg_scene:
@@ -66,4 +68,20 @@ class RmanSgMesh(RmanSgNode):
 
     @subdiv_scheme.setter
     def subdiv_scheme(self, subdiv_scheme):
-        self.__subdiv_scheme = subdiv_scheme                                       
\ No newline at end of file
+        self.__subdiv_scheme = subdiv_scheme
+
+    @property
+    def topology_fingerprint(self):
+        return self.__topology_fingerprint
+
+    @topology_fingerprint.setter
+    def topology_fingerprint(self, topology_fingerprint):
+        self.__topology_fingerprint = topology_fingerprint
+
+    @property
+    def primvar_digests(self):
+        return self.__primvar_digests
+
+    @primvar_digests.setter
+    def primvar_digests(self, primvar_digests):
+        self.__primvar_digests = primvar_digests
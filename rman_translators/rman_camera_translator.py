@@ -446,7 +446,32 @@ class RmanCameraTranslator(RmanTranslator):
             return True
         return False
 
-    def update_viewport_cam(self, ob, rman_sg_camera, force_update=False):
+    def _get_projection_key_(self, ob, cam, use_camera, use_perspective, rman_sg_camera):
+        # the things the projection shader depends on, that can change
+        # when the view changes
+        aspectratio = rman_sg_camera.bl_cam_props.aspectratio
+        if use_camera:
+            return ('CAMERA', ob.original, cam.type, cam.lens, cam.sensor_fit, 
+                    cam.sensor_width, cam.sensor_height, aspectratio)
+        elif use_perspective:
+            if cam:
+                return ('PERSP', ob.original, rman_sg_camera.bl_cam_props.lens, aspectratio)
+            region_data = self.rman_scene.context.region_data
+            return ('PERSP', None, region_data.window_matrix[1][1])
+        return ('ORTHO',)
+
+    def update_viewport_cam(self, ob, rman_sg_camera, force_update=False, reuse_projection=False):
+        '''
+        Update the projection for the viewport camera.
+
+        Args:
+            ob (bpy.types.Object) - the camera object, or None to use the viewport's camera
+            rman_sg_camera (RmanSgCamera) - the camera to update
+            force_update (bool) - always set the projection, even if it hasn't changed
+            reuse_projection (bool) - keep the existing projection shader, if nothing it depends on
+                                      has changed. Used when only the view has changed, ex: when 
+                                      zooming in camera view
+        '''
         region = self.rman_scene.context.region
         region_data = self.rman_scene.context.region_data
 
@@ -457,7 +482,6 @@ class RmanCameraTranslator(RmanTranslator):
         height = rman_sg_camera.bl_cam_props.res_height
         view_camera_zoom = rman_sg_camera.bl_cam_props.view_camera_zoom
 
-        rman_sg_camera.projection_shader = None
         fov = -1
 
         updated = False
@@ -488,6 +512,12 @@ class RmanCameraTranslator(RmanTranslator):
                 cam = ob.data
             use_perspective = True
 
+        projection_key = self._get_projection_key_(ob, cam, use_camera, use_perspective, rman_sg_camera)
+        if reuse_projection and rman_sg_camera.projection_shader and projection_key == rman_sg_camera.projection_key:
+            return
+        rman_sg_camera.projection_key = projection_key
+        rman_sg_camera.projection_shader = None
+
         if use_camera:
             rman_sg_camera.bl_camera = ob
             cam_rm = cam.renderman
@@ -43,12 +43,13 @@ class RmanEmitterTranslator(RmanTranslator):
         inv_mtx = ob.matrix_world.inverted_safe()
         cur_frame = self.rman_scene.bl_scene.frame_current
         do_motion = do_motion = self.rman_scene.do_motion_blur
-        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion)
+        particle_arrays = particles_utils.ParticleArrays(psys)
+        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion, particle_arrays=particle_arrays)
 
-        if not P:
+        if len(P) < 3:
             return
 
-        rman_sg_emitter.npoints = len(P)
+        rman_sg_emitter.npoints = int(len(P) / 3)
         sg_emitter_node.Define(rman_sg_emitter.npoints)          
 
         primvar = sg_emitter_node.GetPrimVars()
@@ -60,18 +61,18 @@ class RmanEmitterTranslator(RmanTranslator):
             primvar.SetTimes([])            
     
         
-        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0)      
+        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0, particle_arrays=particle_arrays)      
         
         if self.rman_scene.do_motion_blur and rm.do_velocity_blur:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", 0) 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, next_P, "vertex", 1)  
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P.data, "vertex", 0) 
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, next_P.data, "vertex", 1)  
         else:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")                   
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P.data, "vertex")                   
         if rm.constant_width:
             width = rm.width
             primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "constant")
         else:
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")                     
+            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width.data, "vertex")                     
 
         super().export_object_primvars(ob, primvar)
         sg_emitter_node.SetPrimVars(primvar)
@@ -154,12 +154,13 @@ class RmanFluidTranslator(RmanTranslator):
         inv_mtx = ob.matrix_world.inverted_safe()
         cur_frame = self.rman_scene.bl_scene.frame_current
         do_motion = self.rman_scene.do_motion_blur
-        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion)        
+        particle_arrays = particles_utils.ParticleArrays(psys)
+        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion, particle_arrays=particle_arrays)        
 
-        if not P:
+        if len(P) < 3:
             return
 
-        nm_pts = len(P)
+        nm_pts = int(len(P) / 3)
         sg_node.Define(nm_pts)          
 
         primvar = sg_node.GetPrimVars()
@@ -168,14 +169,14 @@ class RmanFluidTranslator(RmanTranslator):
         if do_motion and rman_sg_fluid.motion_steps:
             super().set_primvar_times(rman_sg_fluid.motion_steps, primvar)
         
-        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0)      
+        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0, particle_arrays=particle_arrays)      
         
         if do_motion:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", 0) 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, next_P, "vertex", 1)  
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P.data, "vertex", 0) 
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, next_P.data, "vertex", 1)  
         else:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")               
-        primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P.data, "vertex")               
+        primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width.data, "vertex")
         super().export_object_primvars(ob, primvar)
         sg_node.SetPrimVars(primvar)
 
@@ -4,6 +4,7 @@ from ..rfb_utils import transform_utils
 from ..rfb_utils import object_utils
 from mathutils import Matrix
 import math
+import numpy as np
 
 class RmanGroupTranslator(RmanTranslator):
 
@@ -14,6 +15,23 @@ class RmanGroupTranslator(RmanTranslator):
         mtx = transform_utils.convert_matrix(ob.matrix_world.copy())
         rman_sg_group.sg_node.SetTransform( mtx )
 
+    def update_transforms(self, matrices, rman_sg_groups):
+        '''
+        Set the transforms for a list of groups. The matrices are converted
+        to RenderMan's layout all at once, and all of the SetTransform calls 
+        go into a single edit of the scene graph.
+
+        Args:
+            matrices (numpy.ndarray) - array of shape (N, 4, 4) of Blender matrices
+            rman_sg_groups (list) - the N RmanSgGroup's to set the transforms on
+        '''
+        if not rman_sg_groups:
+            return
+        mtxs = transform_utils.convert_matrices(matrices).tolist()
+        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+            for rman_sg_group, mtx in zip(rman_sg_groups, mtxs):
+                rman_sg_group.sg_node.SetTransform( mtx )
+
     def update_transform_sample(self, ob, rman_sg_group, index, seg):
         mtx = transform_utils.convert_matrix(ob.matrix_world.copy())
         rman_sg_group.sg_node.SetTransformSample( index, mtx, seg)
@@ -21,7 +39,91 @@ class RmanGroupTranslator(RmanTranslator):
     def update_transform_num_samples(self, rman_sg_group, motion_steps):
         rman_sg_group.sg_node.SetTransformNumSamples(len(motion_steps))
 
+    def update_transform_samples(self, rman_sg_group, matrices, times, sampled=None):
+        '''
+        Set all of the transform motion samples for a group at once.
+
+        Args:
+            matrices (numpy.ndarray) - array of shape (N, 4, 4) of Blender matrices, one for each motion step
+            times (list) - the N sample times
+            sampled (numpy.ndarray) - optional mask of which of the N samples to set
+        '''
+        sg_node = rman_sg_group.sg_node
+        sg_node.SetTransformNumSamples(len(times))
+        mtxs = transform_utils.convert_matrices(matrices).tolist()
+        for i, (mtx, time_samp) in enumerate(zip(mtxs, times)):
+            if sampled is not None and not sampled[i]:
+                continue
+            sg_node.SetTransformSample(i, mtx, time_samp)
+
     def export(self, ob, db_name=""):
         sg_group = self.rman_scene.sg_scene.CreateGroup(db_name)
         rman_sg_group = RmanSgGroup(self.rman_scene, sg_group, db_name)
-        return rman_sg_group   
\ No newline at end of file
+        return rman_sg_group
+
+class RmanTransformBatch(object):
+    '''
+    Collects instance transforms, so that they can be set in bulk with
+    RmanGroupTranslator.update_transforms: the matrices are converted together, 
+    and set in one scene graph edit for each flush, rather than one per instance. 
+    Useful when we're exporting a lot of instances, ex: geometry nodes or particle 
+    instancers. Call flush() when done; the batch also flushes itself whenever it fills up.
+
+    Attributes:
+        translator (RmanGroupTranslator) - the group translator
+        size (int) - how many transforms to hold before flushing
+    '''
+
+    def __init__(self, translator, size=65536):
+        self.translator = translator
+        self.size = size
+        self.matrices = np.zeros((size, 4, 4), dtype=np.float32)
+        self.rman_sg_groups = []
+
+    def add(self, ob, rman_sg_group):
+        # ob.matrix_world is only valid while we're on this depsgraph
+        # instance, so copy it into the batch now
+        self.matrices[len(self.rman_sg_groups)] = ob.matrix_world
+        self.rman_sg_groups.append(rman_sg_group)
+        if len(self.rman_sg_groups) >= self.size:
+            self.flush()
+
+    def flush(self):
+        num = len(self.rman_sg_groups)
+        if num:
+            self.translator.update_transforms(self.matrices[:num], self.rman_sg_groups)
+        self.rman_sg_groups = []
+
+class RmanTransformSamples(object):
+    '''
+    Collects the transform motion samples of a group over the course of a
+    motion blur export, so that they can all be set at once with flush().
+
+    Attributes:
+        translator (RmanGroupTranslator) - the group translator
+        rman_sg_group (RmanSgGroup) - the group the samples are for
+        steps (dict) - the group's motion steps, to their sample index
+        times (list) - the normalized time for each sample
+        matrices (numpy.ndarray) - the Blender matrices collected so far
+        sampled (numpy.ndarray) - which of the samples have been collected
+    '''
+
+    def __init__(self, translator, rman_sg_group, delta=0.0):
+        self.translator = translator
+        self.rman_sg_group = rman_sg_group
+        motion_steps = rman_sg_group.motion_steps
+        self.steps = {s: i for i, s in enumerate(motion_steps)}
+        self.times = [s + delta for s in motion_steps]
+        self.matrices = np.zeros((len(motion_steps), 4, 4), dtype=np.float32)
+        self.sampled = np.zeros(len(motion_steps), dtype=bool)
+
+    def add(self, ob, seg):
+        idx = self.steps.get(seg, None)
+        if idx is None:
+            return
+        # ob.matrix_world is only valid for the current subframe
+        self.matrices[idx] = ob.matrix_world
+        self.sampled[idx] = True
+
+    def flush(self):
+        self.translator.update_transform_samples(self.rman_sg_group, self.matrices, self.times, self.sampled)
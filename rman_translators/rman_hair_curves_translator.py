@@ -1,11 +1,11 @@
 from .rman_translator import RmanTranslator
+from .rman_hair_translator import get_curve_chunks
 from ..rfb_utils import transform_utils
 from ..rfb_utils import scenegraph_utils
 from ..rfb_utils.timer_utils import time_this
 from ..rfb_utils.scene_utils import BlAttribute
 from ..rfb_logger import rfb_log
 from ..rman_sg_nodes.rman_sg_haircurves import RmanSgHairCurves
-from mathutils import Vector
 import math
 import bpy    
 import numpy as np
@@ -14,11 +14,11 @@ from copy import deepcopy
 class BlHair:
 
     def __init__(self):        
-        self.points = []
-        self.vertsArray = []
+        self.points = np.zeros(0, dtype=np.float32)
+        self.vertsArray = np.zeros(0, dtype=np.int32)
         self.nverts = 0
-        self.hair_width = []
-        self.index = []
+        self.hair_width = np.zeros(0, dtype=np.float32)
+        self.index = np.zeros(0, dtype=np.int32)
         self.bl_hair_attributes = dict()
 class RmanHairCurvesTranslator(RmanTranslator):
 
@@ -42,14 +42,14 @@ class RmanHairCurvesTranslator(RmanTranslator):
                 rman_sg_hair.sg_curves_list.clear()   
 
     def export_deform_sample(self, rman_sg_hair, ob, time_sample):
-        curves = self._get_strands_(ob)
+        curves = self._get_strands_(ob, get_attributes=False)
         for i, bl_curve in enumerate(curves):
             curves_sg = rman_sg_hair.sg_curves_list[i]
             if not curves_sg:
                 continue
             primvar = curves_sg.GetPrimVars()
 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex", time_sample)  
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points.data, "vertex", time_sample)  
             curves_sg.SetPrimVars(primvar)
 
     def get_child(self, i, rman_sg_hair):
@@ -70,21 +70,21 @@ class RmanHairCurvesTranslator(RmanTranslator):
 
         for i, bl_curve in enumerate(curves):
             curves_sg = self.get_child(i, rman_sg_hair)
-            curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, "nonperiodic", "catmull-rom", len(bl_curve.vertsArray), len(bl_curve.points))
+            curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, "nonperiodic", "catmull-rom", len(bl_curve.vertsArray), bl_curve.nverts)
             primvar = curves_sg.GetPrimVars()      
             if rman_sg_hair.is_deforming and rman_sg_hair.deform_motion_steps:
                 super().set_primvar_times(rman_sg_hair.deform_motion_steps, primvar)            
             else:
                 primvar.SetTimes([])   
 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex")
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points.data, "vertex")
 
-            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray, "uniform")
+            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray.data, "uniform")
             index_nm = 'index'
-            primvar.SetIntegerDetail(index_nm, bl_curve.index, "uniform")
+            primvar.SetIntegerDetail(index_nm, bl_curve.index.data, "uniform")
 
             width_detail = "vertex" 
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width, width_detail)
+            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width.data, width_detail)
             
             BlAttribute.set_rman_primvars(primvar, bl_curve.bl_hair_attributes)
                     
@@ -98,36 +98,38 @@ class RmanHairCurvesTranslator(RmanTranslator):
         
     def get_attributes(self, ob, bl_hair_attributes):
         detail_map = { len(ob.data.points): 'vertex', len(ob.data.curves): 'uniform'}
-        BlAttribute.parse_attributes(bl_hair_attributes, ob, detail_map, values_as_list=True)
+        BlAttribute.parse_attributes(bl_hair_attributes, ob, detail_map)
         if 'color' in bl_hair_attributes:
             # rename color to Cs
             v = bl_hair_attributes['color']
             v.rman_name = 'Cs'
             bl_hair_attributes['color'] = v
             
-    def get_attributes_for_curves(self, ob, bl_hair_attributes, bl_curve, idx, fp_idx, npoints):
-        uv_map = ob.original.data.surface_uv_map
-        for attr in ob.data.attributes:
-            if attr.name.startswith('.'):
-                continue
-            if attr.name not in bl_hair_attributes:
+    def get_attributes_for_curves(self, ob, bl_hair_attributes, bl_curve, start, end, point_index):
+        # slice out the attribute values for curves start to end. Vertex
+        # attributes are gathered with point_index, which also duplicates
+        # the end points, like we do for P
+        npoints = len(ob.data.points)
+        ncurves = len(ob.data.curves)
+        for nm, hair_attr in bl_hair_attributes.items():
+            if hair_attr.rman_detail == "uniform":
+                n = ncurves
+            else:
+                n = npoints
+            values = np.asarray(hair_attr.values)
+            if n < 1 or values.size % n != 0:
                 continue
-            hair_attr = bl_hair_attributes[attr.name]
+            values = values.reshape(n, -1)
 
-            hair_curve_attr = bl_curve.bl_hair_attributes.get(attr.name, BlAttribute())
+            hair_curve_attr = BlAttribute()
             hair_curve_attr.rman_name = hair_attr.rman_name
             hair_curve_attr.rman_detail = hair_attr.rman_detail
             hair_curve_attr.rman_type = hair_attr.rman_type
             if hair_attr.rman_detail == "uniform":
-                hair_curve_attr.values.append(hair_attr.values[idx])
+                hair_curve_attr.values = np.ascontiguousarray(values[start:end]).reshape(-1)
             else:
-                # if the detail is vertex, use the first point index
-                # and npoints to get the values we need
-                # we also need to duplicate the end points, like we do for P
-                vals = hair_attr.values[fp_idx:fp_idx+npoints]
-                vals = vals[:1] + vals + vals[-1:]
-                hair_curve_attr.values.append(vals)
-            bl_curve.bl_hair_attributes[attr.name] = hair_curve_attr
+                hair_curve_attr.values = np.ascontiguousarray(values[point_index]).reshape(-1)
+            bl_curve.bl_hair_attributes[nm] = hair_curve_attr
 
     def _copy_uv_map(self, ob, bl_hair_attributes, bl_curve):
         # make a copy of the uv_map to scalpST         
@@ -140,60 +142,74 @@ class RmanHairCurvesTranslator(RmanTranslator):
             bl_curve.bl_hair_attributes['scalpST'] = attr_copy
 
     @time_this
-    def _get_strands_(self, ob):
+    def _get_strands_(self, ob, get_attributes=True):
 
         curve_sets = []
-        bl_curve = BlHair()
         db = ob.data
-        bl_hair_attributes = dict()
-        self.get_attributes(ob, bl_hair_attributes)
-        for curve in db.curves:
-            if curve.points_length < 4:
-                rfb_log().error("We do not support curves with only 4 control points")
-                return []
-
-            npoints = len(curve.points)
-            strand_points = np.zeros(npoints*3, dtype=np.float32)
-            widths = np.zeros(npoints, dtype=np.float32)
-            curve.points.foreach_get('position', strand_points)
-            curve.points.foreach_get('radius', widths)
-            strand_points = np.reshape(strand_points, (npoints, 3))
-            if np.count_nonzero(widths) == 0:
-                # radius is 0. Default to 0.005
-                widths.fill(0.005)
-            widths = widths * 2
-            strand_points = strand_points.tolist()
-            widths = widths.tolist()
+        ncurves = len(db.curves)
+        npoints = len(db.points)
+        if ncurves < 1:
+            return curve_sets
+
+        offsets = np.zeros(ncurves+1, dtype=np.int32)
+        db.curve_offsets.foreach_get('value', offsets)
+        points_length = np.diff(offsets)
+        if np.any(points_length < 4):
+            rfb_log().error("We do not support curves with only 4 control points")
+            return []
 
-            
-            # double the end points
-            strand_points = strand_points[:1] + \
-                strand_points + strand_points[-1:]
-
-            widths = widths[:1] + widths + widths[-1:]
-            
-            vertsInStrand = len(strand_points)
-
-            bl_curve.points.extend(strand_points)
-            bl_curve.vertsArray.append(vertsInStrand)
-            bl_curve.hair_width.extend(widths)
-            bl_curve.index.append(curve.index)
-            bl_curve.nverts += vertsInStrand           
-
-            self.get_attributes_for_curves(ob, bl_hair_attributes, bl_curve, curve.index, curve.first_point_index, npoints)
-               
-            # FIXME: is this still needed? 
-            # if we get more than 100000 vertices, start a new BlHair.  This
-            # is to avoid a maxint on the array length        
-            if bl_curve.nverts > 100000:
+        bl_hair_attributes = dict()
+        if get_attributes:
+            self.get_attributes(ob, bl_hair_attributes)
+
+        strand_points = np.zeros(npoints*3, dtype=np.float32)
+        widths = np.zeros(npoints, dtype=np.float32)
+        db.points.foreach_get('position', strand_points)
+        db.points.foreach_get('radius', widths)
+        strand_points = np.reshape(strand_points, (npoints, 3))
+
+        # if a curve's radius is 0, default to 0.005
+        zero_width = np.add.reduceat(widths != 0, offsets[:-1]) == 0
+        if np.any(zero_width):
+            widths[np.repeat(zero_width, points_length)] = 0.005
+        widths = widths * 2
+
+        # double the end points
+        nverts = (points_length + 2).astype(np.int32)
+        point_index = _get_end_point_index_(offsets)
+
+        # FIXME: is this still needed? 
+        # if we get more than 100000 vertices, start a new BlHair.  This
+        # is to avoid a maxint on the array length        
+        for start, end, v0, v1 in get_curve_chunks(nverts):
+            bl_curve = BlHair()
+            bl_curve.points = np.ascontiguousarray(strand_points[point_index[v0:v1]]).reshape(-1)
+            bl_curve.vertsArray = np.ascontiguousarray(nverts[start:end])
+            bl_curve.hair_width = np.ascontiguousarray(widths[point_index[v0:v1]])
+            bl_curve.index = np.arange(start, end, dtype=np.int32)
+            bl_curve.nverts = int(v1 - v0)
+
+            if get_attributes:
+                self.get_attributes_for_curves(ob, bl_hair_attributes, bl_curve, start, end, point_index[v0:v1])
                 self._copy_uv_map(ob, bl_hair_attributes, bl_curve)
-                curve_sets.append(bl_curve)
-                bl_curve = BlHair()
-            
-
-        if bl_curve.nverts > 0:
-            self._copy_uv_map(ob, bl_hair_attributes, bl_curve)       
             curve_sets.append(bl_curve)
 
-        return curve_sets              
-            
+        return curve_sets
+
+def _get_end_point_index_(offsets):
+    '''
+    Get the point indices needed to duplicate the first and last
+    point of each curve.
+
+    Arguments:
+    offsets (numpy.ndarray) - the curve offsets, as from Curves.curve_offsets
+
+    Returns:
+    (numpy.ndarray) - for every output vertex, the index of the point to use
+    '''
+    points_length = np.diff(offsets).astype(np.int64)
+    nverts = points_length + 2
+    curve_ids = np.repeat(np.arange(len(points_length)), nverts)
+    starts = np.concatenate(([0], np.cumsum(nverts)[:-1]))
+    local_ids = np.arange(len(curve_ids)) - np.repeat(starts, nverts)
+    return offsets[:-1][curve_ids] + np.clip(local_ids - 1, 0, points_length[curve_ids] - 1)
@@ -3,21 +3,21 @@ from ..rfb_utils import transform_utils
 from ..rfb_utils import scenegraph_utils
 from ..rfb_logger import rfb_log
 from ..rman_sg_nodes.rman_sg_hair import RmanSgHair
-from mathutils import Vector
 import math
 import bpy    
 import numpy as np
+from itertools import chain
 
 class BlHair:
 
     def __init__(self):        
-        self.points = []
-        self.next_points = []
-        self.vertsArray = []
-        self.scalpST = []
-        self.mcols = []
+        self.points = np.zeros(0, dtype=np.float32)
+        self.next_points = np.zeros(0, dtype=np.float32)
+        self.vertsArray = np.zeros(0, dtype=np.int32)
+        self.scalpST = np.zeros(0, dtype=np.float32)
+        self.mcols = np.zeros(0, dtype=np.float32)
         self.nverts = 0
-        self.hair_width = []
+        self.hair_width = np.zeros(0, dtype=np.float32)
         self.strand_indices = []
 
     @property
@@ -54,7 +54,7 @@ class RmanHairTranslator(RmanTranslator):
                 continue
             points = self._get_strands_deform_(ob, psys, topo_batch)
             primvar = curves_sg.GetPrimVars()
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, points, "vertex", time_sample)
+            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, points.data, "vertex", time_sample)
             curves_sg.SetPrimVars(primvar)
 
     def get_child(self, i, rman_sg_hair):
@@ -89,28 +89,28 @@ class RmanHairTranslator(RmanTranslator):
                 primvar.SetTimes([])
 
             if self.rman_scene.do_motion_blur:
-                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex", 0)
+                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points.data, "vertex", 0)
                 if psys.settings.renderman.do_velocity_blur:
-                    primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.next_points, "vertex", 1)
+                    primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.next_points.data, "vertex", 1)
             else:
-                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex")
+                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points.data, "vertex")
 
-            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray, "uniform")
+            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray.data, "uniform")
             index_nm = psys.settings.renderman.hair_index_name
             if index_nm == '':
                 index_nm = 'index'
-            primvar.SetIntegerDetail(index_nm, range(len(bl_curve.vertsArray)), "uniform")
+            primvar.SetIntegerDetail(index_nm, np.arange(len(bl_curve.vertsArray), dtype=np.int32).data, "uniform")
 
             width_detail = "vertex"
             if bl_curve.constant_width:
                 width_detail = "constant" 
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width, width_detail)
+            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width.data, width_detail)
             
             if len(bl_curve.scalpST):
-                primvar.SetFloatArrayDetail("scalpST", bl_curve.scalpST, 2, "uniform")
+                primvar.SetFloatArrayDetail("scalpST", bl_curve.scalpST.data, 2, "uniform")
 
             if len(bl_curve.mcols):
-                primvar.SetColorDetail("Cs", bl_curve.mcols, "uniform")
+                primvar.SetColorDetail("Cs", bl_curve.mcols.data, "uniform")
                     
             curves_sg.SetPrimVars(primvar)
             
@@ -185,126 +185,166 @@ class RmanHairTranslator(RmanTranslator):
                     mcol_set = i
                     break            
 
-        curve_sets = []
-        bl_curve = BlHair()
-        if conwidth:
-            bl_curve.hair_width.append(base_width)
-        
         start_idx = 0
         if psys.settings.child_type != 'NONE' and num_children > 0:
             start_idx = num_parents
-        
-        for pindex in range(start_idx, total_hair_count):
-            particle = psys.particles[
-                (pindex - num_parents) % num_parents]           
-            strand_points = []
-            next_strand_points = []
-            # walk through each strand
-            for step in range(0, steps):           
-                pt = psys.co_hair(ob, particle_no=pindex, step=step)
-
-                if pt.length_squared == 0:
-                    # this strand ends prematurely                    
-                    break                
-
-                strand_points.append(pt)
-
-            if len(strand_points) < 2:
-                # not enought points
-                continue
-
-            # double the first and last
-            strand_points = strand_points[:1] + \
-                strand_points + strand_points[-1:]
-                
-            vertsInStrand = len(strand_points)
-
-            # catmull-rom requires at least 4 vertices
-            if vertsInStrand < 4:
-                continue
-
-            # for motion blur
-            if self.rman_scene.do_motion_blur: 
-                if psys.settings.renderman.do_velocity_blur:
-                    # calculate the points for the next frame using velocity
-                    #vel = Vector(particle.velocity / particle.lifetime ) * rm.scale_velocity_blur
-                    
-                    ## Note, don't scale by the particle lifetime. This seems to match
-                    ## better with cycles
-                    vel = Vector(particle.velocity) * rm.scale_velocity_blur
-                    
-                    next_strand_points = [p + vel for p in strand_points]
-                else:
-                    bl_curve.strand_indices.append((pindex, vertsInStrand))
-
-            # for varying width make the width array
-            if not conwidth:
-                decr = (base_width - tip_width) / (vertsInStrand - 2)
-                bl_curve.hair_width.extend([base_width] + [(base_width - decr * i)
-                                                for i in range(vertsInStrand - 2)] +
-                                [tip_width])
-
-            bl_curve.points.extend(strand_points)
-            bl_curve.next_points.extend(next_strand_points)
-            bl_curve.vertsArray.append(vertsInStrand)
-            bl_curve.nverts += vertsInStrand                
-               
-            # get the scalp ST
-            if export_st:
-                st = psys.uv_on_emitter(psys_modifier, particle=particle, particle_no=pindex, uv_no=uv_set)
-                bl_curve.scalpST.append(st)
-
-            # get mcol
-            if export_mcol:                 
-                mcol = psys.mcol_on_emitter(psys_modifier, particle=particle, particle_no=pindex, vcol_no=mcol_set)
-                bl_curve.mcols.append(mcol)
-
-            # if we get more than 100000 vertices, start a new BlHair.  This
-            # is to avoid a maxint on the array length
-            if bl_curve.nverts > 100000:
-                curve_sets.append(bl_curve)
-                bl_curve = BlHair()
-                if conwidth:
-                    bl_curve.hair_width.append(base_width)                
-
-        if bl_curve.nverts > 0:       
+        if num_parents < 1 or start_idx >= total_hair_count:
+            return []
+
+        pindices = np.arange(start_idx, total_hair_count, dtype=np.int64)
+        samples = _sample_strands_(ob, psys, pindices, steps)
+
+        # a strand ends prematurely at its first zero length point
+        nonzero = np.any(samples != 0.0, axis=2)
+        counts = np.where(nonzero.all(axis=1), steps, np.argmin(nonzero, axis=1))
+
+        # we double the first and last points, and catmull-rom requires
+        # at least 4 vertices
+        keep = counts >= 2
+        pindices = pindices[keep]
+        samples = samples[keep]
+        counts = counts[keep]
+        if len(pindices) < 1:
+            return []
+        nverts = (counts + 2).astype(np.int32)
+
+        strand_ids, local_ids = _get_strand_vertex_ids_(nverts)
+        src = np.clip(local_ids - 1, 0, counts[strand_ids] - 1)
+        points = samples[strand_ids, src]
+        next_points = None
+
+        # for motion blur
+        topology = None
+        if self.rman_scene.do_motion_blur: 
+            if psys.settings.renderman.do_velocity_blur:
+                # calculate the points for the next frame using velocity
+                ## Note, don't scale by the particle lifetime. This seems to match
+                ## better with cycles
+                velocity = np.zeros(num_parents * 3, dtype=np.float32)
+                psys.particles.foreach_get('velocity', velocity)
+                velocity = velocity.reshape(-1, 3) * rm.scale_velocity_blur
+                parents = (pindices - num_parents) % num_parents
+                next_points = points + velocity[parents][strand_ids]
+            else:
+                topology = np.stack((pindices, nverts), axis=1)
+
+        # for varying width make the width array
+        hair_width = None
+        if not conwidth:
+            decr = (base_width - tip_width) / (nverts - 2)
+            hair_width = base_width - decr[strand_ids] * np.maximum(local_ids - 1, 0)
+            hair_width = hair_width.astype(np.float32)
+
+        # get the scalp ST and mcol. There's no bulk accessor for these,
+        # so we still have to ask per strand
+        scalpST = None
+        if export_st:
+            scalpST = np.array([psys.uv_on_emitter(psys_modifier, particle=psys.particles[(pindex - num_parents) % num_parents],
+                                                   particle_no=pindex, uv_no=uv_set) for pindex in pindices.tolist()],
+                               dtype=np.float32).reshape(-1, 2)
+        mcols = None
+        if export_mcol:
+            mcols = np.array([psys.mcol_on_emitter(psys_modifier, particle=psys.particles[(pindex - num_parents) % num_parents],
+                                                   particle_no=pindex, vcol_no=mcol_set) for pindex in pindices.tolist()],
+                             dtype=np.float32).reshape(-1, 3)
+
+        # if we get more than 100000 vertices, start a new BlHair.  This
+        # is to avoid a maxint on the array length
+        curve_sets = []
+        for start, end, v0, v1 in get_curve_chunks(nverts):
+            bl_curve = BlHair()
+            bl_curve.points = np.ascontiguousarray(points[v0:v1]).reshape(-1)
+            if next_points is not None:
+                bl_curve.next_points = np.ascontiguousarray(next_points[v0:v1]).reshape(-1)
+            bl_curve.vertsArray = np.ascontiguousarray(nverts[start:end])
+            bl_curve.nverts = int(v1 - v0)
+            if conwidth:
+                bl_curve.hair_width = np.array([base_width], dtype=np.float32)
+            else:
+                bl_curve.hair_width = np.ascontiguousarray(hair_width[v0:v1])
+            if scalpST is not None:
+                bl_curve.scalpST = np.ascontiguousarray(scalpST[start:end]).reshape(-1)
+            if mcols is not None:
+                bl_curve.mcols = np.ascontiguousarray(mcols[start:end]).reshape(-1)
+            if topology is not None:
+                bl_curve.strand_indices = topology[start:end]
             curve_sets.append(bl_curve)
 
         return curve_sets              
             
     def _get_strands_deform_(self, ob, psys, topo_batch):
         steps = (2 ** psys.settings.render_step) + 1
-        points = []
-
-        for pindex, expected_nverts in topo_batch:
-            strand_points = []
-            last_valid_pt = None
-
-            for step in range(0, steps):
-                pt = psys.co_hair(ob, particle_no=pindex, step=step)
-                if pt.length_squared == 0:
-                    # Hold last valid point instead of breaking
-                    if last_valid_pt is not None:
-                        strand_points.append(last_valid_pt)
-                else:
-                    last_valid_pt = pt
-                    strand_points.append(pt)
-
-            # Double first and last, same as _get_strands_
-            if len(strand_points) >= 2:
-                strand_points = strand_points[:1] + strand_points + strand_points[-1:]
-            elif len(strand_points) == 1:
-                strand_points = strand_points * expected_nverts
-            else:
-                # No valid points — hold at origin
-                strand_points = [Vector((0.0, 0.0, 0.0))] * expected_nverts
-
-            # Force exactly expected_nverts points
-            if len(strand_points) > expected_nverts:
-                strand_points = strand_points[:expected_nverts]
-            elif len(strand_points) < expected_nverts:
-                strand_points.extend([strand_points[-1]] * (expected_nverts - len(strand_points)))
-
-            points.extend(strand_points)
-
-        return points
\ No newline at end of file
+        topo_batch = np.asarray(topo_batch, dtype=np.int64).reshape(-1, 2)
+        pindices = topo_batch[:, 0]
+        expected_nverts = topo_batch[:, 1]
+        if len(pindices) < 1:
+            return np.zeros(0, dtype=np.float32)
+
+        samples = _sample_strands_(ob, psys, pindices, steps)
+        nonzero = np.any(samples != 0.0, axis=2)
+
+        # Hold last valid point instead of breaking. Zero length points before
+        # the first valid one are dropped.
+        held = np.where(nonzero, np.arange(steps), -1)
+        held = np.maximum.accumulate(held, axis=1)
+        first = np.argmax(nonzero, axis=1)
+        nvalid = np.where(nonzero.any(axis=1), steps - first, 0)
+
+        # Double first and last, same as _get_strands_, and force exactly
+        # expected_nverts points by repeating the last one
+        strand_ids, local_ids = _get_strand_vertex_ids_(expected_nverts)
+        src = first[strand_ids] + np.clip(local_ids - 1, 0, np.maximum(nvalid[strand_ids] - 1, 0))
+        src = np.minimum(src, steps - 1)
+        points = samples[strand_ids, held[strand_ids, src]]
+
+        # No valid points — hold at origin
+        points[nvalid[strand_ids] == 0] = 0.0
+
+        return np.ascontiguousarray(points).reshape(-1)
+
+def _sample_strands_(ob, psys, pindices, steps):
+    '''
+    Sample every step of each strand in pindices with co_hair, straight
+    into a float32 array.
+
+    Returns:
+    (numpy.ndarray) - array of shape (len(pindices), steps, 3)
+    '''
+    co_hair = psys.co_hair
+    step_range = range(0, steps)
+    coords = chain.from_iterable(co_hair(ob, particle_no=pindex, step=step)
+                                 for pindex in pindices.tolist() for step in step_range)
+    samples = np.fromiter(coords, dtype=np.float32, count=len(pindices) * steps * 3)
+    return samples.reshape(len(pindices), steps, 3)
+
+def _get_strand_vertex_ids_(nverts):
+    # for every output vertex, get the strand it belongs to and its
+    # index within that strand
+    nverts = np.asarray(nverts, dtype=np.int64)
+    strand_ids = np.repeat(np.arange(len(nverts)), nverts)
+    starts = np.concatenate(([0], np.cumsum(nverts)[:-1]))
+    local_ids = np.arange(len(strand_ids)) - np.repeat(starts, nverts)
+    return strand_ids, local_ids
+
+def get_curve_chunks(nverts, max_verts=100000):
+    '''
+    Split a set of curves into chunks. Curves are added to a chunk until it
+    has more than max_verts vertices, then a new chunk is started.
+
+    Arguments:
+    nverts (numpy.ndarray) - the number of vertices for each curve
+    max_verts (int) - once a chunk has more than this many vertices, start a new one
+
+    Returns:
+    (list) - (start curve, end curve, start vertex, end vertex) tuples, with exclusive ends
+    '''
+    ncurves = len(nverts)
+    vert_starts = np.concatenate(([0], np.cumsum(nverts, dtype=np.int64)))
+    chunks = []
+    start = 0
+    while start < ncurves:
+        end = int(np.searchsorted(vert_starts, vert_starts[start] + max_verts, side='right'))
+        end = min(max(end, start + 1), ncurves)
+        chunks.append((start, end, int(vert_starts[start]), int(vert_starts[end])))
+        start = end
+    return chunks
@@ -23,6 +23,9 @@ __MAP_CYCLES_PARAMS__ = {
     }
 }
 
+# parameter types that update_node_param can set on their own
+__SIMPLE_PARAM_TYPES__ = ['float', 'int', 'color', 'point', 'vector', 'normal']
+
 def get_root_node(node, type='bxdf'):
     rman_type = getattr(node, 'renderman_node_type', node.bl_idname)
     if rman_type == type:
@@ -43,6 +46,26 @@ def get_root_node(node, type='bxdf'):
         return out        
     return None
 
+class RmanShadingNetworkCache:
+    '''
+    The translated shading network for one section (bxdf or displacement) of a material, 
+    from the last time it was exported. 
+
+    Attributes:
+        network_key (tuple) - the structure of the network: the nodes, in export order, and their connections
+        sg_nodes (list) - for each node, the list of RixSGShader nodes it was translated to
+        param_keys (list) - for each node, its parameter values, or None if they can't be cached
+        node_index (dict) - node name to its index in sg_nodes and param_keys
+        is_current (bool) - whether this network is what's currently set on the material
+    '''
+
+    def __init__(self, network_key):
+        self.network_key = network_key
+        self.sg_nodes = []
+        self.param_keys = []
+        self.node_index = dict()
+        self.is_current = True
+
 def get_cycles_value(node, param_name):
     val = getattr(node, param_name, None)
     if node.bl_idname in __MAP_CYCLES_PARAMS__:
@@ -69,6 +92,9 @@ class RmanMaterialTranslator(RmanTranslator):
         succeed = False
 
         rman_sg_material.has_meshlight = False
+        # the sections we export below will replace these
+        for network_cache in rman_sg_material.network_cache.values():
+            network_cache.is_current = False
         rman_sg_material.sg_node.SetBxdf(None)        
         rman_sg_material.sg_node.SetLight(None)
         rman_sg_material.sg_node.SetDisplace(None)        
@@ -146,20 +172,7 @@ class RmanMaterialTranslator(RmanTranslator):
                         from_node = socket.links[0].from_node
                         linked_node = get_root_node(from_node, type='bxdf')
                         if linked_node:
-                            bxdfList = []
-                            sub_nodes = []
-                            rman_sg_material.nodes_to_blnodeinfo.clear()                       
-                            sub_nodes.extend(shadergraph_utils.gather_nodes(from_node))
-                            for sub_node in sub_nodes:
-                                shader_sg_nodes = self.shader_node_sg(material, sub_node, rman_sg_material, mat_name=handle)
-                                for s in shader_sg_nodes:
-                                    bxdfList.append(s) 
-
-                            for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
-                                if bl_node_info.is_cycles_node:
-                                    continue
-                                property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
-                            
+                            bxdfList = self.export_shading_network(material, rman_sg_material, from_node, handle, section='bxdf')
                             if bxdfList:
                                 rman_sg_material.sg_node.SetBxdf(bxdfList)   
                         else:
@@ -177,19 +190,9 @@ class RmanMaterialTranslator(RmanTranslator):
                         from_node = socket.links[0].from_node
                         linked_node = get_root_node(socket.links[0].from_node, type='light')
                         if linked_node:
-                            lightNodesList = []
-                            sub_nodes = []
-                            rman_sg_material.nodes_to_blnodeinfo.clear()                
-                            sub_nodes.extend(shadergraph_utils.gather_nodes(from_node))                        
-                            for sub_node in sub_nodes:
-                                shader_sg_nodes = self.shader_node_sg(material, sub_node, rman_sg_material, mat_name=handle)
-                                for s in shader_sg_nodes:
-                                    lightNodesList.append(s) 
-                            for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
-                                if bl_node_info.is_cycles_node:
-                                    continue                            
-                                property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
-                                                        
+                            # light nodes also export light filters and flag mesh lights, 
+                            # so they're always exported in full
+                            lightNodesList = self.export_shading_network(material, rman_sg_material, from_node, handle)
                             if lightNodesList:
                                 rman_sg_material.sg_node.SetLight(lightNodesList)                                   
 
@@ -202,19 +205,7 @@ class RmanMaterialTranslator(RmanTranslator):
                     from_node = socket.links[0].from_node
                     linked_node = get_root_node(from_node, type='displace')
                     if linked_node:                    
-                        dispList = []
-                        sub_nodes = []
-                        rman_sg_material.nodes_to_blnodeinfo.clear()                  
-                        sub_nodes.extend(shadergraph_utils.gather_nodes(from_node))                             
-                        for sub_node in sub_nodes:
-                            shader_sg_nodes = self.shader_node_sg(material, sub_node, rman_sg_material, mat_name=handle)
-                            for s in shader_sg_nodes:
-                                dispList.append(s) 
-                        for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
-                            if bl_node_info.is_cycles_node:
-                                continue
-                            property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
-                                                                              
+                        dispList = self.export_shading_network(material, rman_sg_material, from_node, handle, section='displace')
                         if dispList:
                             rman_sg_material.sg_node.SetDisplace(dispList)  
 
@@ -226,6 +217,180 @@ class RmanMaterialTranslator(RmanTranslator):
 
         return False
 
+    def _get_network_key_(self, sub_nodes, handle):
+        # The structure of the network. If this hasn't changed, we can reuse the 
+        # RixSGShader nodes from last time. Returns None for networks we don't cache.
+        key = [handle]
+        for node in sub_nodes:
+            if type(node) == RmanConvertNode:
+                key.append(('convert', node.node_type, node.from_node.name, node.from_socket.identifier,
+                            node.to_node.name, node.to_socket.identifier))
+                continue
+            if node.bl_idname != 'NodeReroute':
+                # cycles nodes and node groups are translated in one go, with their parameters
+                if not hasattr(node, 'renderman_node_type'):
+                    return None
+                if node.renderman_node_type == 'light':
+                    return None
+            links = tuple((socket.identifier, socket.links[0].from_node.name, socket.links[0].from_socket.identifier) 
+                          for socket in node.inputs if socket.is_linked and socket.links)
+            key.append((node.name, node.bl_idname, links))
+        return tuple(key)
+
+    def _get_param_key_(self, node, rman_sg_material):
+        # The parameter values of a node. If these haven't changed, we don't need to
+        # export the node again. Returns None if we can't tell if a parameter has 
+        # changed, ex: textures, ramps and arrays.
+        if type(node) == RmanConvertNode or node.bl_idname == 'NodeReroute':
+            return ()
+        if node.bl_label == 'PxrOSL' or getattr(node, 'rman_has_textured_params', False):
+            return None
+        if getattr(node, 'rman_fake_node_group', ''):
+            return None
+        key = []
+        if rman_sg_material.is_frame_sensitive:
+            key.append(self.rman_scene.bl_frame_current)
+        for prop_name, meta in node.prop_meta.items():
+            if meta.get('renderman_type', '') in ['array', 'colorramp', 'floatramp']:
+                return None
+            val = getattr(node, prop_name, None)
+            if val is None or isinstance(val, (bool, int, float, str)):
+                key.append(val)
+            elif isinstance(val, bpy.types.ID):
+                key.append(val.name_full)
+            else:
+                try:
+                    val = tuple(val)
+                except TypeError:
+                    return None
+                if not all(isinstance(v, (bool, int, float, str)) for v in val):
+                    return None
+                key.append(val)
+        return tuple(key)
+
+    def export_shading_network(self, material, rman_sg_material, from_node, handle, section=None):
+        '''
+        Export the shading network connected to from_node.
+
+        For the bxdf and displacement sections, the translated network is cached 
+        on rman_sg_material. If the structure of the network hasn't changed since it
+        was last exported, only the nodes whose parameters have changed are exported
+        again; the RixSGShader nodes for the rest are reused.
+
+        Args:
+            material (bpy.types.Material) - the material
+            rman_sg_material (RmanSgMaterial) - the material's scene graph node
+            from_node (bpy.types.Node) - the node connected to the output node
+            handle (str) - the material's handle, used to name the shading nodes
+            section (str) - the section of the network to cache (ex: bxdf). None means don't cache
+
+        Returns:
+            (list) - the RixSGShader nodes for the network
+        '''
+        rman_sg_material.nodes_to_blnodeinfo.clear()
+        sub_nodes = shadergraph_utils.gather_nodes(from_node)
+
+        network_key = None
+        if section:
+            network_key = self._get_network_key_(sub_nodes, handle)
+        network_cache = rman_sg_material.network_cache.get(section, None)
+        if network_key is None or network_cache is None or network_cache.network_key != network_key:
+            network_cache = None
+
+        new_cache = RmanShadingNetworkCache(network_key)
+        sg_nodes_list = []
+        for i, sub_node in enumerate(sub_nodes):
+            param_key = self._get_param_key_(sub_node, rman_sg_material) if network_key else None
+            if network_cache and param_key is not None and network_cache.param_keys[i] == param_key:
+                # unchanged, reuse what we exported last time
+                shader_sg_nodes = network_cache.sg_nodes[i]
+            else:
+                shader_sg_nodes = self.shader_node_sg(material, sub_node, rman_sg_material, mat_name=handle)
+            if hasattr(sub_node, 'renderman_node_type'):
+                new_cache.node_index[sub_node.name] = i
+            new_cache.sg_nodes.append(shader_sg_nodes)
+            new_cache.param_keys.append(param_key)
+            sg_nodes_list.extend(shader_sg_nodes)
+
+        # set the parameters on any nodes we (re)created
+        for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
+            if bl_node_info.is_cycles_node:
+                continue
+            property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
+
+        if network_key:
+            rman_sg_material.network_cache[section] = new_cache
+        elif section:
+            rman_sg_material.network_cache.pop(section, None)
+
+        return sg_nodes_list
+
+    def update_node_param(self, mat, rman_sg_material, node, prop_name):
+        '''
+        Update a single parameter of a shading node, without exporting the rest of the
+        material again. The node's RixSGShader is looked up in the network cache from 
+        export_shading_network, so this only works for bxdf and displacement networks that 
+        were cached, and for simple parameters (ex: float, color) that aren't connected.
+
+        Args:
+            mat (bpy.types.Material) - the material
+            rman_sg_material (RmanSgMaterial) - the material's scene graph node
+            node (bpy.types.ShaderNode) - the node whose parameter changed
+            prop_name (str) - the name of the parameter's property on the node
+
+        Returns:
+            (bool) - False if we couldn't update the parameter, and the material needs to be updated in full
+        '''
+        meta = getattr(node, 'prop_meta', dict()).get(prop_name, None)
+        if meta is None:
+            return False
+        if meta.get('renderman_type', '') not in __SIMPLE_PARAM_TYPES__:
+            return False
+
+        section = None
+        index = -1
+        for nm, network_cache in rman_sg_material.network_cache.items():
+            if not network_cache.is_current:
+                continue
+            index = network_cache.node_index.get(node.name, -1)
+            if index > -1:
+                section = nm
+                break
+        if section is None:
+            return False
+        shader_sg_nodes = network_cache.sg_nodes[index]
+        if len(shader_sg_nodes) != 1 or shader_sg_nodes[0] is None:
+            return False
+        # check the node is still something we can cache, and get its new key
+        param_key = self._get_param_key_(node, rman_sg_material)
+        if param_key is None:
+            return False
+
+        bl_prop_info = property_utils.BlPropInfo(node, prop_name, meta)
+        if bl_prop_info.is_linked or bl_prop_info.is_vstruct_and_linked or bl_prop_info.is_texture:
+            return False
+        if bl_prop_info.is_ui_struct or bl_prop_info.ui_struct or bl_prop_info.arraySize:
+            return False
+        if not bl_prop_info.do_export:
+            # a full export leaves this parameter out, rather than keeping the last value we sent
+            return False
+        network_cache.param_keys[index] = param_key
+
+        sg_node = shader_sg_nodes[0]
+        bl_prop_val = property_utils.get_prop_value(node, mat, rman_sg_material, bl_prop_info)
+        # always write the value, in case it went back to its default
+        property_utils.set_rix_param(sg_node.params, bl_prop_info.renderman_type, bl_prop_info.renderman_name, 
+                                     bl_prop_val.value, is_reference=False, node=node, force_write=True)
+
+        sg_nodes_list = []
+        for sg_nodes in network_cache.sg_nodes:
+            sg_nodes_list.extend(sg_nodes)
+        if section == 'bxdf':
+            rman_sg_material.sg_node.SetBxdf(sg_nodes_list)
+        else:
+            rman_sg_material.sg_node.SetDisplace(sg_nodes_list)
+        return True
+
     def export_solo_shader(self, mat, nt, out, solo_node, rman_sg_material, mat_handle=''):
         bxdfList = []
         rman_sg_material.nodes_to_blnodeinfo.clear()         
@@ -12,19 +12,28 @@ from ..rman_constants import BLENDER_41
 import bpy
 import math
 import bmesh
+import hashlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 
 def _get_mats_faces_(nverts, material_ids):
+    # Group the face ids by material index. Each group is a contiguous
+    # int32 array of ascending face ids. The dictionary is ordered by the
+    # first face that uses each material.
+    material_ids = np.asarray(material_ids)
+    if material_ids.size == 0:
+        return {}
+    order = np.argsort(material_ids, kind='stable').astype(np.int32)
+    mat_ids, first_face, counts = np.unique(material_ids, return_index=True, return_counts=True)
+    groups = np.split(order, np.cumsum(counts)[:-1])
 
     mats = {}
-    for face_id, num_verts in enumerate(nverts):
-        mat_id = material_ids[face_id]
-        if mat_id not in mats:
-            mats[mat_id] = []
-        mats[mat_id].append(face_id)
+    for i in np.argsort(first_face, kind='stable'):
+        mats[int(mat_ids[i])] = groups[i]
     return mats
 
-def _is_multi_material_(ob, mesh):
+def _is_multi_material_(ob, mesh, material_ids=None):
     if len(ob.data.materials) < 2 or len(mesh.polygons) == 0:
         return False
 
@@ -36,10 +45,9 @@ def _is_multi_material_(ob, mesh):
     if has_geo_nodes:
         # if this object has geometry nodes, the material used is the last one
         first_mat = len(ob.material_slots)-1
-    for p in mesh.polygons:
-        if p.material_index != first_mat:
-            return True
-    return False
+    if material_ids is None:
+        material_ids = _get_material_ids(ob, mesh)
+    return bool((material_ids != first_mat).any())
 
 # requires facevertex interpolation
 def _get_mesh_uv_(mesh, name="", ob=None):
@@ -95,13 +103,14 @@ def _get_mesh_vcol_(mesh, name="", ob=None):
         return None
 
     vcol_count = len(vcol_layer.data)
-    fastvcols = np.zeros(vcol_count * 4)
+    fastvcols = np.zeros(vcol_count * 4, dtype=np.float32)
     vcol_layer.data.foreach_get("color", fastvcols) 
 
-    delete_alpha = np.arange(3, fastvcols.size, 4)
-    cols = np.delete(fastvcols, delete_alpha)
+    return fastvcols
 
-    return cols    
+def _strip_alpha_(rgba):
+    # drop every 4th component, without the index array np.delete builds
+    return np.ascontiguousarray(rgba.reshape(-1, 4)[:, :3]).reshape(-1)
 
 def _get_mesh_vattr_(mesh, name=""):
     if not name in mesh.attributes and mesh != "":
@@ -114,29 +123,79 @@ def _get_mesh_vattr_(mesh, name=""):
         return None
 
     vcol_count = len(vattr_layer.data)
-    fastvattrs = np.zeros(vcol_count * 4)
+    fastvattrs = np.zeros(vcol_count * 4, dtype=np.float32)
     vattr_layer.data.foreach_get("color", fastvattrs)
- 
-    delete_alpha = np.arange(3, fastvattrs.size, 4)
-    attrs = np.delete(fastvattrs, delete_alpha)       
     
-    return attrs 
-
-def _get_mesh_vgroup_(ob, mesh, name=""):
-    vgroup = ob.vertex_groups[name] if name != "" else ob.vertex_groups.active
-    weights = []
-
-    if vgroup is None:
-        return None
-
-    for v in mesh.vertices:
-        if len(v.groups) == 0:
-            weights.append(0.0)
+    return fastvattrs
+
+class VertexGroupWeights(object):
+    '''
+    Extracts dense per-vertex weight arrays for an object's vertex groups.
+
+    Blender doesn't give us a bulk accessor for vertex group membership, so
+    we walk the vertices once, the first time any group is asked for, and
+    remember every (vertex, group, weight) triple. Each group's dense float32
+    array is then built with numpy. An instance should only be used for the
+    mesh evaluation it was created for.
+
+    Attributes:
+        ob (bpy.types.Object) - the evaluated object that owns the vertex groups
+        mesh (bpy.types.Mesh) - the evaluated mesh
+    '''
+
+    def __init__(self, ob, mesh):
+        self.ob = ob
+        self.mesh = mesh
+        self.npoints = len(mesh.vertices)
+        self._vert_ids = None
+        self._weights = None
+        self._group_starts = None
+        self._group_ids = None
+        self._cache = dict()
+
+    def _extract(self):
+        memberships = [(v.index, g.group, g.weight) for v in self.mesh.vertices for g in v.groups]
+        if memberships:
+            arr = np.array(memberships, dtype=np.float64)
+            group_ids = arr[:, 1].astype(np.int32)
+            # sort by group, so each group's entries are a contiguous slice
+            order = np.argsort(group_ids, kind='stable')
+            self._group_ids, self._group_starts = np.unique(group_ids[order], return_index=True)
+            self._group_starts = np.append(self._group_starts, len(order))
+            self._vert_ids = arr[order, 0].astype(np.int64)
+            self._weights = arr[order, 2].astype(np.float32)
         else:
-            weights.extend([g.weight if g.group == vgroup.index else 0.0 for g in v.groups
-                            ])
-
-    return weights
+            self._group_ids = np.zeros(0, dtype=np.int32)
+            self._group_starts = np.zeros(1, dtype=np.int64)
+            self._vert_ids = np.zeros(0, dtype=np.int64)
+            self._weights = np.zeros(0, dtype=np.float32)
+
+    def get(self, name=""):
+        """Return the weights for the named vertex group (or the active group, if
+        name is empty), as a numpy float32 array with one value per vertex.
+        Returns None if the group doesn't exist.
+        """
+        vgroup = self.ob.vertex_groups.get(name, None) if name != "" else self.ob.vertex_groups.active
+        if vgroup is None:
+            return None
+        if vgroup.index in self._cache:
+            return self._cache[vgroup.index]
+        if self._weights is None:
+            self._extract()
+
+        weights = np.zeros(self.npoints, dtype=np.float32)
+        i = np.searchsorted(self._group_ids, vgroup.index)
+        if i < len(self._group_ids) and self._group_ids[i] == vgroup.index:
+            start = self._group_starts[i]
+            end = self._group_starts[i+1]
+            weights[self._vert_ids[start:end]] = self._weights[start:end]
+        self._cache[vgroup.index] = weights
+        return weights
+
+def _get_mesh_vgroup_(ob, mesh, name="", vgroup_weights=None):
+    if vgroup_weights is None:
+        vgroup_weights = VertexGroupWeights(ob, mesh)
+    return vgroup_weights.get(name)
 
 def _get_material_ids(ob, geo):        
     fast_material_ids = np.zeros(len(geo.polygons), dtype=np.int32)
@@ -209,8 +268,8 @@ def _export_reference_pose(ob, rman_sg_mesh, rm, rixparams):
         else:
             rfb_log().error("Number of WNref primvars do not match. Please re-freeze the reference position.")  
 
-def export_tangents(ob, geo, rixparams, uvmap="", name=""):
-    # also export the tangent and bitangent vectors
+def _get_mesh_tangents_(geo, uvmap=""):
+    # get the tangent and bitangent vectors
     try:
         if uvmap == "":
             geo.calc_tangents(uvmap=geo.uv_layers.active.name)         
@@ -225,117 +284,349 @@ def export_tangents(ob, geo, rixparams, uvmap="", name=""):
         geo.loops.foreach_get('bitangent', fastbitangent)
         bitangent = fastbitangent    
         geo.free_tangents()    
-
-        if name == "":
-            rixparams.SetVectorDetail('Tn', tangents.data, 'facevarying')
-            rixparams.SetVectorDetail('Bn', bitangent.data, 'facevarying')    
-        else:
-            rixparams.SetVectorDetail('%s_Tn' % name, tangents.data, 'facevarying')
-            rixparams.SetVectorDetail('%s_Bn' % name, bitangent.data, 'facevarying')                
+        return (tangents, bitangent)
     except RuntimeError as err:
         rfb_log().debug("Can't export tangent vectors: %s" % str(err))       
+    return (None, None)
+
+def _gather_tangents_(mesh_data, geo, uvmap="", name=""):
+    tangents, bitangent = _get_mesh_tangents_(geo, uvmap=uvmap)
+    if tangents is None:
+        return
+    if name == "":
+        mesh_data.add_primvar('vector', 'Tn', tangents, detail='facevarying')
+        mesh_data.add_primvar('vector', 'Bn', bitangent, detail='facevarying')
+    else:
+        mesh_data.add_primvar('vector', '%s_Tn' % name, tangents, detail='facevarying')
+        mesh_data.add_primvar('vector', '%s_Bn' % name, bitangent, detail='facevarying')
+
+def export_tangents(ob, geo, rixparams, uvmap="", name=""):
+    # also export the tangent and bitangent vectors
+    tangents, bitangent = _get_mesh_tangents_(geo, uvmap=uvmap)
+    if tangents is None:
+        return
+    if name == "":
+        rixparams.SetVectorDetail('Tn', tangents.data, 'facevarying')
+        rixparams.SetVectorDetail('Bn', bitangent.data, 'facevarying')    
+    else:
+        rixparams.SetVectorDetail('%s_Tn' % name, tangents.data, 'facevarying')
+        rixparams.SetVectorDetail('%s_Bn' % name, bitangent.data, 'facevarying')                
+
+class RmanMeshData(object):
+    '''
+    Holds the arrays needed to export a mesh. 
+
+    Exporting a mesh is split into three steps:
+
+    * gather - pull the raw arrays out of the Blender mesh. This talks to Blender, so
+      it has to run on the main thread.
+    * process - the CPU-bound post-processing (alpha stripping, crease filtering, face
+      sets, detail classification, hashing). This only touches numpy arrays, so it can
+      run on a worker thread.
+    * RmanMeshTranslator.update - set the primvars on the scenegraph node. 
+
+    Attributes:
+        rman_mesh (RmanMesh) - nverts, verts, P and N for the mesh
+        is_subdiv (bool) - whether the mesh is a subdivision surface
+        get_normals (bool) - whether normals were requested
+        is_multi_material (bool) - whether the mesh uses more than one material
+        material_ids (numpy.ndarray) - material index of each face
+        mat_faces (dict) - material index to the faces that use it
+        creases (numpy.ndarray) - crease value of each edge
+        crease_edges (numpy.ndarray) - vertex indices of each edge
+        subd_intargs (list) - interpolateboundary and facevaryinginterpolateboundary values
+        subd_tags (tuple) - tags, nargs, intargs, floatargs and stringargs
+        primvars (list) - list of [kind, name, values, detail] to be exported
+        primvar_digests (dict) - (kind, name) to a digest of the values, for each array primvar. 
+                                None if they haven't been computed
+        processed (bool) - whether process() has been called
+    '''
+
+    def __init__(self):
+        self.rman_mesh = None
+        self.is_subdiv = False
+        self.get_normals = False
+        self.is_multi_material = False
+        self.material_ids = None
+        self.mat_faces = None
+        self.creases = None
+        self.crease_edges = None
+        self.subd_intargs = [0, 0]
+        self.subd_tags = None
+        self.primvars = list()
+        self.primvar_digests = None
+        self.processed = False
+
+    def is_empty(self):
+        return self.rman_mesh is None or not self.rman_mesh.nverts.any()
+
+    def add_primvar(self, kind, name, values, detail=None):
+        self.primvars.append([kind, name, values, detail])
+
+    def process(self):
+        '''
+        Do the CPU-bound part of the export. Must not touch any Blender data.
+        '''
+        if self.processed or self.is_empty():
+            self.processed = True
+            return self
+
+        facevarying_detail = self.rman_mesh.numnverts
+
+        primvars = list()
+        for kind, name, values, detail in self.primvars:
+            if kind in ('refpose', 'attrs', 'attr', 'weights', 'vector'):
+                primvars.append([kind, name, values, detail])
+                continue
+            if kind == 'rgba':
+                values = _strip_alpha_(values)
+                kind = 'color'
+            if kind in ('color', 'st') and not values.any():
+                continue
+            if detail is None and kind in ('st', 'color'):
+                elems = {'st': 2, 'color': 3}.get(kind, 1)
+                detail = "facevarying" if (facevarying_detail*elems) == len(values) else "vertex"
+            primvars.append([kind, name, values, detail])
+        self.primvars = primvars
+
+        if self.is_subdiv:
+            self.subd_tags = _get_subd_tags_(self.creases, self.crease_edges, self.subd_intargs)
+            self.creases = None
+            self.crease_edges = None
+
+        if self.is_multi_material and self.material_ids is not None:
+            self.mat_faces = _get_mats_faces_(self.rman_mesh.nverts, self.material_ids)
+        else:
+            # hash here, so that it happens on the worker thread. update() uses
+            # these to check if it can skip re-sending the topology
+            self.rman_mesh.topology_digest()
+            self.primvar_digests = _get_primvar_digests_(self)
+
+        self.processed = True
+        return self
+
+def _get_subd_tags_(creases, crease_edges, intargs):
+    tags = ['interpolateboundary', 'facevaryinginterpolateboundary']
+    nargs = [1, 0, 0, 1, 0, 0]
+    intargs = list(intargs)
+    floatargs = []
+    stringargs = []   
+
+    if creases is not None and (creases > 0.0).any():
+        # we have edges where their crease is > 0.0
+        # grab only those edges
+        edges_len = len(creases)
+        crease_edges = np.reshape(crease_edges, (edges_len, 2))
+        crease_edges = crease_edges[creases > 0.0]
+        
+        # squared, to match blender appareance better
+        #: range 0 - 10 (infinitely sharp)
+        creases = creases * creases * 10.0
+        
+        creases = creases[creases > 0.0]
+        edges_subset_len = len(creases) 
+
+        tags.extend(['crease'] * edges_subset_len)
+        nargs.extend([2, 1, 0] * edges_subset_len)
+        intargs.extend(crease_edges.flatten().tolist())
+        floatargs.extend(creases.tolist())   
+
+    return (tags, nargs, intargs, floatargs, stringargs)
 
-def _get_primvars_(ob, rman_sg_mesh, geo, rixparams):
+def _gather_primvars_(ob, geo, mesh_data):
     #rm = ob.data.renderman
     # Stange problem here : ob seems to not be in sync with the scene
     # when a geometry node is active...
     rm = ob.original.data.renderman
 
-    facevarying_detail = rman_sg_mesh.nverts 
+    facevarying_detail = mesh_data.rman_mesh.numnverts 
 
     if rm.export_default_uv:
         uvs = _get_mesh_uv_(geo, ob=ob)
         if uvs is not None and uvs.any():
-            detail = "facevarying" if (facevarying_detail*2) == len(uvs) else "vertex"
-            rixparams.SetFloatArrayDetail("st", uvs.data, 2, detail)
+            mesh_data.add_primvar('st', 'st', uvs)
             if rm.export_default_tangents:
-                export_tangents(ob, geo, rixparams)    
+                _gather_tangents_(mesh_data, geo)
 
     if rm.export_default_vcol:
         vcols = _get_mesh_vcol_(geo, ob=ob)
-        if vcols is not None and vcols.any():
-            detail = "facevarying" if (facevarying_detail*3) == len(vcols) else "vertex"
-            rixparams.SetColorDetail("Cs", vcols.data, detail)
+        if vcols is not None:
+            mesh_data.add_primvar('rgba', 'Cs', vcols)
 
-    # reference pose
-    if hasattr(rm, 'reference_pose'):
-        _export_reference_pose(ob, rman_sg_mesh, rm, rixparams)
+    # reference pose, this gets exported when the primvars are set
+    mesh_data.add_primvar('refpose', '', None)
 
     output_all_primvars = getattr(rm, 'output_all_primvars', False)
     if output_all_primvars:
         # export all of the attributes
         detail_map = { facevarying_detail: 'facevarying',
-                    rman_sg_mesh.npoints: 'vertex', rman_sg_mesh.npolys: 'uniform',
+                    mesh_data.rman_mesh.npoints: 'vertex', mesh_data.rman_mesh.npolys: 'uniform',
                     1: "constant"}
         attrs_dict = dict()
         BlAttribute.parse_attributes(attrs_dict, ob, detail_map)
-        BlAttribute.set_rman_primvars(rixparams, attrs_dict)
+        mesh_data.add_primvar('attrs', '', attrs_dict)
 
         # vertex group
+        vgroup_weights = VertexGroupWeights(ob, geo)
         for nm in ob.vertex_groups.keys():
-            weights = _get_mesh_vgroup_(ob, geo, nm)
-            if weights and len(weights) > 0:
+            weights = _get_mesh_vgroup_(ob, geo, nm, vgroup_weights=vgroup_weights)
+            if weights is not None and len(weights) > 0:
                 detail = "facevarying" if facevarying_detail == len(weights) else "vertex"
-                rixparams.SetFloatDetail(nm, weights, detail)        
+                mesh_data.add_primvar('weights', nm, weights, detail=detail)
         
     elif len(rm.prim_vars) > 0:
         # custom prim vars
+        vgroup_weights = VertexGroupWeights(ob, geo)
         for p in rm.prim_vars:
             if p.data_source == 'ATTRIBUTES':
                 if p.data_name in geo.attributes:
                     detail_map = { facevarying_detail: 'facevarying',
-                    rman_sg_mesh.npoints: 'vertex', rman_sg_mesh.npolys: 'uniform',
+                    mesh_data.rman_mesh.npoints: 'vertex', mesh_data.rman_mesh.npolys: 'uniform',
                     1: 'constant'}
                     rman_attr = BlAttribute.parse_attribute(geo.attributes[p.data_name], detail_map)
                     if rman_attr:
                         if p.name != "":
                             rman_attr.rman_name = string_utils.sanitize_node_name(p.name)
-                        BlAttribute.set_rman_primvar(rixparams, rman_attr)
+                        mesh_data.add_primvar('attr', rman_attr.rman_name, rman_attr)
             elif p.data_source == 'VERTEX_COLOR':
                 vcols = _get_mesh_vcol_(geo, p.data_name)
-                
-                if vcols is not None and vcols.any():
-                    detail = "facevarying" if (facevarying_detail*3) == len(vcols) else "vertex"
-                    rixparams.SetColorDetail(p.name, vcols.data, detail)
+                if vcols is not None:
+                    mesh_data.add_primvar('rgba', p.name, vcols)
                 
             elif p.data_source == 'UV_TEXTURE':
                 uvs = _get_mesh_uv_(geo, p.data_name)
                 if uvs is not None and uvs.any():
-                    detail = "facevarying" if (facevarying_detail*2) == len(uvs) else "vertex"
-                    rixparams.SetFloatArrayDetail(p.name, uvs.data, 2, detail)
+                    mesh_data.add_primvar('st', p.name, uvs)
                     if p.export_tangents:
-                        export_tangents(ob, geo, rixparams, uvmap=p.data_name, name=p.name) 
+                        _gather_tangents_(mesh_data, geo, uvmap=p.data_name, name=p.name) 
 
             elif p.data_source == 'VERTEX_GROUP':
-                weights = _get_mesh_vgroup_(ob, geo, p.data_name)
-                if weights and len(weights) > 0:
+                weights = _get_mesh_vgroup_(ob, geo, p.data_name, vgroup_weights=vgroup_weights)
+                if weights is not None and len(weights) > 0:
                     detail = "facevarying" if facevarying_detail == len(weights) else "vertex"
-                    rixparams.SetFloatDetail(p.name, weights, detail)
+                    mesh_data.add_primvar('weights', p.name, weights, detail=detail)
             elif p.data_source == 'VERTEX_ATTR_COLOR':
                 vattr = _get_mesh_vattr_(geo, p.data_name)            
-                if vattr is not None and vattr.any():
-                    detail = "facevarying" if (facevarying_detail*3) == len(vattr) else "vertex"
-                    rixparams.SetColorDetail(p.data_name, vattr.data, detail)
+                if vattr is not None:
+                    mesh_data.add_primvar('rgba', p.data_name, vattr)
+
+def _get_primvar_digests_(mesh_data):
+    # digest each array primvar, so we can tell which ones
+    # changed since the last time the mesh was updated
+    digests = dict()
+    for kind, name, values, detail in mesh_data.primvars:
+        if isinstance(values, np.ndarray):
+            digests[(kind, name)] = hashlib.blake2b(np.ascontiguousarray(values), digest_size=16).digest()
+    return digests
+
+def _set_primvars_(ob, rman_sg_mesh, mesh_data, rixparams, skip=None):
+    rm = ob.original.data.renderman
+
+    for kind, name, values, detail in mesh_data.primvars:
+        if skip and (kind, name) in skip:
+            continue
+        if kind == 'st':
+            rixparams.SetFloatArrayDetail(name, values.data, 2, detail)
+        elif kind == 'color':
+            rixparams.SetColorDetail(name, values.data, detail)
+        elif kind == 'vector':
+            rixparams.SetVectorDetail(name, values.data, detail)
+        elif kind == 'weights':
+            rixparams.SetFloatDetail(name, values.data, detail)
+        elif kind == 'attr':
+            BlAttribute.set_rman_primvar(rixparams, values)
+        elif kind == 'attrs':
+            BlAttribute.set_rman_primvars(rixparams, values)
+        elif kind == 'refpose':
+            if hasattr(rm, 'reference_pose'):
+                _export_reference_pose(ob, rman_sg_mesh, rm, rixparams)
 
     rm_scene = rman_sg_mesh.rman_scene.bl_scene.renderman
     property_utils.set_primvar_bl_props(rixparams, rm, inherit_node=rm_scene)
 
+class RmanMeshPrefetcher(object):
+    '''
+    Lets the CPU-bound part of exporting meshes run on a thread pool, while the 
+    export loop carries on. Each mesh is gathered as soon as it's added, while the 
+    caller is still on it, and RmanMeshData.process() is run for it on the thread pool. 
+    Its update() is called once window more meshes have been added, or on flush(), 
+    so we don't hold the whole scene's geometry in memory.
+
+    Only add meshes whose evaluated object stays valid for the whole export. 
+    Instances from DepsgraphObjectInstance's (ex: geometry nodes) are temporary, 
+    and need to be updated right away.
+
+    Attributes:
+        translator (RmanMeshTranslator) - the mesh translator
+        window (int) - how many meshes can be waiting to be updated
+        queue (collections.deque) - (ob, rman_sg_node, future) for each mesh waiting to be updated
+    '''
+
+    def __init__(self, translator, window=64, max_workers=None):
+        self.translator = translator
+        self.window = window
+        self.max_workers = max_workers
+        self.queue = deque()
+        self.executor = None
+
+    def add(self, ob, rman_sg_node):
+        """Gather the data for a mesh now, and start processing it.
+
+        Args:
+        ob (bpy.types.Object) - the evaluated object
+        rman_sg_node (RmanSgMesh) - the mesh's scene graph node
+        """
+        future = None
+        try:
+            mesh_data = self.translator.gather(ob)
+            if mesh_data is not None:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                future = self.executor.submit(mesh_data.process)
+        except Exception as e:
+            rfb_log().debug("Could not gather mesh data for %s: %s" % (ob.name, str(e)))
+        self.queue.append((ob, rman_sg_node, future))
+        while len(self.queue) > self.window:
+            self._update_next_()
+
+    def _update_next_(self):
+        ob, rman_sg_node, future = self.queue.popleft()
+        mesh_data = None
+        if future is not None:
+            try:
+                mesh_data = future.result()
+            except Exception as e:
+                rfb_log().debug("Could not process mesh data for %s: %s" % (ob.name, str(e)))
+        self.translator.update(ob, rman_sg_node, mesh_data=mesh_data)
+
+    def flush(self, cancel_requested=None):
+        """Update all of the meshes that are still waiting.
+
+        Args:
+        cancel_requested (function) - called before each mesh. If it returns True, we stop.
+
+        Returns:
+        (bool) - False if we stopped early
+        """
+        while self.queue:
+            if cancel_requested and cancel_requested():
+                return False
+            self._update_next_()
+        return True
+
+    def shutdown(self):
+        self.queue.clear()
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
 class RmanMeshTranslator(RmanTranslator):
 
     def __init__(self, rman_scene):
         super().__init__(rman_scene)
         self.bl_type = 'MESH' 
 
-    def _get_subd_tags_(self, ob, mesh, primvar):
-        rm = mesh.renderman
-
-        tags = ['interpolateboundary', 'facevaryinginterpolateboundary']
-        nargs = [1, 0, 0, 1, 0, 0]
-        intargs = [ int(ob.data.renderman.rman_subdivInterp),
-                int(ob.data.renderman.rman_subdivFacevaryingInterp)]
-        floatargs = []
-        stringargs = []   
-
+    def _get_creases_(self, mesh, mesh_data):
         # get creases
         edges_len = len(mesh.edges)
         creases = np.zeros(edges_len, dtype=np.float32)
@@ -344,32 +635,63 @@ class RmanMeshTranslator(RmanTranslator):
                 mesh.edge_creases.data.foreach_get('value', creases)
         else:
             mesh.edges.foreach_get('crease', creases)
+        mesh_data.creases = creases
         if (creases > 0.0).any():
-            # we have edges where their crease is > 0.0
-            # grab only those edges
             crease_edges = np.zeros(edges_len*2, dtype=np.int32)
             mesh.edges.foreach_get('vertices', crease_edges)
-            crease_edges = np.reshape(crease_edges, (edges_len, 2))
-            crease_edges = crease_edges[creases > 0.0]
-            
-            # squared, to match blender appareance better
-            #: range 0 - 10 (infinitely sharp)
-            creases = creases * creases * 10.0
-            
-            creases = creases[creases > 0.0]
-            edges_subset_len = len(creases) 
-
-            tags.extend(['crease'] * edges_subset_len)
-            nargs.extend([2, 1, 0] * edges_subset_len)
-            intargs.extend(crease_edges.flatten().tolist())
-            floatargs.extend(creases.tolist())   
+            mesh_data.crease_edges = crease_edges
 
+    def _set_subd_tags_(self, mesh_data, primvar):
+        tags, nargs, intargs, floatargs, stringargs = mesh_data.subd_tags
         primvar.SetStringArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtags, tags, len(tags))
         primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagnargs, nargs, len(nargs))
         primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagintargs, intargs, len(intargs))
         primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagfloatargs, floatargs, len(floatargs))
         primvar.SetStringArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagstringtags, stringargs, len(stringargs))        
 
+    def gather(self, ob, mesh=None):
+        """Pull all of the arrays we need to export this mesh out of Blender.
+        This needs to run on the main thread. The result's process() method
+        can then be run on a worker thread, before handing it to update().
+
+        Args:
+        ob (bpy.types.Object) - the evaluated object
+        mesh (bpy.types.Mesh) - mesh to use. If None, ob.to_mesh() is used.
+
+        Returns:
+        (RmanMeshData) - the gathered mesh data, or None if the object has no mesh
+        """
+        rm = ob.original.data.renderman
+        input_mesh = mesh
+        if not mesh:
+            mesh = ob.to_mesh()
+            if not mesh:
+                return None
+
+        mesh_data = RmanMeshData()
+        mesh_data.is_subdiv = object_utils.is_subdmesh(ob.original)
+        use_smooth_normals = getattr(rm, 'rman_smoothnormals', False)
+        mesh_data.get_normals = (mesh_data.is_subdiv == 0 and not use_smooth_normals)
+        mesh_data.rman_mesh = mesh_utils.get_mesh(mesh, get_normals=mesh_data.get_normals)
+
+        if not mesh_data.is_empty():
+            material_ids = None
+            if len(ob.data.materials) > 1:
+                material_ids = _get_material_ids(ob, mesh)
+            mesh_data.is_multi_material = _is_multi_material_(ob, mesh, material_ids=material_ids)
+            _gather_primvars_(ob, mesh, mesh_data)
+            if mesh_data.is_subdiv:
+                mesh_data.subd_intargs = [ int(ob.data.renderman.rman_subdivInterp),
+                                           int(ob.data.renderman.rman_subdivFacevaryingInterp)]
+                self._get_creases_(mesh, mesh_data)
+            if mesh_data.is_multi_material:
+                mesh_data.material_ids = material_ids
+
+        if not input_mesh:
+            ob.to_mesh_clear()
+
+        return mesh_data
+
     def export(self, ob, db_name):
         sg_node = self.rman_scene.sg_scene.CreateGroup('')
         rman_sg_mesh = RmanSgMesh(self.rman_scene, sg_node, db_name)
@@ -431,35 +753,72 @@ class RmanMeshTranslator(RmanTranslator):
         rman_sg_mesh.sg_mesh.SetPrimVars(primvars)
         ob.to_mesh_clear()
 
-    def update(self, ob, rman_sg_mesh, input_mesh=None, sg_node=None):
+    def _get_topology_fingerprint_(self, ob, mesh_data):
         rm = ob.original.data.renderman
-        mesh = input_mesh
-        if not mesh:
-            mesh = ob.to_mesh()
-            if not mesh:
+        rman_mesh = mesh_data.rman_mesh
+        layout = tuple((kind, name, detail) for kind, name, values, detail in mesh_data.primvars)
+        return (rman_mesh.topology_digest(), rman_mesh.npoints, mesh_data.is_subdiv,
+                getattr(rm, 'rman_subdiv_scheme', 'none'), mesh_data.get_normals, rman_mesh.nnormals, layout)
+
+    def _set_normals_(self, rman_mesh, primvar):
+        N = rman_mesh.N
+        if N is not None and N.any():
+            if rman_mesh.nnormals == rman_mesh.numnverts:
+                primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N.data, "facevarying")
+            else:
+                primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N.data, "uniform")
+
+    def _update_points_(self, ob, rman_sg_mesh, mesh_data, primvar_digests):
+        # The topology hasn't changed since the last update, so we skip the Define
+        # and the nvertices/vertices primvars. Only P, N and any primvars whose
+        # values changed are sent.
+        sg_node = rman_sg_mesh.sg_mesh
+        rman_mesh = mesh_data.rman_mesh
+        primvar = sg_node.GetPrimVars()
+        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, rman_mesh.P.data, "vertex")
+
+        old_digests = rman_sg_mesh.primvar_digests
+        skip = set([k for k, d in primvar_digests.items() if old_digests.get(k, None) == d])
+        _set_primvars_(ob, rman_sg_mesh, mesh_data, primvar, skip=skip)
+
+        if rman_sg_mesh.is_subdiv:
+            self._set_subd_tags_(mesh_data, primvar)
+        elif mesh_data.get_normals:
+            self._set_normals_(rman_mesh, primvar)
+
+        super().export_object_primvars(ob, primvar)
+        sg_node.SetPrimVars(primvar)
+        rman_sg_mesh.primvar_digests = primvar_digests
+
+    def update(self, ob, rman_sg_mesh, input_mesh=None, sg_node=None, mesh_data=None):
+        rm = ob.original.data.renderman
+        if mesh_data is None:
+            mesh_data = self.gather(ob, mesh=input_mesh)
+            if mesh_data is None:
                 return True
+        if not mesh_data.processed:
+            mesh_data.process()
 
+        # we can only reuse the topology of our own mesh node
+        use_topology_cache = not sg_node
         if not sg_node:
             sg_node = rman_sg_mesh.sg_mesh
 
-        rman_sg_mesh.is_subdiv = object_utils.is_subdmesh(ob.original)
-        use_smooth_normals = getattr(rm, 'rman_smoothnormals', False)
-        get_normals = (rman_sg_mesh.is_subdiv == 0 and not use_smooth_normals)
-        rman_mesh = mesh_utils.get_mesh(mesh, get_normals=get_normals)
+        rman_sg_mesh.is_subdiv = mesh_data.is_subdiv
+        get_normals = mesh_data.get_normals
+        rman_mesh = mesh_data.rman_mesh
         nverts = rman_mesh.nverts
         verts = rman_mesh.verts
         P = rman_mesh.P
-        N = rman_mesh.N
         
         # if this is empty continue:
-        if not nverts.any():
-            if not input_mesh:
-                ob.to_mesh_clear()
+        if mesh_data.is_empty():
             rman_sg_mesh.npoints = 0
             rman_sg_mesh.npolys = 0
             rman_sg_mesh.nverts = 0
             rman_sg_mesh.is_transforming = False
             rman_sg_mesh.is_deforming = False
+            rman_sg_mesh.topology_fingerprint = None
             if rman_sg_mesh.sg_mesh:
                 rman_sg_mesh.sg_node.RemoveChild(rman_sg_mesh.sg_mesh)
             return None
@@ -469,6 +828,22 @@ class RmanMeshTranslator(RmanTranslator):
         if rman_sg_mesh.sg_node.GetNumChildren() < 1:
             rman_sg_mesh.sg_node.AddChild(rman_sg_mesh.sg_mesh)
 
+        # multi-material meshes and meshes with deformation motion blur
+        # are always fully re-defined
+        fingerprint = None
+        primvar_digests = dict()
+        if use_topology_cache and not mesh_data.is_multi_material and not rman_sg_mesh.is_multi_material:
+            if not (rman_sg_mesh.is_deforming and len(rman_sg_mesh.deform_motion_steps) > 1):
+                fingerprint = self._get_topology_fingerprint_(ob, mesh_data)
+                primvar_digests = mesh_data.primvar_digests
+                if primvar_digests is None:
+                    primvar_digests = _get_primvar_digests_(mesh_data)
+                if fingerprint == rman_sg_mesh.topology_fingerprint:
+                    self._update_points_(ob, rman_sg_mesh, mesh_data, primvar_digests)
+                    return True
+        rman_sg_mesh.topology_fingerprint = fingerprint
+        rman_sg_mesh.primvar_digests = primvar_digests
+
         npolys = rman_mesh.npolys 
         npoints = rman_mesh.npoints 
         numnverts = rman_mesh.numnverts 
@@ -478,7 +853,7 @@ class RmanMeshTranslator(RmanTranslator):
         rman_sg_mesh.nverts = numnverts
 
         sg_node.Define( npolys, npoints, numnverts )
-        rman_sg_mesh.is_multi_material = _is_multi_material_(ob, mesh)
+        rman_sg_mesh.is_multi_material = mesh_data.is_multi_material
             
         primvar = sg_node.GetPrimVars()
         primvar.Clear()
@@ -487,33 +862,29 @@ class RmanMeshTranslator(RmanTranslator):
             super().set_primvar_times(rman_sg_mesh.deform_motion_steps, primvar)
         
         primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P.data, "vertex")
-        _get_primvars_(ob, rman_sg_mesh, mesh, primvar)   
+        _set_primvars_(ob, rman_sg_mesh, mesh_data, primvar)   
 
         primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nverts.data, "uniform")
         primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_vertices, verts.data, "facevarying")                  
 
         if rman_sg_mesh.is_subdiv:
-            creases = self._get_subd_tags_(ob, mesh, primvar)
+            self._set_subd_tags_(mesh_data, primvar)
             sg_node.SetScheme(rm.rman_subdiv_scheme) 
 
         else:
             sg_node.SetScheme(None)
 
         if not rman_sg_mesh.is_subdiv:
-            if get_normals and N.any():
-                if rman_mesh.nnormals == numnverts:
-                    primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N.data, "facevarying")         
-                else:
-                    primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N.data, "uniform")         
+            if get_normals:
+                self._set_normals_(rman_mesh, primvar)
         subdiv_scheme = getattr(rm, 'rman_subdiv_scheme', 'none')
         rman_sg_mesh.subdiv_scheme = subdiv_scheme
 
         super().export_object_primvars(ob, primvar)
 
         if rman_sg_mesh.is_multi_material:
-            material_ids = _get_material_ids(ob, mesh)
             i = 1
-            mat_faces_dict = _get_mats_faces_(nverts, material_ids)
+            mat_faces_dict = mesh_data.mat_faces
             min_idx = min(mat_faces_dict.keys()) # find the minimun material index
             for mat_id, faces in mat_faces_dict.items():
                 # If the face has a mat index that is higher than the number of
@@ -529,7 +900,7 @@ class RmanMeshTranslator(RmanTranslator):
                     sg_material = self.rman_scene.rman_materials.get(mat.original, None)
 
                 if mat_id == min_idx:
-                    primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))
+                    primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces.tolist(), len(faces))
                     if mat:
                         scenegraph_utils.set_material(sg_node, sg_material.sg_node, sg_material, mat=mat, ob=ob)
                 else:                
@@ -542,7 +913,7 @@ class RmanMeshTranslator(RmanTranslator):
                     if rman_sg_mesh.is_deforming and len(rman_sg_mesh.deform_motion_steps) > 1:
                         super().set_primvar_times(rman_sg_mesh.deform_motion_steps, pvars)
                     pvars.Inherit(primvar)
-                    pvars.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))                    
+                    pvars.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces.tolist(), len(faces))                    
                     sg_sub_mesh.SetPrimVars(pvars)
                     if mat:
                         scenegraph_utils.set_material(sg_sub_mesh, sg_material.sg_node, sg_material, mat=mat, ob=ob)
@@ -553,7 +924,4 @@ class RmanMeshTranslator(RmanTranslator):
 
         sg_node.SetPrimVars(primvar)
 
-        if not input_mesh:
-            ob.to_mesh_clear()  
-
-        return True    
\ No newline at end of file
+        return True
@@ -6,8 +6,6 @@ from ..rfb_utils import object_utils
 from ..rfb_utils import prefs_utils
 from ..rfb_utils import shadergraph_utils
 from ..rfb_utils import scene_utils
-from copy import deepcopy
-import hashlib
 import os
 import bpy
 
@@ -120,7 +118,7 @@ class RmanTranslator(object):
         if name != "":            
             persistent_id = ob_inst.persistent_id[1]
             if persistent_id == 0:           
-                persistent_id = int(hashlib.sha1(name.encode()).hexdigest(), 16) % 10**8
+                persistent_id = object_utils.get_stable_id(name)
             self.rman_scene.obj_hash[persistent_id] = name
             attrs.SetInteger(self.rman_scene.rman.Tokens.Rix.k_identifier_id, persistent_id)
 
@@ -130,7 +128,7 @@ class RmanTranslator(object):
                     'PROCEDURAL_RUN_PROGRAM',
                     'DYNAMIC_LOAD_DSO'
                 ]:
-                id = int(hashlib.sha1(rman_sg_node.db_name.encode()).hexdigest(), 16) % 10**8
+                id = object_utils.get_stable_id(rman_sg_node.db_name)
                 procprimid = float(id)
                 attrs.SetFloat('user:procprimid', procprimid) 
 
@@ -173,11 +171,7 @@ class RmanTranslator(object):
 
         obj_groups_str = "World"
         obj_groups_str += "," + name
-        for obj_group in self.rman_scene.bl_scene.renderman.object_groups:
-            for member in obj_group.members:
-                if member.ob_pointer.original == ob.original:
-                    obj_groups_str += ',' + obj_group.name
-                    break
+        obj_groups_str += scene_utils.get_object_groups_membership(self.rman_scene.bl_scene, ob)
 
         self.export_light_linking_attributes(ob, attrs, obj_groups_str=obj_groups_str)     
 
@@ -187,106 +181,39 @@ class RmanTranslator(object):
         rm = ob.renderman
         bl_scene = self.rman_scene.bl_scene
 
+        light_link_table = self.rman_scene.light_link_table
         if self.rman_scene.use_blender_light_link:        
-            all_lights = self.rman_scene.all_lights
-
-            exclude_subset = []
-            include_subset = []
-            lightfilter_subset = []
-            shadow_subset = []
-            shadow_exclude = []
-
-            for light in all_lights:
-                light = light.original
-                light_props = shadergraph_utils.get_rman_light_properties_group(light)
-                if light.light_linking.receiver_collection:
-                    for i, o in enumerate(light.light_linking.receiver_collection.objects):
-                        if o.name == ob.name:
-                            if light_props.renderman_light_role == 'RMAN_LIGHT':
-                                if light.light_linking.receiver_collection.collection_objects[i].light_linking.link_state == 'EXCLUDE':
-                                    exclude_subset.append(string_utils.sanitize_node_name(light.name) )
-                                else:
-                                    include_subset.append(string_utils.sanitize_node_name(light.name) )
-                            else:
-                                if light.light_linking.receiver_collection.collection_objects[i].light_linking.link_state == 'INCLUDE':
-                                    lightfilter_subset.append(string_utils.sanitize_node_name(light.name) )
-                                else:
-                                    lightfilter_subset.append("-%s" % string_utils.sanitize_node_name(light.name) )
-
-                elif light_props.renderman_light_role == 'RMAN_LIGHTFILTER':
-                    lightfilter_subset.append(string_utils.sanitize_node_name(light.name) )
-                if light.light_linking.blocker_collection:
-                    found = False
-                    for i, o in enumerate(light.light_linking.blocker_collection.objects):
-                        if o.name == ob.name:
-                            if light_props.renderman_light_role == 'RMAN_LIGHT':
-                                if light.light_linking.blocker_collection.collection_objects[i].light_linking.link_state == 'EXCLUDE':
-                                    shadow_exclude.append(string_utils.sanitize_node_name(light.name)+"_shadowExcludeSubset" )
-                                else:
-                                    shadow_subset.append(string_utils.sanitize_node_name(light.name)+"_shadowSubset" )
-                            found = True
-
-                    if not found: 
-                        # if the object is not in the blocker collection, add it to the
-                        # invert subset.                       
-                        shadow_subset.append(string_utils.sanitize_node_name(light.name)+"_shadowInvertSubset" )
-                else:
-                    shadow_subset.append(string_utils.sanitize_node_name(light.name)+"_shadowSubset" )
+            exclude_subset, include_subset, lightfilter_subset, shadow_subset, shadow_exclude = light_link_table.get_bl_subsets(ob)
 
             if exclude_subset:
-                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_excludesubset, ','. join(exclude_subset) )
+                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_excludesubset, exclude_subset )
             else:
                 attrs.Remove(self.rman_scene.rman.Tokens.Rix.k_lighting_excludesubset)
             if include_subset:
-                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_subset, ','. join(include_subset) )            
+                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_subset, include_subset )            
                 attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_excludesubset, "null")
             else:
                 attrs.Remove(self.rman_scene.rman.Tokens.Rix.k_lighting_subset)
             if lightfilter_subset:
-                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset, ',' . join(lightfilter_subset))
+                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset, lightfilter_subset)
             else:
                 attrs.Remove(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset)
 
             if shadow_subset:
-                obj_groups_str += "," + "," . join(shadow_subset)
+                obj_groups_str += "," + shadow_subset
             if shadow_exclude:
-                obj_groups_str += "," + "," . join(shadow_exclude)
+                obj_groups_str += "," + shadow_exclude
 
         else:           
 
             if self.rman_scene.bl_scene.renderman.invert_light_linking:
-                lighting_subset = []
-                lightfilter_subset = []
-                all_lights = deepcopy(self.rman_scene.all_lights)
-                all_lightfilters = deepcopy(self.rman_scene.all_lightfilters)
-                for ll in self.rman_scene.bl_scene.renderman.light_links:
-                    light_ob = ll.light_ob                
-                    light_props = shadergraph_utils.get_rman_light_properties_group(light_ob)
-                    found = False
-                    for member in ll.members:
-                        if member.ob_pointer.original == ob.original:
-                            found = True
-                            break
-                        
-                    if light_props.renderman_light_role == 'RMAN_LIGHT':
-                        nm = string_utils.sanitize_node_name(light_ob.name)
-                        if found:
-                            lighting_subset.append(nm)
-                        all_lights.remove(nm)
-
-                    elif light_props.renderman_light_role == 'RMAN_LIGHTFILTER':      
-                        nm = string_utils.sanitize_node_name(light_ob.name)                  
-                        if found:                        
-                            lightfilter_subset.append(nm)
-                        all_lightfilters.remove(nm)
+                lighting_subset, lightfilter_subset = light_link_table.get_rman_subsets(ob)
 
                 if lighting_subset:
-                    lighting_subset = lighting_subset + all_lights # include all other lights that are not linked
-                    attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_subset, ','. join(lighting_subset) )
+                    attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_subset, lighting_subset )
 
                 if lightfilter_subset:
-                    lightfilter_subset = lightfilter_subset + all_lightfilters
-                    attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset, ',' . join(lightfilter_subset))
+                    attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset, lightfilter_subset)
 
         attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_grouping_membership, obj_groups_str)
 